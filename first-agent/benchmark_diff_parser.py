@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Benchmark for the shared hunk parser
+
+Runs the three diff consumers (diff summary, specific-change extraction and
+focus-area keyword scan) over a large synthetic PR, first the way they used
+to work, each re-splitting and re-scanning every patch, then reading the
+ParsedPatch memoized on each FileChange.
+
+Usage: python benchmark_diff_parser.py [files] [lines_per_file]
+"""
+
+import sys
+import time
+
+from benchmark_patch_memory import file_changes
+from src.patch_arena import PatchArena
+
+KEYWORDS = ['emoji', 'align', 'table', 'number', 'css', 'responsive']
+
+def legacy_consumers(changes) -> int:
+    """Each consumer walks the raw patch text with its own startswith() logic."""
+    output = 0
+
+    # Diff summary: first three added and removed lines
+    for change in changes:
+        lines = change.patch.split('\n')
+        added = [line[1:] for line in lines if line.startswith('+') and not line.startswith('+++')]
+        removed = [line[1:] for line in lines if line.startswith('-') and not line.startswith('---')]
+        output += len(added[:3]) + len(removed[:3])
+
+    # Specific changes: every added and removed line
+    for change in changes:
+        for line in change.patch.split('\n'):
+            if line.startswith('+++') or line.startswith('---'):
+                continue
+            if line.startswith('+'):
+                output += len(f"     ADDED: {line[1:].strip()}") > 0
+            elif line.startswith('-'):
+                output += len(f"     REMOVED: {line[1:].strip()}") > 0
+
+    # Focus areas: keyword scan of the lowercased patch
+    for change in changes:
+        content = change.patch.lower()
+        output += sum(keyword in content for keyword in KEYWORDS)
+
+    return output
+
+def parsed_consumers(changes) -> int:
+    """The same three consumers reading one memoized parse per file."""
+    output = 0
+
+    for change in changes:
+        parsed = change.parsed_patch()
+        output += len(parsed.changed_lines('+', limit=3)) + len(parsed.changed_lines('-', limit=3))
+
+    for change in changes:
+        for marker, _, text in change.parsed_patch().iter_changes():
+            label = "ADDED" if marker == '+' else "REMOVED"
+            output += len(f"     {label}: {text.strip()}") > 0
+
+    for change in changes:
+        content = change.parsed_patch().changed_bytes()
+        output += sum(keyword.encode() in content for keyword in KEYWORDS)
+
+    return output
+
+def main():
+    files = int(sys.argv[1]) if len(sys.argv) > 1 else 1500
+    lines = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+
+    print(f"📊 {files} files x {lines} patch lines")
+
+    changes = list(file_changes(files, lines))
+    start = time.perf_counter()
+    legacy_consumers(changes)
+    legacy = time.perf_counter() - start
+    print(f"legacy   {legacy:6.2f} s")
+
+    arena = PatchArena()
+    changes = list(file_changes(files, lines))
+    for change in changes:
+        change.attach_patch(arena)
+    start = time.perf_counter()
+    parsed_consumers(changes)
+    parsed = time.perf_counter() - start
+    print(f"parsed   {parsed:6.2f} s")
+    print(f"Consumer time reduced by {100 * (1 - parsed / legacy):.0f}%")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+Benchmark of the direct-completion fast path against the CrewAI path
+
+Generates the short GitHub PR comment several times each way: through a
+single-agent Crew (what the comment task used to do) and through
+DirectCompletion. Reports wall time, time to first token and the tokens
+each path sent and received.
+
+By default both paths talk to a local simulated OpenAI-compatible endpoint
+that charges a fixed per-request overhead plus time per prompt and answer
+token, so the numbers show the framework's share of the cost. With --live
+they call the configured endpoint (OPENAI_BASE_URL / MODEL_NAME) instead.
+
+Usage: python benchmark_direct_completion.py [runs] [--live]
+"""
+
+import json
+import statistics
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import openai
+from crewai import Agent, Crew, Process, Task
+from crewai.llm import LLM
+
+from src.config import config
+from src.direct_completion import DirectCompletion
+from src.prompt_context import estimate_tokens
+
+COMMENT = ("🧪 QA will cover the new table cell formatting: emoji for Yes/No values, right-aligned "
+           "monospaced numbers, and layout on narrow screens. We'll also check that existing tables "
+           "render unchanged.")
+
+PROMPT = """Based on the PR information, generate a concise GitHub comment:
+
+PR Title: Improve table readability
+PR Description: Show booleans as ✅/❌ and right-align numeric columns in all data tables.
+
+Repository Context:
+Storefront is the customer-facing shop for Acme. Order history is shown in a data table...
+
+Create a GitHub comment that:
+1. Is 2-3 sentences maximum
+2. Explains what QA testing will cover
+3. Is friendly and informative
+4. Uses appropriate emoji if helpful
+
+Output only the comment text, no extra formatting."""
+
+ROLE = "GitHub Comment Generator"
+GOAL = "Generate short, simple comments describing the QA analysis process for GitHub PRs"
+BACKSTORY = ("You are an expert at creating concise, informative comments that explain what QA analysis "
+             "will cover for a pull request. You focus on being clear and helpful to developers.")
+
+# Simulated model speed
+REQUEST_OVERHEAD = 0.15  # seconds per request (queueing, network)
+PREFILL_PER_TOKEN = 0.0002
+DECODE_PER_TOKEN = 0.01
+
+class SimulatedEndpoint(BaseHTTPRequestHandler):
+    """/v1/chat/completions that answers COMMENT at a fixed simulated speed."""
+
+    def log_message(self, *args):
+        pass
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        prompt_tokens = sum(estimate_tokens(str(message.get("content") or "")) for message in body["messages"])
+        answer = COMMENT
+        words = answer.split(" ")
+        completion_tokens = estimate_tokens(answer)
+        time.sleep(REQUEST_OVERHEAD + prompt_tokens * PREFILL_PER_TOKEN)
+        usage = {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens,
+                 "total_tokens": prompt_tokens + completion_tokens}
+        base = {"id": "cmpl-1", "created": int(time.time()), "model": body["model"]}
+
+        if not body.get("stream"):
+            time.sleep(completion_tokens * DECODE_PER_TOKEN)
+            payload = json.dumps({**base, "object": "chat.completion", "usage": usage, "choices": [
+                {"index": 0, "finish_reason": "stop", "message": {"role": "assistant", "content": answer}}
+            ]}).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.end_headers()
+        for index, word in enumerate(words):
+            text = word if index == 0 else " " + word
+            time.sleep(completion_tokens * DECODE_PER_TOKEN / len(words))
+            chunk = {**base, "object": "chat.completion.chunk", "choices": [
+                {"index": 0, "delta": {"content": text}, "finish_reason": None}
+            ]}
+            self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode())
+            self.wfile.flush()
+        if (body.get("stream_options") or {}).get("include_usage"):
+            chunk = {**base, "object": "chat.completion.chunk", "choices": [], "usage": usage}
+            self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode())
+        self.wfile.write(b"data: [DONE]\n\n")
+
+def crew_comment(base_url: str, api_key: str, model: str):
+    llm = LLM(model=model, provider="openai", base_url=base_url, api_key=api_key)
+    agent = Agent(role=ROLE, goal=GOAL, backstory=BACKSTORY, llm=llm, verbose=False, allow_delegation=False)
+    task = Task(description=PROMPT, expected_output="A concise GitHub comment explaining QA testing scope",
+                agent=agent)
+    start = time.perf_counter()
+    result = Crew(agents=[agent], tasks=[task], process=Process.sequential, verbose=False).kickoff()
+    elapsed = time.perf_counter() - start
+    usage = result.token_usage
+    return elapsed, None, usage.prompt_tokens, usage.completion_tokens, usage.successful_requests
+
+def direct_comment(client, model: str):
+    direct = DirectCompletion(client=client, model=model, max_tokens=config.direct_completion_max_tokens)
+    result = direct.complete(f"You are a {ROLE}. {BACKSTORY}\nYour goal: {GOAL}", PROMPT)
+    return result.latency, result.time_to_first_token, result.prompt_tokens, result.completion_tokens, 1
+
+def report(label: str, samples):
+    latencies = [sample[0] for sample in samples]
+    first_tokens = [sample[1] for sample in samples if sample[1] is not None]
+    ttft = f"{statistics.median(first_tokens) * 1000:7.0f} ms" if first_tokens else "        -"
+    print(f"{label:<10} {statistics.median(latencies) * 1000:8.0f} ms  {ttft}  "
+          f"{statistics.mean(s[2] for s in samples):8.0f}  {statistics.mean(s[3] for s in samples):8.0f}  "
+          f"{statistics.mean(s[4] for s in samples):5.1f}")
+
+def main():
+    args = [arg for arg in sys.argv[1:] if not arg.startswith("--")]
+    runs = int(args[0]) if args else 5
+    live = "--live" in sys.argv
+
+    server = None
+    if live:
+        base_url, api_key, model = config.openai_base_url, config.openai_api_key, config.model_name
+        client = config.get_openai_client()
+    else:
+        server = ThreadingHTTPServer(("127.0.0.1", 0), SimulatedEndpoint)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        base_url, api_key, model = f"http://127.0.0.1:{server.server_port}/v1", "benchmark", config.model_name
+        client = openai.OpenAI(base_url=base_url, api_key=api_key)
+
+    print(f"📊 {runs} PR comments per path against {'the live endpoint' if live else 'a simulated endpoint'}")
+    print(f"{'path':<10} {'median':>11}  {'to 1st tok':>10}  {'prompt':>8}  {'output':>8}  {'reqs':>5}")
+    report("crew", [crew_comment(base_url, api_key, model) for _ in range(runs)])
+    report("direct", [direct_comment(client, model) for _ in range(runs)])
+
+    if server is not None:
+        server.shutdown()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Memory benchmark for FileChange patch storage
+
+Builds a synthetic PR with a large number of changed files and runs the
+three diff consumers (diff summary, rule keyword scan, prompt hunks) over
+it. Once with each patch kept as its own string and split into line lists
+by every consumer, once with all patches in a shared PatchArena read by the
+production consumers through the memoized, offset-only hunk parse.
+
+Usage: python benchmark_patch_memory.py [files] [lines_per_file]
+"""
+
+import sys
+import time
+import tracemalloc
+
+from src.github_service import GitHubService
+from src.models import FileChange
+from src.patch_arena import PatchArena
+from src.prompt_context import assemble_prompt_context
+
+def make_patch(index: int, lines: int) -> str:
+    """A hunk with alternating context, added and removed lines.
+
+    Every tenth file gains an emoji line, which is enough to make CPython
+    store that whole patch at four bytes per character.
+    """
+    body = [f"@@ -1,{lines} +1,{lines} @@"]
+    for line in range(lines):
+        marker = " +-"[line % 3]
+        body.append(f"{marker}    value_{index}_{line} = compute_value({line}, flag=True)  # generated")
+    if index % 10 == 0:
+        body.append("+    STATUS_ICONS = {'ok': '🟢', 'failed': '🔴'}")
+    return '\n'.join(body)
+
+def file_changes(files: int, lines: int):
+    for index in range(files):
+        yield FileChange(
+            filename=f"packages/pkg_{index % 40}/module_{index}.py",
+            additions=lines // 3,
+            deletions=lines // 3,
+            changes=2 * (lines // 3),
+            patch=make_patch(index, lines),
+            status="modified"
+        )
+
+KEYWORDS = [b'emoji', b'align', b'table', b'number', b'css', b'responsive']
+
+def build_strings(files: int, lines: int):
+    """Patches kept as one string per file."""
+    return list(file_changes(files, lines))
+
+def consume_strings(changes) -> int:
+    """The diff summary, keyword scan and prompt hunks, each splitting every patch into line strings."""
+    output = 0
+    for change in changes:
+        lines = change.patch.split('\n')
+        added = [line[1:] for line in lines if line.startswith('+')]
+        removed = [line[1:] for line in lines if line.startswith('-')]
+        output += len(added[:3]) + len(removed[:3])
+    for change in changes:
+        content = '\n'.join(line[1:] for line in change.patch.split('\n') if line.startswith(('+', '-'))).lower()
+        output += sum(keyword.decode() in content for keyword in KEYWORDS)
+    for change in changes:
+        body = '\n'.join(f"{line[0]} {line[1:]}" for line in change.patch.split('\n') if line.startswith(('+', '-')))
+        output += len(body) > 0
+    return output
+
+def build_arena(files: int, lines: int):
+    """Patches moved into one arena as they arrive."""
+    arena = PatchArena()
+    changes = []
+    for change in file_changes(files, lines):
+        change.attach_patch(arena)
+        changes.append(change)
+    return changes
+
+def consume_arena(changes) -> int:
+    """The same three jobs done by the production consumers, reading the memoized parse and the arena."""
+    output = 0
+    for change in changes:
+        output += len(GitHubService._summarize_file_change(None, change))
+    for change in changes:
+        content = change.parsed_patch().changed_bytes()
+        output += sum(keyword in content for keyword in KEYWORDS)
+    output += len(assemble_prompt_context("Regenerate modules", None, changes, {}).pieces)
+    return output
+
+def measure(label: str, build, consume, files: int, lines: int) -> int:
+    tracemalloc.start()
+    changes = build(files, lines)
+    built, _ = tracemalloc.get_traced_memory()
+    tracemalloc.reset_peak()
+    consume(changes)
+    retained, consume_peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del changes
+
+    # Timed separately: tracemalloc slows allocation-heavy code down unevenly
+    changes = build(files, lines)
+    start = time.perf_counter()
+    consume(changes)
+    elapsed = time.perf_counter() - start
+
+    mib = 1024 * 1024
+    print(f"{label:<8} built {built / mib:6.1f} MiB   after consumers {retained / mib:6.1f} MiB   "
+          f"consumer peak {consume_peak / mib:6.1f} MiB   consumers {elapsed:5.2f} s")
+    return retained
+
+def main():
+    files = int(sys.argv[1]) if len(sys.argv) > 1 else 1500
+    lines = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+
+    print(f"📊 {files} files x {lines} patch lines")
+    strings_retained = measure("strings", build_strings, consume_strings, files, lines)
+    arena_retained = measure("arena", build_arena, consume_arena, files, lines)
+    print(f"Memory held after the consumers reduced by {100 * (1 - arena_retained / strings_retained):.0f}%")
+
+if __name__ == "__main__":
+    main()
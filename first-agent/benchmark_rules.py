@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""
+Benchmark for the compiled rule engine
+
+Matches the rule table against a synthetic PR with thousands of changed
+files, once with the built-in rules and once with extra custom rules that
+never match (the worst case: every patch has to be scanned to the end).
+
+Usage: python benchmark_rules.py [files] [lines_per_file]
+"""
+
+import sys
+import time
+from datetime import datetime
+
+from benchmark_patch_memory import file_changes
+from src.models import PRData
+from src.rules import DEFAULT_RULES, RuleEngine
+
+def make_pr(files: int, lines: int) -> PRData:
+    pr_data = PRData(
+        title="Bump generated clients",
+        created_at=datetime.now(),
+        updated_at=datetime.now(),
+        pr_url="https://github.com/o/r/pull/1",
+        repo_name="r",
+        repo_owner="o",
+        file_changes=list(file_changes(files, lines)),
+    )
+    # Parse up front so only reading the changed lines and matching are timed
+    for file_change in pr_data.file_changes:
+        file_change.parsed_patch()
+    return pr_data
+
+def measure(label: str, engine: RuleEngine, pr_data: PRData):
+    start = time.perf_counter()
+    matched = engine.match(pr_data)
+    elapsed = time.perf_counter() - start
+    print(f"{label:<28} {elapsed * 1000:8.1f} ms   ({len(matched)} rules matched)")
+
+def main():
+    files = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    lines = int(sys.argv[2]) if len(sys.argv) > 2 else 30
+
+    print(f"📊 {files} files x {lines} patch lines")
+    pr_data = make_pr(files, lines)
+
+    measure("built-in rules", RuleEngine(DEFAULT_RULES), pr_data)
+    custom = [
+        {"focus_area": f"Custom area {i}", "keywords": [f"never_{i}_a", f"never_{i}_b"]}
+        for i in range(50)
+    ]
+    measure("built-in + 50 unmatched", RuleEngine(DEFAULT_RULES + custom), pr_data)
+
+if __name__ == "__main__":
+    main()
@@ -16,6 +16,7 @@ from rich.panel import Panel
 
 from src.main import QAContextGenerator
 from src.config import config
+from src.report_cache import ReportCache
 
 app = typer.Typer(
     name="qa-context-generator",
@@ -51,6 +52,11 @@ def generate(
         "-v", 
         help="Enable verbose output"
     ),
+    cache: bool = typer.Option(
+        True,
+        "--cache/--no-cache",
+        help="Reuse the cached report for the PR's current head commit"
+    ),
 ):
     """
     Generate QA testing context from a GitHub Pull Request.
@@ -72,7 +78,7 @@ def generate(
     
     try:
         # Run the async generator
-        asyncio.run(_generate_async(pr_url, output, format, preview, verbose))
+        asyncio.run(_generate_async(pr_url, output, format, preview, verbose, cache))
     except KeyboardInterrupt:
         console.print("\n[yellow]⚠️ Operation cancelled by user[/yellow]")
         raise typer.Exit(1)
@@ -82,20 +88,41 @@ def generate(
             console.print_exception()
         raise typer.Exit(1)
 
-async def _generate_async(pr_url: str, output: Optional[str], format: str, preview: bool, verbose: bool):
+async def _generate_async(pr_url: str, output: Optional[str], format: str, preview: bool, verbose: bool,
+                          cache: bool = True):
     """Async wrapper for the generation process."""
     generator = QAContextGenerator()
     
     # Generate the QA context
-    qa_report = await generator.generate_qa_context(
-        pr_url=pr_url,
-        output_file=output
-    )
+    try:
+        qa_report = await generator.generate_qa_context(
+            pr_url=pr_url,
+            output_file=output,
+            use_cache=cache
+        )
+    finally:
+        await generator.aclose()
     
     # Show preview if requested
     if preview:
         generator.display_markdown_preview(qa_report)
 
+@app.command()
+def clear_cache(
+    pr_url: Optional[str] = typer.Argument(None, help="Only drop reports of this PR (default: all)"),
+):
+    """Drop cached QA reports so the next run regenerates them."""
+    if not config.report_cache_enabled:
+        console.print("[yellow]⚠️ Report cache is disabled (REPORT_CACHE_ENABLED=false)[/yellow]")
+        return
+    
+    cache = ReportCache(config.report_cache_path)
+    try:
+        removed = cache.invalidate(pr_url)
+    finally:
+        cache.close()
+    console.print(f"[green]✓[/green] Removed {removed} cached report(s)")
+
 @app.command()
 def config_check():
     """Check if all required configuration is set up correctly."""
@@ -180,6 +207,10 @@ OPENAI_BASE_URL=https://api.inference.wandb.ai/v1
     console.print("# Generate without preview")
     console.print("python cli.py generate https://github.com/owner/repo/pull/123 --no-preview")
     console.print("")
+    console.print("# Regenerate instead of reusing the cached report for the PR's head commit")
+    console.print("python cli.py generate https://github.com/owner/repo/pull/123 --no-cache")
+    console.print("python cli.py clear-cache https://github.com/owner/repo/pull/123")
+    console.print("")
     console.print("# Check configuration")
     console.print("python cli.py config-check")
 
@@ -6,14 +6,24 @@ A simple FastAPI server that exposes the QA context generation functionality.
 """
 
 import asyncio
+import json
+import time
 from datetime import datetime
 from typing import Optional
-from fastapi import FastAPI, HTTPException
+from fastapi import BackgroundTasks, FastAPI, HTTPException, Request
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, HttpUrl
 import uvicorn
 
 from src.main import QAContextGenerator
 from src.report_formatter import ReportFormatter
+from src.github_scheduler import RequestPriority, current_priority, request_priority, scheduler as github_scheduler
+from src.config import config
+from src.webhooks import GitHubWebhookHandler, WebhookResult, verify_signature
+from src.jobs import Job, JobManager, JobQueueFull
+from src.models import QAReport
+from src.stage_executor import stage_executor
+from src.single_flight import SingleFlight
 
 # FastAPI app initialization
 app = FastAPI(
@@ -26,6 +36,7 @@ app = FastAPI(
 class GenerateRequest(BaseModel):
     url: str
     output_file: Optional[str] = None
+    refresh: bool = False  # Regenerate even if a report for the PR's head commit is cached
 
 # Response model
 class GenerateResponse(BaseModel):
@@ -34,16 +45,39 @@ class GenerateResponse(BaseModel):
     markdown_report: Optional[str] = None
     error: Optional[str] = None
 
+class JobSubmitted(BaseModel):
+    job_id: str
+    status: str
+    status_url: str
+
 # Global instances
 generator = None
 formatter = None
+webhook_handler = None
+job_manager = None
+# Concurrent requests for the same PR revision and model share one generation
+report_flights = SingleFlight()
+# Streamed generations outlive their connection; hold them so they aren't garbage collected
+stream_generations = set()
 
 @app.on_event("startup")
 async def startup_event():
     """Initialize the QA generator and formatter on startup."""
-    global generator, formatter
+    global generator, formatter, webhook_handler, job_manager
     generator = QAContextGenerator()
     formatter = ReportFormatter()
+    webhook_handler = GitHubWebhookHandler(generator.agents.github_service)
+    job_manager = JobManager(run_job)
+    await job_manager.start()
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Stop job workers and close pooled connections on shutdown."""
+    if job_manager is not None:
+        await job_manager.stop()
+    if generator is not None:
+        await generator.aclose()
+    stage_executor.shutdown()
 
 @app.get("/")
 async def root():
@@ -54,7 +88,13 @@ async def root():
         "description": "Generate comprehensive QA testing context from GitHub PRs",
         "endpoints": {
             "generate": "POST /generate - Generate QA context from GitHub PR URL",
-            "health": "GET /health - Health check endpoint"
+            "generate_stream": "GET /generate/stream?url=... - Server-sent stage events, model output and the final report",
+            "jobs": "POST /jobs - Queue QA context generation and return a job ID right away",
+            "job_status": "GET /jobs/{id} - Stage, progress and result of a queued generation",
+            "report_cache": "DELETE /cache/reports?url=... - Drop cached reports of a PR (or all without url)",
+            "health": "GET /health - Health check endpoint",
+            "github_status": "GET /github/status - GitHub rate-limit budget, queue depth, cache, job and executor stats",
+            "github_webhooks": "POST /webhooks/github - GitHub webhook receiver (pull_request, issue_comment, deployment_status, push)"
         }
     }
 
@@ -63,11 +103,151 @@ async def health_check():
     """Health check endpoint."""
     return {"status": "healthy", "timestamp": datetime.now().isoformat()}
 
+@app.get("/github/status")
+async def github_status():
+    """Report the GitHub request budget, scheduler queue depth and cache statistics."""
+    cache = generator.agents.github_service.cache if generator is not None else None
+    return {
+        "scheduler": github_scheduler.stats(),
+        "cache": cache.stats() if cache is not None else None,
+        "webhooks": webhook_handler.stats() if webhook_handler is not None else None,
+        "jobs": job_manager.stats() if job_manager is not None else None,
+        "executor": stage_executor.stats(),
+        "coalesced_reports": report_flights.stats(),
+        "report_cache": generator.report_cache.stats() if generator is not None and generator.report_cache else None,
+        "llm_cache": generator.agents.completion_cache.stats()
+        if generator is not None and generator.agents.completion_cache else None,
+    }
+
+async def prefetch_pr_context(pr_url: str):
+    """Warm a PR's GitHub data behind interactive requests for the shared rate limit."""
+    with request_priority(RequestPriority.BACKGROUND):
+        await generator.agents.collect_github_data_async(pr_url)
+
+async def refresh_documentation(owner: str, repo_name: str):
+    """Re-fetch default-branch docs at background priority; the stage executor carries it to its thread."""
+    with request_priority(RequestPriority.BACKGROUND):
+        await stage_executor.run("github", generator.agents.github_service.get_documentation_data, owner, repo_name)
+
+@app.post("/webhooks/github", response_model=WebhookResult)
+async def github_webhook(request: Request, background_tasks: BackgroundTasks):
+    """
+    Receive a GitHub webhook delivery.
+    
+    Deliveries must carry a valid X-Hub-Signature-256 for GITHUB_WEBHOOK_SECRET.
+    They update cached PR state and deployment links; PR context is warmed
+    and default-branch docs are refreshed in the background after responding.
+    """
+    if not config.github_webhook_secret:
+        raise HTTPException(status_code=503, detail="GITHUB_WEBHOOK_SECRET is not configured")
+    
+    body = await request.body()
+    if not verify_signature(config.github_webhook_secret, body, request.headers.get("X-Hub-Signature-256")):
+        raise HTTPException(status_code=401, detail="Invalid webhook signature")
+    
+    try:
+        payload = json.loads(body)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Webhook body is not valid JSON")
+    
+    try:
+        result = webhook_handler.handle(request.headers.get("X-GitHub-Event", ""), payload)
+    except (KeyError, TypeError, AttributeError) as e:
+        raise HTTPException(status_code=400, detail=f"Unexpected webhook payload: {e}")
+    
+    for pr_url in result.prefetch_prs:
+        background_tasks.add_task(prefetch_pr_context, pr_url)
+    if result.refresh_docs:
+        owner, repo_name = result.refresh_docs.split("/", 1)
+        background_tasks.add_task(refresh_documentation, owner, repo_name)
+    
+    return result
+
+def validate_pr_url(url: str):
+    """Reject anything that isn't a GitHub pull request URL."""
+    if not url.startswith("https://github.com/") or "/pull/" not in url:
+        raise HTTPException(
+            status_code=400, 
+            detail="Invalid GitHub PR URL. Must be in format: https://github.com/owner/repo/pull/123"
+        )
+
+async def generate_markdown_report(pr_url: str, output_file: Optional[str] = None, progress=None,
+                                   refresh: bool = False) -> str:
+    """
+    Run the generator for a PR and render its report as markdown.
+    
+    Callers asking for the same PR head commit and model while a run is in
+    flight attach to that run instead of starting their own. A refresh only
+    attaches to another refresh, since other runs may answer from the report
+    cache; a plain request may attach to either. Likewise an interactive
+    caller never waits on a background run (a queued job), whose GitHub calls
+    queue behind interactive traffic, while a job may attach to an
+    interactive run. output_file is handed to the run that starts the
+    flight; callers that attach get the same report and their output_file
+    is ignored.
+    """
+    try:
+        head_sha = await generator.agents.github_service.get_head_sha_async(pr_url)
+    except Exception as e:
+        # Still coalesce by URL; the generation itself will report the real error
+        print(f"Could not resolve PR head commit: {e}")
+        head_sha = None
+    
+    priority = current_priority()
+    key = (pr_url, head_sha, config.model_name, refresh, priority)
+    refresh_options = (True,) if refresh else (False, True)
+    priority_options = {priority, RequestPriority.INTERACTIVE}
+    joinable = [
+        (pr_url, head_sha, config.model_name, other_refresh, other_priority)
+        for other_refresh in refresh_options for other_priority in sorted(priority_options)
+    ]
+    return await report_flights.do(
+        key,
+        lambda notify: _generate_markdown_report(pr_url, output_file, notify, head_sha, refresh),
+        progress=progress,
+        joinable=[other for other in joinable if other != key]
+    )
+
+async def _generate_markdown_report(pr_url: str, output_file: Optional[str], progress,
+                                    head_sha: Optional[str], refresh: bool, on_token=None) -> str:
+    # Generate output filename if not provided
+    if output_file is None:
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        output_file = f"qa_report_{timestamp}"
+    
+    # Generate the QA context
+    qa_report = await generator.generate_qa_context(
+        pr_url=pr_url,
+        output_file=output_file,
+        progress=progress,
+        head_sha=head_sha,
+        use_cache=not refresh,
+        on_token=on_token
+    )
+    
+    # The crew answers with the report text itself; structured reports still go through the formatter
+    if isinstance(qa_report, QAReport):
+        return formatter.generate_markdown_report(qa_report)
+    return str(qa_report)
+
+async def run_job(job: Job) -> str:
+    """Job runner: the same generation /generate does, reporting stages on the job.
+    
+    Nobody is waiting on the connection, so its GitHub calls queue behind
+    interactive requests for the shared rate limit.
+    """
+    with request_priority(RequestPriority.BACKGROUND):
+        return await generate_markdown_report(job.pr_url, job.output_file, progress=job.advance,
+                                              refresh=job.refresh)
+
 @app.post("/generate", response_model=GenerateResponse)
 async def generate_qa_context(request: GenerateRequest):
     """
     Generate QA testing context from a GitHub Pull Request URL.
     
+    Holds the connection until the report is done; prefer POST /jobs for
+    clients behind proxies with short timeouts.
+    
     Args:
         request: Request containing the GitHub PR URL and optional output file
         
@@ -76,28 +256,9 @@ async def generate_qa_context(request: GenerateRequest):
     """
     try:
         # Validate GitHub PR URL
-        if not request.url.startswith("https://github.com/") or "/pull/" not in request.url:
-            raise HTTPException(
-                status_code=400, 
-                detail="Invalid GitHub PR URL. Must be in format: https://github.com/owner/repo/pull/123"
-            )
-        
-        # Generate output filename if not provided
-        output_file = request.output_file
-        if output_file is None:
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            output_file = f"qa_report_{timestamp}"
+        validate_pr_url(request.url)
         
-        # Generate the QA context
-        qa_report = await generator.generate_qa_context(
-            pr_url=request.url,
-            output_file=output_file
-        )
-
-        print("qa_report: " + qa_report)
-        
-        # Generate markdown report
-        markdown_report = formatter.generate_markdown_report(qa_report)
+        markdown_report = await generate_markdown_report(request.url, request.output_file, refresh=request.refresh)
         
         return GenerateResponse(
             success=True,
@@ -117,6 +278,101 @@ async def generate_qa_context(request: GenerateRequest):
             error=error_message
         )
 
+def sse_event(event: str, data: dict) -> str:
+    """One server-sent event with a JSON payload."""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+@app.get("/generate/stream")
+async def generate_qa_context_stream(url: str, refresh: bool = False):
+    """
+    Generate QA context for a PR, streaming progress as server-sent events.
+    
+    Emits a `stage` event as each pipeline stage is reached (with seconds
+    since the request), `token` events with model output as it arrives, then
+    one `report` event with the markdown report, or an `error` event. Each
+    stream runs its own generation so it can carry that run's tokens; a
+    cached report for the PR's head commit is still served at once.
+    """
+    validate_pr_url(url)
+    loop = asyncio.get_running_loop()
+    events: asyncio.Queue = asyncio.Queue()
+    start = time.monotonic()
+    
+    def emit(event: Optional[str], data: Optional[dict] = None):
+        # Stage events come from the event loop, tokens from worker threads
+        loop.call_soon_threadsafe(events.put_nowait, (event, data))
+    
+    def progress(stage: str, fraction: float):
+        emit("stage", {"stage": stage, "progress": fraction, "elapsed": round(time.monotonic() - start, 3)})
+    
+    def on_token(task: str, text: str):
+        emit("token", {"task": task, "text": text})
+    
+    async def run():
+        try:
+            progress("started", 0.0)
+            try:
+                head_sha = await generator.agents.github_service.get_head_sha_async(url)
+            except Exception as e:
+                print(f"Could not resolve PR head commit: {e}")
+                head_sha = None
+            report = await _generate_markdown_report(url, None, progress, head_sha, refresh, on_token=on_token)
+            emit("report", {"markdown_report": report, "elapsed": round(time.monotonic() - start, 3)})
+        except Exception as e:
+            emit("error", {"error": str(e), "elapsed": round(time.monotonic() - start, 3)})
+        finally:
+            emit(None)
+    
+    # Not tied to the connection: a client that drops still leaves the report in the cache
+    generation = asyncio.create_task(run())
+    stream_generations.add(generation)
+    generation.add_done_callback(stream_generations.discard)
+    
+    async def stream():
+        while True:
+            event, data = await events.get()
+            if event is None:
+                break
+            yield sse_event(event, data)
+        await generation
+    
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+@app.post("/jobs", response_model=JobSubmitted, status_code=202)
+async def submit_job(request: GenerateRequest):
+    """
+    Queue QA context generation for a GitHub Pull Request URL.
+    
+    Returns at once with a job ID; poll GET /jobs/{id} for progress and the
+    markdown report.
+    """
+    validate_pr_url(request.url)
+    try:
+        job = job_manager.submit(request.url, request.output_file, refresh=request.refresh)
+    except JobQueueFull as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    
+    return JobSubmitted(job_id=job.id, status=job.status.value, status_url=f"/jobs/{job.id}")
+
+@app.get("/jobs/{job_id}", response_model=Job)
+async def get_job(job_id: str):
+    """Report a job's status, stage and progress, and its markdown report once done."""
+    job = job_manager.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Unknown or expired job")
+    return job
+
+@app.delete("/cache/reports")
+async def invalidate_report_cache(url: Optional[str] = None):
+    """Drop the cached reports of one PR, or every cached report when no URL is given."""
+    if generator is None or generator.report_cache is None:
+        raise HTTPException(status_code=404, detail="Report cache is disabled")
+    return {"invalidated": generator.report_cache.invalidate(url)}
+
 if __name__ == "__main__":
     uvicorn.run(
         "server:app",
@@ -1,27 +1,57 @@
 import time
+import asyncio
+import textwrap
+from contextlib import contextmanager
 from datetime import datetime
-from typing import Dict, Any, List
+from typing import Callable, Dict, Any, Iterable, List, Optional
 import weave
 from crewai import Agent, Task, Crew, Process
+from crewai.events import crewai_event_bus
+from crewai.events.types.llm_events import LLMStreamChunkEvent
 from crewai.llm import LLM
 
 from src.config import config
-from src.models import PRData, DocumentationData, DeploymentInfo, QAReport, TestingScenario, Priority, AgentResult
+from src.models import PRData, DocumentationData, DeploymentInfo, QAReport, TestingScenario, Priority, AgentResult, FileChange
 from src.github_service import GitHubService
+from src.rules import RuleEngine, load_rules
+from src.deployment_probe import DeploymentProber
+from src.stage_executor import stage_executor
+from src.llm_cache import CachedLLM, CompletionCache
+from src.prompt_context import assemble_prompt_context
+from src.task_graph import TaskGraph
+from src.direct_completion import DirectCompletion
+
+# Part of every cached report's key: bump whenever the task prompts below change
+QA_PROMPT_VERSION = "4"
 
 class QAContextAgents:
     """CrewAI agents for generating QA context."""
     
     def __init__(self):
         self.github_service = GitHubService()
+        self.rule_engine = RuleEngine(load_rules(config.qa_rules_file))
         
         # Initialize the LLM with W&B Inference
         self.llm = LLM(
             model=config.model_name,
             base_url=config.openai_base_url,
             api_key=config.openai_api_key,
+            stream=True,  # Calls still return the full text; the chunks are also emitted for live output
         )
         
+        # Identical prompts (unchanged PR, retried runs) are answered from disk
+        self.completion_cache = None
+        if config.llm_cache_enabled:
+            self.completion_cache = CompletionCache(
+                config.llm_cache_dir,
+                max_bytes=config.llm_cache_max_mb * 1024 * 1024,
+                ttl_seconds=config.llm_cache_ttl_hours * 3600,
+            )
+            self.llm = CachedLLM.wrap(self.llm, self.completion_cache)
+        
+        # Single prompt/response tasks skip the agent loop and call the endpoint directly
+        self.direct = DirectCompletion(cache=self.completion_cache) if config.direct_completion_enabled else None
+        
         # Initialize agents
         self.github_collector = self._create_github_collector_agent()
         self.documentation_analyzer = self._create_documentation_analyzer_agent()
@@ -111,6 +141,11 @@ class QAContextAgents:
                 pr_data.repo_name
             )
             
+            try:
+                doc_data.package_readmes = self.github_service.get_nearest_readmes(pr_data)
+            except Exception as e:
+                print(f"Could not fetch package READMEs: {e}")
+            
             result = AgentResult(
                 agent_name="GitHub Collector",
                 success=True,
@@ -129,12 +164,96 @@ class QAContextAgents:
             )
     
     @weave.op()
-    def monitor_deployment(self, pr_url: str) -> AgentResult:
-        """Monitor deployment status and extract deployment information."""
+    async def collect_github_data_async(self, pr_url: str,
+                                        progress: Optional[Callable[[str, float], None]] = None) -> AgentResult:
+        """Collect GitHub PR and repository data without blocking the event loop.
+        
+        progress, if given, hears "github_fetched" once the PR data is in and
+        "docs_fetched" once the documentation is.
+        """
         start_time = time.time()
         
+        async def reported(awaitable, stage, fraction):
+            result = await awaitable
+            if progress:
+                progress(stage, fraction)
+            return result
+        
         try:
-            deployment_info = self.github_service.monitor_deployment_comments(pr_url)
+            pr_data = doc_data = None
+            
+            # One GraphQL round trip covers PR metadata and docs; fall back to REST on failure
+            # Streamed PRs skip GraphQL, which would fetch every patch up front
+            if config.github_use_graphql and not config.stream_pr_diffs:
+                try:
+                    pr_data, doc_data = await reported(
+                        self.github_service.get_pr_context_async(pr_url), "github_fetched", 0.2
+                    )
+                except Exception as e:
+                    print(f"GraphQL fetch failed, falling back to REST: {e}")
+            
+            if pr_data is None:
+                owner, repo_name, _ = self.github_service.parse_pr_url(pr_url)
+                
+                # PR data comes from the async client; documentation still uses the
+                # synchronous service, so run it on a worker thread alongside.
+                # Streaming ingest is synchronous too and goes to a worker thread.
+                if config.stream_pr_diffs:
+                    fetch_pr_data = stage_executor.run("github", self.github_service.get_pr_data, pr_url)
+                else:
+                    fetch_pr_data = self.github_service.get_pr_data_async(pr_url)
+                pr_data, doc_data = await asyncio.gather(
+                    reported(fetch_pr_data, "github_fetched", 0.2),
+                    stage_executor.run("github", self.github_service.get_documentation_data, owner, repo_name)
+                )
+            
+            # In monorepos the READMEs next to the changed code matter more than the root one
+            try:
+                doc_data.package_readmes = await stage_executor.run(
+                    "github", self.github_service.get_nearest_readmes, pr_data
+                )
+            except Exception as e:
+                print(f"Could not fetch package READMEs: {e}")
+            if progress:
+                progress("docs_fetched", 0.3)
+            
+            return AgentResult(
+                agent_name="GitHub Collector",
+                success=True,
+                data={"pr_data": pr_data, "doc_data": doc_data},
+                execution_time=time.time() - start_time
+            )
+            
+        except Exception as e:
+            return AgentResult(
+                agent_name="GitHub Collector",
+                success=False,
+                error=str(e),
+                execution_time=time.time() - start_time
+            )
+    
+    @weave.op()
+    async def monitor_deployment(self, pr_url: str, wait: bool = False) -> AgentResult:
+        """Monitor deployment status and extract deployment information.
+        
+        With wait set, keeps polling (with backoff) until a deployment link
+        shows up or MAX_DEPLOYMENT_WAIT_MINUTES runs out. A link that was
+        found is then probed until the app answers healthy before it is
+        marked ready. The GitHub lookups run on the stage executor and the
+        probe on the caller's loop, so this can run alongside other stages.
+        """
+        start_time = time.time()
+        
+        try:
+            if wait:
+                deployment_info = await stage_executor.run("github", self.github_service.wait_for_deployment, pr_url)
+            else:
+                deployment_info = await stage_executor.run(
+                    "github", self.github_service.monitor_deployment_comments, pr_url
+                )
+            
+            if deployment_info.url and config.deployment_probe_enabled:
+                deployment_info = await DeploymentProber().mark_ready(deployment_info)
             
             result = AgentResult(
                 agent_name="Deployment Monitor",
@@ -154,8 +273,17 @@ class QAContextAgents:
             )
     
     @weave.op()
-    def generate_qa_context(self, pr_title, pr_description, readme_content) -> AgentResult:
-        """Generate comprehensive QA context using CrewAI."""
+    def generate_qa_context(self, pr_title, pr_description, readme_content,
+                            file_changes: Optional[List[FileChange]] = None,
+                            package_readmes: Optional[Dict[str, str]] = None,
+                            on_token: Optional[Callable[[str, str], None]] = None) -> AgentResult:
+        """Generate comprehensive QA context using CrewAI.
+        
+        The analysis prompt gets the PR, its diff hunks and the relevant README
+        sections, assembled to fit the model's token budget. on_token, if
+        given, is called with the task name and each chunk of model output as
+        it arrives (from worker threads).
+        """
         start_time = time.time()    
 
         print("generate_qa_context from agents.py")
@@ -166,16 +294,22 @@ class QAContextAgents:
             print(f"PR Description: {pr_description}")
             print(f"README length: {len(readme_content) if readme_content else 0}")
             
+            readmes = {"README.md": readme_content} if readme_content else {}
+            readmes.update(package_readmes or {})
+            prompt_context = assemble_prompt_context(
+                pr_title, pr_description, file_changes or [], readmes, near_changes=package_readmes or ()
+            )
+            print(f"Prompt context: ~{prompt_context.tokens} of {prompt_context.budget} tokens"
+                  + (f", omitted {', '.join(prompt_context.omitted)}" if prompt_context.omitted else ""))
+            
             # Create tasks for the crew with SPECIFIC change information
             analysis_task = Task(
                 description=f"""
-                Analyze the following PR and generate comprehensive QA testing context:
+                Analyze the following PR and generate comprehensive QA testing context.
+                Each block below is tagged with its source; [truncated ...] and [omitted ...]
+                mark context cut to fit the prompt.
                 
-                PR Title: {pr_title}
-                PR Description: {pr_description or "No description provided"}
-                
-                Repository README:
-                {readme_content}
+                {prompt_context.render()}
                 
                 Generate a detailed QA analysis that includes:
                 1. Specific testing focus areas based on the PR changes
@@ -198,7 +332,7 @@ class QAContextAgents:
                 PR Description: {pr_description or "No description provided"}
 
                 Repository Context:
-                {readme_content[:200]}...
+                {(readme_content or "No README available")[:200]}...
                 
                 Create a GitHub comment that:
                 1. Is 2-3 sentences maximum
@@ -209,7 +343,8 @@ class QAContextAgents:
                 Output only the comment text, no extra formatting.
                 """,
                 agent=self.github_comment_generator,
-                expected_output="A concise GitHub comment explaining QA testing scope"
+                expected_output="A concise GitHub comment explaining QA testing scope",
+                context=[]  # Written from the PR alone, not from the analysis
             )
 
             
@@ -267,30 +402,14 @@ class QAContextAgents:
             #     expected_output="Specific application context for the changes made"
             # )
             
-            # Create and run the crew
-            crew = Crew(
-                agents=[self.qa_context_generator, self.github_comment_generator],
-                tasks=[analysis_task, comment_task],
-                process=Process.sequential,
-                verbose=True
-            )
-            
-            result = crew.kickoff()
-
-            # Extract the actual result from CrewAI output
-            if hasattr(result, 'raw'):
-                final_result = result.raw
-            elif hasattr(result, 'tasks_output'):
-                # Get outputs from all tasks
-                task_results = []
-                for task_output in result.tasks_output:
-                    if hasattr(task_output, 'raw'):
-                        task_results.append(task_output.raw)
-                    else:
-                        task_results.append(str(task_output))
-                final_result = "\n\n---\n\n".join(task_results)
-            else:
-                final_result = str(result)
+            # The tasks don't read each other's output, so run them side by side
+            graph = TaskGraph(max_workers=None if config.crew_concurrent_tasks else 1)
+            graph.add("analysis", lambda _: self._kickoff_task(analysis_task))
+            graph.add("comment", lambda _: self._run_single_shot(
+                comment_task, on_token and (lambda text: on_token("comment", text))
+            ))
+            with self._streaming_tokens({"analysis": analysis_task, "comment": comment_task}, on_token):
+                final_result = self._combine_task_outputs(graph.run().values())
             
             print("CrewAI Result:")
             print(final_result)
@@ -310,6 +429,51 @@ class QAContextAgents:
                 execution_time=time.time() - start_time
             )
     
+    def _kickoff_task(self, task: Task) -> Any:
+        """Run one task in its own single-agent crew and return its output."""
+        crew = Crew(agents=[task.agent], tasks=[task], process=Process.sequential, verbose=True)
+        result = crew.kickoff()
+        return result.tasks_output[0] if getattr(result, 'tasks_output', None) else result
+    
+    def _run_single_shot(self, task: Task, on_token: Optional[Callable[[str], None]] = None) -> Any:
+        """Run a one-prompt task directly against the endpoint, or through a crew when that's off."""
+        if self.direct is None:
+            return self._kickoff_task(task)
+        agent = task.agent
+        result = self.direct.complete(
+            system=f"You are a {agent.role}. {agent.backstory}\nYour goal: {agent.goal}",
+            prompt=textwrap.dedent(task.description).strip(),
+            on_token=on_token,
+        )
+        print(f"{agent.role}: {result.completion_tokens} tokens in {result.latency:.2f}s"
+              + (" (cached)" if result.cached else ""))
+        return result.text
+    
+    @contextmanager
+    def _streaming_tokens(self, tasks: Dict[str, Task], on_token: Optional[Callable[[str, str], None]]):
+        """Forward the LLM stream chunks of these tasks' crews to on_token(task name, text)."""
+        if on_token is None:
+            yield
+            return
+        names = {str(task.id): name for name, task in tasks.items()}
+        
+        def forward(source, event):
+            name = names.get(getattr(event, "task_id", None))
+            if name and event.chunk and event.tool_call is None:
+                on_token(name, event.chunk)
+        
+        crewai_event_bus.on(LLMStreamChunkEvent)(forward)
+        try:
+            yield
+        finally:
+            crewai_event_bus.off(LLMStreamChunkEvent, forward)
+    
+    def _combine_task_outputs(self, outputs: Iterable[Any]) -> str:
+        """Join task outputs, in task order, into the combined QA context."""
+        return "\n\n---\n\n".join(
+            output.raw if hasattr(output, 'raw') else str(output) for output in outputs
+        )
+    
     @weave.op()
     def create_readme_summary(self, readme_content: str) -> AgentResult:
         """Simple function to create a README summary using CrewAI - for testing."""
@@ -337,23 +501,9 @@ class QAContextAgents:
                 expected_output="A concise summary of the README content"
             )
             
-            # Create and run the crew with just one agent and one task
-            crew = Crew(
-                agents=[self.documentation_analyzer],
-                tasks=[summary_task],
-                process=Process.sequential,
-                verbose=True
-            )
-            
-            result = crew.kickoff()
-            
-            # Extract the result
-            if hasattr(result, 'raw'):
-                final_result = result.raw
-            elif hasattr(result, 'tasks_output') and result.tasks_output:
-                final_result = result.tasks_output[0].raw if hasattr(result.tasks_output[0], 'raw') else str(result.tasks_output[0])
-            else:
-                final_result = str(result)
+            # One agent, one task: a direct completion unless that's disabled
+            result = self._run_single_shot(summary_task)
+            final_result = result.raw if hasattr(result, 'raw') else str(result)
             
             print("README Summary Result:")
             print(final_result)
@@ -382,17 +532,12 @@ class QAContextAgents:
             changes.append(f"   Status: {file_change.status}")
             changes.append(f"   Changes: +{file_change.additions} -{file_change.deletions} lines")
             
-            if file_change.patch:
+            if file_change.has_patch:
                 changes.append(f"   Code changes:")
                 # Extract meaningful changes from patch
-                lines = file_change.patch.split('\n')
-                for line in lines:
-                    if line.startswith('+++') or line.startswith('---'):
-                        continue
-                    if line.startswith('+') and not line.startswith('+++'):
-                        changes.append(f"     ADDED: {line[1:].strip()}")
-                    elif line.startswith('-') and not line.startswith('---'):
-                        changes.append(f"     REMOVED: {line[1:].strip()}")
+                for marker, _, text in file_change.parsed_patch().iter_changes():
+                    label = "ADDED" if marker == '+' else "REMOVED"
+                    changes.append(f"     {label}: {text.strip()}")
         
         return '\n'.join(changes)
     
@@ -400,106 +545,23 @@ class QAContextAgents:
         """Generate focus areas based on actual code changes."""
         focus_areas = []
         
-        # Analyze the actual changes to determine focus areas
-        for file_change in pr_data.file_changes:
-            # Check file type and content
-            if file_change.patch:
-                patch_content = file_change.patch.lower()
-                
-                # Look for specific UI/UX changes
-                if any(keyword in patch_content for keyword in ['emoji', '✅', '❌', '🟢', '🔴']):
-                    focus_areas.append("Emoji/Icon Display")
-                if any(keyword in patch_content for keyword in ['align', 'text-align', 'monospace', 'font-family']):
-                    focus_areas.append("Text Formatting and Alignment")
-                if any(keyword in patch_content for keyword in ['table', 'th', 'td', 'tr']):
-                    focus_areas.append("Table Display and Readability")
-                if any(keyword in patch_content for keyword in ['yes', 'no', 'true', 'false']):
-                    focus_areas.append("Boolean Value Display")
-                if any(keyword in patch_content for keyword in ['number', 'digit', 'numeric']):
-                    focus_areas.append("Numeric Value Display")
-                if any(keyword in patch_content for keyword in ['css', 'style', 'class']):
-                    focus_areas.append("Visual Styling Changes")
-                if any(keyword in patch_content for keyword in ['responsive', 'mobile', 'width']):
-                    focus_areas.append("Responsive Design")
-            
-            # Fallback to generic categories
-            if any(ui_indicator in file_change.filename.lower() for ui_indicator in ['component', 'ui', 'view', 'page', 'template']):
-                focus_areas.append("User Interface Changes")
-            elif any(style_indicator in file_change.filename.lower() for style_indicator in ['css', 'scss', 'style']):
-                focus_areas.append("Visual Styling Changes")
+        # One scan of the PR against the compiled rule table
+        for rule in self.rule_engine.match(pr_data):
+            if rule.get("focus_area") and rule["focus_area"] not in focus_areas:
+                focus_areas.append(rule["focus_area"])
         
-        # Remove duplicates and ensure we have at least one focus area
-        unique_areas = list(set(focus_areas))
-        return unique_areas if unique_areas else ["User Interface Changes"]
+        # Ensure we have at least one focus area
+        return focus_areas if focus_areas else ["User Interface Changes"]
     
     def _generate_specific_scenarios(self, pr_data: PRData, priority: Priority) -> List[TestingScenario]:
         """Generate specific testing scenarios based on actual changes."""
         scenarios = []
         
-        # Analyze PR title and description for specific changes
-        title_lower = pr_data.title.lower()
-        description_lower = (pr_data.description or "").lower()
-        
-        # Look for specific changes mentioned in PR
-        if "table" in title_lower or "readability" in title_lower:
-            scenarios.append(TestingScenario(
-                title="Table Readability Verification",
-                description="Verify that table readability improvements have been implemented correctly",
-                steps=[
-                    "Navigate to the application (deployed URL or local setup)",
-                    "Find pages with tables",
-                    "Check if Yes/No values are displayed as emojis (✅/❌)",
-                    "Verify that numeric values are right-aligned and monospaced",
-                    "Check table formatting across different screen sizes",
-                    "Compare before/after readability"
-                ],
-                expected_outcome="Tables display improved readability with emoji indicators and proper number formatting",
-                priority=priority
-            ))
-        
-        # Check for emoji-related changes
-        has_emoji_changes = any(
-            file_change.patch and any(emoji in file_change.patch for emoji in ['✅', '❌', '🟢', '🔴', 'emoji'])
-            for file_change in pr_data.file_changes
-        )
-        
-        if has_emoji_changes:
-            scenarios.append(TestingScenario(
-                title="Emoji Display Testing",
-                description="Test that emoji replacements for Yes/No values work correctly",
-                steps=[
-                    "Open the application in your browser",
-                    "Find sections where Yes/No values are displayed",
-                    "Verify Yes values show as ✅ or appropriate emoji",
-                    "Verify No values show as ❌ or appropriate emoji",
-                    "Test emoji display across different browsers",
-                    "Check emoji accessibility (screen readers)"
-                ],
-                expected_outcome="Yes/No values are consistently displayed as appropriate emojis",
-                priority=priority
-            ))
-        
-        # Check for number formatting changes
-        has_number_formatting = any(
-            file_change.patch and any(keyword in file_change.patch.lower() for keyword in ['monospace', 'text-align', 'right', 'font-family'])
-            for file_change in pr_data.file_changes
-        )
-        
-        if has_number_formatting:
-            scenarios.append(TestingScenario(
-                title="Number Formatting Verification",
-                description="Test that numeric values are properly formatted for comparison",
-                steps=[
-                    "Access the application",
-                    "Navigate to sections with numeric data",
-                    "Verify numbers are displayed in monospace font",
-                    "Check that numbers are right-aligned",
-                    "Test with different number formats (integers, decimals, percentages)",
-                    "Verify alignment consistency across different data"
-                ],
-                expected_outcome="Numeric values are consistently monospaced and right-aligned for easy comparison",
-                priority=priority
-            ))
+        # Scenario templates whose rules matched the PR title or changes
+        for rule in self.rule_engine.match(pr_data):
+            template = rule.get("scenario")
+            if template:
+                scenarios.append(TestingScenario(**{"priority": priority, **template}))
         
         # Add visual regression test
         scenarios.append(TestingScenario(
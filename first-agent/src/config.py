@@ -16,7 +16,72 @@ class Config:
         self.wandb_project = os.getenv("WANDB_PROJECT")
         
         # GitHub Configuration
-        self.github_token = os.getenv("GITHUB_TOKEN")
+        # A pool of tokens (GITHUB_TOKENS, comma-separated) spreads requests across several quotas
+        self.github_tokens = [
+            token.strip()
+            for token in [os.getenv("GITHUB_TOKEN", "")] + os.getenv("GITHUB_TOKENS", "").split(",")
+            if token.strip()
+        ]
+        self.github_token = self.github_tokens[0] if self.github_tokens else None
+        self.github_api_url = os.getenv("GITHUB_API_URL", "https://api.github.com")
+        self.github_graphql_url = os.getenv("GITHUB_GRAPHQL_URL", self._default_graphql_url(self.github_api_url))
+        self.github_use_graphql = os.getenv("GITHUB_USE_GRAPHQL", "true").lower() == "true"
+        self.github_max_connections = int(os.getenv("GITHUB_MAX_CONNECTIONS", "20"))
+        self.github_requests_per_second = float(os.getenv("GITHUB_REQUESTS_PER_SECOND", "10"))
+        self.github_burst = int(os.getenv("GITHUB_BURST", "20"))
+        self.github_max_queue_wait_seconds = float(os.getenv("GITHUB_MAX_QUEUE_WAIT_SECONDS", "900"))
+        self.github_rate_limit_retries = int(os.getenv("GITHUB_RATE_LIMIT_RETRIES", "3"))
+        self.github_cache_enabled = os.getenv("GITHUB_CACHE_ENABLED", "true").lower() == "true"
+        self.github_cache_dir = os.path.expanduser(os.getenv("GITHUB_CACHE_DIR", "~/.cache/qa-context-generator/github"))
+        self.github_cache_max_mb = int(os.getenv("GITHUB_CACHE_MAX_MB", "256"))
+        
+        # Documentation cache, keyed by default-branch tree SHA
+        self.doc_cache_dir = os.path.expanduser(os.getenv("DOC_CACHE_DIR", "~/.cache/qa-context-generator/docs"))
+        self.doc_cache_memory_entries = int(os.getenv("DOC_CACHE_MEMORY_ENTRIES", "128"))
+        self.doc_cache_disk_entries = int(os.getenv("DOC_CACHE_DISK_ENTRIES", "1024"))
+        self.max_package_readmes = int(os.getenv("MAX_PACKAGE_READMES", "5"))
+        
+        # Bulk documentation ingest: stream the repo tarball once, keep only doc files
+        self.docs_bulk_ingest = os.getenv("DOCS_BULK_INGEST", "false").lower() == "true"
+        self.docs_archive_dir = os.path.expanduser(os.getenv("DOCS_ARCHIVE_DIR", "~/.cache/qa-context-generator/archives"))
+        self.docs_archive_max_mb = int(os.getenv("DOCS_ARCHIVE_MAX_MB", "512"))
+        self.docs_archive_max_file_kb = int(os.getenv("DOCS_ARCHIVE_MAX_FILE_KB", "1024"))
+        
+        # Streaming diff ingest for very large PRs: patches are read page by page,
+        # truncated ones are recovered from the raw .diff, and only a bounded
+        # amount of patch text is kept in memory
+        self.stream_pr_diffs = os.getenv("STREAM_PR_DIFFS", "false").lower() == "true"
+        self.stream_patch_max_kb = int(os.getenv("STREAM_PATCH_MAX_KB", "512"))
+        self.stream_patch_budget_kb = int(os.getenv("STREAM_PATCH_BUDGET_KB", "4096"))
+        
+        # Extra focus-area/scenario rules (JSON list) appended to the built-in rule table
+        self.qa_rules_file = os.getenv("QA_RULES_FILE") or None
+        
+        # GitHub webhooks: deliveries are rejected unless signed with this secret
+        self.github_webhook_secret = os.getenv("GITHUB_WEBHOOK_SECRET") or None
+        
+        # Report jobs (POST /jobs): worker pool size, queue bound and how long results are kept
+        self.job_workers = int(os.getenv("JOB_WORKERS", "2"))
+        self.job_max_queued = int(os.getenv("JOB_MAX_QUEUED", "100"))
+        self.job_result_ttl_seconds = float(os.getenv("JOB_RESULT_TTL_SECONDS", "3600"))
+        
+        # Blocking GitHub/CrewAI work runs on a bounded thread pool, with a concurrency cap per stage
+        self.executor_max_workers = int(os.getenv("EXECUTOR_MAX_WORKERS", "16"))
+        self.github_stage_concurrency = int(os.getenv("GITHUB_STAGE_CONCURRENCY", "8"))
+        self.llm_stage_concurrency = int(os.getenv("LLM_STAGE_CONCURRENCY", "4"))
+        
+        # Final QA reports cached by PR head SHA, model and prompt version (memory LRU + SQLite)
+        self.report_cache_enabled = os.getenv("REPORT_CACHE_ENABLED", "true").lower() == "true"
+        self.report_cache_path = os.path.expanduser(os.getenv("REPORT_CACHE_PATH", "~/.cache/qa-context-generator/reports.sqlite3"))
+        self.report_cache_memory_entries = int(os.getenv("REPORT_CACHE_MEMORY_ENTRIES", "256"))
+        self.report_cache_max_entries = int(os.getenv("REPORT_CACHE_MAX_ENTRIES", "5000"))
+        self.report_cache_ttl_hours = float(os.getenv("REPORT_CACHE_TTL_HOURS", "168"))
+        
+        # On-disk cache of LLM completions keyed by model, parameters and messages
+        self.llm_cache_enabled = os.getenv("LLM_CACHE_ENABLED", "true").lower() == "true"
+        self.llm_cache_dir = os.path.expanduser(os.getenv("LLM_CACHE_DIR", "~/.cache/qa-context-generator/llm"))
+        self.llm_cache_max_mb = int(os.getenv("LLM_CACHE_MAX_MB", "128"))
+        self.llm_cache_ttl_hours = float(os.getenv("LLM_CACHE_TTL_HOURS", "168"))
         
         # OpenAI Configuration
         self.openai_api_key = os.getenv("OPENAI_API_KEY")
@@ -24,8 +89,20 @@ class Config:
         
         # Application Configuration
         self.model_name = os.getenv("MODEL_NAME", "meta-llama/Llama-3.1-8B-Instruct")
+        # Run crew tasks that don't depend on each other concurrently instead of one after another
+        self.crew_concurrent_tasks = os.getenv("CREW_CONCURRENT_TASKS", "true").lower() == "true"
+        # Single-shot tasks (PR comment, README summary) call the endpoint directly instead of through CrewAI
+        self.direct_completion_enabled = os.getenv("DIRECT_COMPLETION_ENABLED", "true").lower() == "true"
+        self.direct_completion_max_tokens = int(os.getenv("DIRECT_COMPLETION_MAX_TOKENS", "300"))
+        # Token budget for PR context in the analysis prompt (capped by the model's context window)
+        self.prompt_context_tokens = int(os.getenv("PROMPT_CONTEXT_TOKENS", "6000"))
         self.max_deployment_wait_minutes = int(os.getenv("MAX_DEPLOYMENT_WAIT_MINUTES", "10"))
         self.min_comments_for_deployment = int(os.getenv("MIN_COMMENTS_FOR_DEPLOYMENT", "2"))
+        # PRs whose deployment lookup state (head commit, comment scan position) is kept
+        self.deployment_watcher_max_prs = int(os.getenv("DEPLOYMENT_WATCHER_MAX_PRS", "256"))
+        # Readiness probing of discovered deployment URLs
+        self.deployment_probe_enabled = os.getenv("DEPLOYMENT_PROBE_ENABLED", "true").lower() == "true"
+        self.deployment_probe_timeout_seconds = float(os.getenv("DEPLOYMENT_PROBE_TIMEOUT_SECONDS", "300"))
         
         # Validate required configs
         self._validate_config()
@@ -36,7 +113,7 @@ class Config:
             ("WANDB_API_KEY", self.wandb_api_key),
             ("WANDB_TEAM", self.wandb_team),
             ("WANDB_PROJECT", self.wandb_project),
-            ("GITHUB_TOKEN", self.github_token),
+            ("GITHUB_TOKEN or GITHUB_TOKENS", self.github_token),
             ("OPENAI_API_KEY", self.openai_api_key),
         ]
         
@@ -45,6 +122,14 @@ class Config:
         if missing_configs:
             raise ValueError(f"Missing required environment variables: {', '.join(missing_configs)}")
     
+    @staticmethod
+    def _default_graphql_url(api_url: str) -> str:
+        """Derive the GraphQL endpoint from the REST base URL (GitHub Enterprise uses /api/graphql)."""
+        api_url = api_url.rstrip("/")
+        if api_url.endswith("/api/v3"):
+            return api_url[:-len("/v3")] + "/graphql"
+        return api_url + "/graphql"
+    
     def initialize_weave(self):
         """Initialize W&B Weave for observability."""
         project_name = f"{self.wandb_team}/{self.wandb_project}"
@@ -0,0 +1,90 @@
+import asyncio
+import random
+import time
+from typing import List, Optional
+
+import aiohttp
+from pydantic import BaseModel
+
+from src.config import config
+from src.models import DeploymentInfo
+
+# Status codes that mean the app itself is answering. Protected previews
+# (Vercel deployment protection, basic auth) answer 401/403 once they're up.
+HEALTHY_STATUSES = set(range(200, 400)) | {401, 403}
+
+class ProbeResult(BaseModel):
+    """Outcome of probing one deployment URL until it answered healthy or time ran out."""
+    url: str
+    ready: bool = False
+    status_code: Optional[int] = None  # Last response status, None if nothing answered
+    attempts: int = 0
+    time_to_ready: Optional[float] = None  # Seconds from the first probe to the healthy response
+    error: Optional[str] = None  # Last connection error
+
+class DeploymentProber:
+    """Probes deployment URLs concurrently until they answer healthy.
+
+    Fresh previews on fly.io or Vercel often refuse connections or return
+    5xx/404 while the app boots. Each URL is tried with HEAD (switching to GET
+    when the app doesn't allow HEAD) on one keep-alive session, backing off
+    exponentially with jitter so many previews don't retry in lockstep.
+    """
+
+    def __init__(self, timeout: Optional[float] = None, initial_interval: float = 1.0,
+                 max_interval: float = 15.0, request_timeout: float = 10.0):
+        self.timeout = config.deployment_probe_timeout_seconds if timeout is None else timeout
+        self.initial_interval = initial_interval
+        self.max_interval = max_interval
+        self.request_timeout = request_timeout
+
+    async def probe_many(self, urls: List[str]) -> List[ProbeResult]:
+        """Probe every URL at once; results come back in input order."""
+        connector = aiohttp.TCPConnector(limit=0, keepalive_timeout=60)
+        async with aiohttp.ClientSession(
+            connector=connector,
+            timeout=aiohttp.ClientTimeout(total=self.request_timeout),
+        ) as session:
+            return list(await asyncio.gather(*(self._probe(session, url) for url in urls)))
+
+    async def probe(self, url: str) -> ProbeResult:
+        return (await self.probe_many([url]))[0]
+
+    async def mark_ready(self, deployment: DeploymentInfo) -> DeploymentInfo:
+        """Probe a deployment's URL and record whether and when it became ready."""
+        if not deployment.url:
+            return deployment
+        result = await self.probe(str(deployment.url))
+        deployment.ready = result.ready
+        deployment.time_to_ready = result.time_to_ready
+        return deployment
+
+    async def _probe(self, session: aiohttp.ClientSession, url: str) -> ProbeResult:
+        result = ProbeResult(url=url)
+        method = "HEAD"
+        start = time.monotonic()
+        deadline = start + self.timeout
+        interval = self.initial_interval
+
+        while True:
+            result.attempts += 1
+            try:
+                async with session.request(method, url, allow_redirects=True) as response:
+                    result.status_code = response.status
+                    result.error = None
+                    if method == "HEAD" and response.status in (405, 501):
+                        method = "GET"
+                        continue
+                    if response.status in HEALTHY_STATUSES:
+                        result.ready = True
+                        result.time_to_ready = time.monotonic() - start
+                        return result
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                result.error = str(e) or type(e).__name__
+
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return result
+            # Equal jitter: at least half the interval, never past the deadline
+            await asyncio.sleep(min(interval / 2 + random.uniform(0, interval / 2), remaining))
+            interval = min(interval * 2, self.max_interval)
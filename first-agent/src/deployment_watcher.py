@@ -0,0 +1,188 @@
+import re
+import time
+from datetime import datetime
+from typing import Dict, Optional
+
+from src.config import config
+from src.github_client import GitHubClient
+from src.models import DeploymentInfo
+
+# One pass per comment finds the first preview URL of any supported provider;
+# the named group that matched tells which provider it was. The path stops at
+# characters that close markdown links and tables, which deploy bots post in
+DEPLOYMENT_URL_PATTERN = re.compile(
+    r'https://[^/\s]+\.(?:(?P<fly>fly\.dev)|(?P<vercel>vercel\.app)|(?P<netlify>netlify\.app)|(?P<heroku>herokuapp\.com))[^\s)\]>|"\']*'
+)
+
+PROVIDERS = {"fly": "fly.io", "vercel": "vercel", "netlify": "netlify", "heroku": "heroku"}
+
+def parse_timestamp(value: str) -> datetime:
+    """Parse a GitHub ISO-8601 timestamp such as 2024-01-01T12:00:00Z."""
+    return datetime.fromisoformat(value.replace('Z', '+00:00'))
+
+def deployment_from_comment(body: Optional[str], created_at: str) -> Optional[DeploymentInfo]:
+    """DeploymentInfo for the first preview URL in a comment body, if any."""
+    match = DEPLOYMENT_URL_PATTERN.search(body or "")
+    if not match:
+        return None
+    return DeploymentInfo(
+        url=match.group(0),
+        status="deployed",
+        deployment_time=parse_timestamp(created_at),
+        provider=PROVIDERS[match.lastgroup],
+    )
+
+def deployment_from_status(deployment: dict, status: dict) -> DeploymentInfo:
+    """DeploymentInfo from a GitHub deployment and one of its statuses."""
+    url = status.get("environment_url") or status.get("target_url") or None
+    match = DEPLOYMENT_URL_PATTERN.match(url or "")
+    creator = (status.get("creator") or deployment.get("creator") or {}).get("login")
+    state = status.get("state")
+    return DeploymentInfo(
+        url=url,
+        environment=deployment.get("environment") or "unknown",
+        version=deployment.get("sha"),
+        status="deployed" if state == "success" else "failed" if state in ("failure", "error") else "pending",
+        deployment_time=parse_timestamp(status.get("created_at") or deployment["created_at"]),
+        provider=PROVIDERS[match.lastgroup] if match else creator,
+    )
+
+def deployment_from_commit_status(sha: str, status: dict) -> DeploymentInfo:
+    """DeploymentInfo from a commit status whose target URL is a preview deployment."""
+    url = status["target_url"]
+    match = DEPLOYMENT_URL_PATTERN.match(url)
+    return DeploymentInfo(
+        url=url,
+        environment=status.get("context") or "unknown",
+        version=sha,
+        status="deployed",
+        deployment_time=parse_timestamp(status.get("updated_at") or status["created_at"]),
+        provider=PROVIDERS[match.lastgroup] if match else None,
+    )
+
+class DeploymentWatcher:
+    """Finds the preview deployment of one PR.
+
+    Each poll first asks for deployments of the PR head commit and their
+    latest status, then for the commit's statuses: providers that report
+    through GitHub say where and when they deployed in one or two small
+    calls. Only when neither has a live URL are the PR comments scanned.
+
+    The comment scan is incremental. The watcher remembers the newest comment
+    update it has seen and asks GitHub only for comments updated since then,
+    so each poll transfers just the new or edited comments. Edits matter:
+    deploy bots often update their first comment once the preview is live.
+
+    A found deployment belongs to the head commit it was found for. When the
+    PR head moves, the next poll forgets it and looks again, so a new push
+    is never answered with the previous commit's preview.
+    """
+
+    def __init__(self, client: GitHubClient, owner: str, repo_name: str, pr_number: int):
+        self.client = client
+        self.repo_path = f"/repos/{owner}/{repo_name}"
+        self.pull_path = f"{self.repo_path}/pulls/{pr_number}"
+        self.comments_path = f"{self.repo_path}/issues/{pr_number}/comments"
+        self.since: Optional[str] = None
+        self.deployment_info = DeploymentInfo()
+        self.head_sha: Optional[str] = None  # Head commit deployment_info was looked up for
+        self.polls = 0
+        self.bot_comments = 0
+        self._seen: Dict[int, str] = {}  # comment id -> updated_at already scanned
+
+    def poll(self, head_sha: Optional[str] = None) -> DeploymentInfo:
+        """Look up deployments of the head commit, then scan comments created or edited since the last poll.
+
+        The head SHA is read from the PR unless the caller already knows it.
+        A deployment found earlier is returned only while the head is unchanged.
+        """
+        if head_sha is None:
+            try:
+                head_sha = self.client.get_json(self.pull_path)["head"]["sha"]
+            except Exception as e:
+                print(f"Could not read the PR head, falling back to comments: {e}")
+        if head_sha is not None and head_sha != self.head_sha:
+            # New commits replace the preview; comments already scanned stay
+            # scanned, so only new or edited ones can name the new deployment
+            self.head_sha = head_sha
+            self.deployment_info = DeploymentInfo()
+
+        if self.deployment_info.url:
+            return self.deployment_info
+
+        deployment = None
+        if head_sha is not None:
+            try:
+                deployment = self.find_commit_deployment(head_sha)
+            except Exception as e:
+                print(f"Could not read deployments, falling back to comments: {e}")
+        if deployment is not None:
+            self.deployment_info = deployment
+            return deployment
+
+        params = {"since": self.since} if self.since else None
+        comments = self.client.get_paginated(self.comments_path, params=params)
+        self.polls += 1
+
+        for comment in comments:
+            updated_at = comment.get("updated_at") or comment["created_at"]
+            # `since` is inclusive, so the newest comment of the last poll comes back
+            if self._seen.get(comment["id"]) == updated_at:
+                continue
+            if comment["id"] not in self._seen and (comment.get("user") or {}).get("type") == "Bot":
+                self.bot_comments += 1
+            self._seen[comment["id"]] = updated_at
+            if self.since is None or updated_at > self.since:
+                self.since = updated_at
+
+            if not self.deployment_info.url:
+                self.deployment_info = deployment_from_comment(comment["body"], comment["created_at"]) or self.deployment_info
+
+        return self.deployment_info
+
+    def find_commit_deployment(self, sha: str) -> Optional[DeploymentInfo]:
+        """Live deployment of a commit from the Deployments API or commit statuses, if any."""
+        for deployment in self.client.get_json(f"{self.repo_path}/deployments", params={"sha": sha, "per_page": 5}):
+            # Statuses come newest first; older ones of a redeploy don't matter
+            statuses = self.client.get_json(
+                f"{self.repo_path}/deployments/{deployment['id']}/statuses", params={"per_page": 1}
+            )
+            if statuses and statuses[0]["state"] == "success":
+                info = deployment_from_status(deployment, statuses[0])
+                if info.url:
+                    return info
+
+        # Providers without Deployments support still link their preview from a commit status;
+        # statuses pointing elsewhere (CI logs, dashboards) are skipped
+        combined = self.client.get_json(f"{self.repo_path}/commits/{sha}/status")
+        for status in combined.get("statuses", []):
+            if status["state"] == "success" and DEPLOYMENT_URL_PATTERN.match(status.get("target_url") or ""):
+                return deployment_from_commit_status(sha, status)
+        return None
+
+    def wait(self, max_wait_minutes: Optional[float] = None, initial_interval: float = 5.0,
+             max_interval: float = 60.0, head_sha: Optional[str] = None) -> DeploymentInfo:
+        """Poll with exponential backoff until a link appears or the wait runs out.
+
+        Gives up early once deploy bots have posted MIN_COMMENTS_FOR_DEPLOYMENT
+        comments without a link: the PR most likely has no preview deployment.
+        """
+        if max_wait_minutes is None:
+            max_wait_minutes = config.max_deployment_wait_minutes
+        deadline = time.monotonic() + max_wait_minutes * 60
+        interval = initial_interval
+
+        while True:
+            info = self.poll(head_sha)
+            if info.url:
+                return info
+            if self.bot_comments >= config.min_comments_for_deployment:
+                info.status = "not_found"
+                return info
+
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                info.status = "timeout"
+                return info
+            time.sleep(min(interval, remaining))
+            interval = min(interval * 2, max_interval)
@@ -0,0 +1,164 @@
+import re
+from typing import Iterator, List, Optional, Tuple
+
+from src.patch_arena import PatchArena
+
+HUNK_HEADER_PATTERN = re.compile(rb'@@ -(\d+)(?:,(\d+))? \+(\d+)(?:,(\d+))? @@ ?(.*)$', re.MULTILINE)
+# Headers after the first line; the literal prefix lets the regex engine skip ahead with a fast search
+NEXT_HUNK_HEADER_PATTERN = re.compile(b'\n' + HUNK_HEADER_PATTERN.pattern, re.MULTILINE)
+
+# An added or removed line of a hunk body, which starts at the newline ending the header
+CHANGED_LINE_PATTERN = re.compile(rb'\n[+-]([^\n]*)')
+
+ChangedLine = Tuple[str, int, str]  # ('+' or '-', line number in the new/old file, text)
+
+class DiffHunk:
+    """One `@@` section of a patch: its header, line stats and where its body sits in the arena.
+
+    Only the header fields and two byte offsets are kept. The body lines are
+    decoded from the arena each time they are asked for, so a parse held for
+    the life of a PR costs a few ints per hunk rather than a copy of the diff.
+    """
+
+    __slots__ = ("old_start", "old_count", "new_start", "new_count", "section",
+                 "additions", "deletions", "_arena", "_start", "_end")
+
+    def __init__(self, old_start: int, old_count: int, new_start: int, new_count: int, section: str,
+                 arena: PatchArena, start: int, end: int):
+        self.old_start = old_start
+        self.old_count = old_count
+        self.new_start = new_start
+        self.new_count = new_count
+        self.section = section  # Text after the closing @@, usually the enclosing function
+        # Body bytes run from the newline that ends the header up to the next header or the patch end
+        self._arena = arena
+        self._start = start
+        self._end = end
+        self.additions = arena.count(b'\n+', start, end)
+        self.deletions = arena.count(b'\n-', start, end)
+
+    @property
+    def nbytes(self) -> int:
+        """UTF-8 size of the body; no line decoded from it is longer, so it bounds rendered text."""
+        return self._end - self._start
+
+    @property
+    def new_range(self) -> Tuple[int, int]:
+        return self.new_start, self.new_start + max(self.new_count - 1, 0)
+
+    @property
+    def old_range(self) -> Tuple[int, int]:
+        return self.old_start, self.old_start + max(self.old_count - 1, 0)
+
+    def changed_lines(self, marker: str, limit: Optional[int] = None) -> List[str]:
+        """Text of the lines starting with marker ('+' or '-'), decoding only those lines."""
+        found = []
+        needle = b'\n' + marker.encode()
+        position = self._arena.find(needle, self._start, self._end)
+        while position != -1 and (limit is None or len(found) < limit):
+            line_end = self._arena.find(b'\n', position + 1, self._end)
+            if line_end == -1:
+                line_end = self._end
+            found.append(self._arena.decode(position + 2, line_end))
+            position = self._arena.find(needle, line_end, self._end)
+        return found
+
+    def changed_bytes(self) -> List[bytes]:
+        """Raw UTF-8 text of the added and removed lines, copied out of the arena without decoding."""
+        return self._arena.findall(CHANGED_LINE_PATTERN, self._start, self._end)
+
+    def text(self) -> str:
+        """The body under the header, decoded in one go."""
+        return self._arena.decode(self._start + 1, self._end) if self._end > self._start else ''
+
+    def lines(self) -> List[str]:
+        return self.text().split('\n') if self._end > self._start else []
+
+    @property
+    def changes(self) -> List[ChangedLine]:
+        """Added and removed lines numbered by file position, in order. Decoded per call, not kept."""
+        changes = []
+        old_line, new_line = self.old_start, self.new_start
+        for line in self.lines():
+            marker = line[:1]
+            if marker == '+':
+                changes.append(('+', new_line, line[1:]))
+                new_line += 1
+            elif marker == '-':
+                changes.append(('-', old_line, line[1:]))
+                old_line += 1
+            elif marker == ' ' or marker == '':
+                old_line += 1
+                new_line += 1
+            # "\ No newline at end of file" advances neither side
+        return changes
+
+class ParsedPatch:
+    """The hunks of one file's patch. Line text stays in the arena until a consumer reads it."""
+
+    __slots__ = ("hunks",)
+
+    def __init__(self, hunks: Optional[List[DiffHunk]] = None):
+        self.hunks: List[DiffHunk] = hunks or []
+
+    @property
+    def additions(self) -> int:
+        return sum(hunk.additions for hunk in self.hunks)
+
+    @property
+    def deletions(self) -> int:
+        return sum(hunk.deletions for hunk in self.hunks)
+
+    def iter_changes(self) -> Iterator[ChangedLine]:
+        """Every added and removed line across hunks, in patch order, decoding one hunk at a time."""
+        for hunk in self.hunks:
+            yield from hunk.changes
+
+    def changed_lines(self, marker: str, limit: Optional[int] = None) -> List[str]:
+        """Text of the lines with the given marker ('+' or '-'); hunks past the limit stay undecoded."""
+        found = []
+        for hunk in self.hunks:
+            if limit is not None and len(found) >= limit:
+                break
+            found.extend(hunk.changed_lines(marker, None if limit is None else limit - len(found)))
+        return found
+
+    def changed_bytes(self) -> bytes:
+        """Added and removed lines joined into one lowercase UTF-8 string, for keyword scans.
+
+        Nothing is decoded; bytes.lower() folds ASCII letters only, which is
+        what the rule keywords are written in.
+        """
+        return b'\n'.join(
+            text for hunk in self.hunks if hunk.additions or hunk.deletions for text in hunk.changed_bytes()
+        ).lower()
+
+def parse_arena_patch(arena: PatchArena, handle: int) -> ParsedPatch:
+    """Find the hunks of a patch stored in an arena without decoding it.
+
+    The header pattern runs over the shared buffer in place and changed lines
+    are counted per hunk with a byte count, so only the headers are copied
+    out. Lines before the first header (file headers of raw diffs) are skipped.
+    """
+    start, end = arena.span(handle)
+    first = arena.match(HUNK_HEADER_PATTERN, start, end)
+    matches = ([first] if first else []) + list(arena.finditer(NEXT_HUNK_HEADER_PATTERN, start, end))
+    hunks = []
+    for index, match in enumerate(matches):
+        old_start, old_count, new_start, new_count, section = match.groups()
+        # The body ends at the newline that starts the next header match
+        body_end = matches[index + 1].start() if index + 1 < len(matches) else end
+        hunks.append(DiffHunk(
+            int(old_start), int(old_count) if old_count is not None else 1,
+            int(new_start), int(new_count) if new_count is not None else 1,
+            section.decode('utf-8', errors='replace'),
+            arena, match.end(), body_end,
+        ))
+    return ParsedPatch(hunks)
+
+def parse_patch(patch: Optional[str]) -> ParsedPatch:
+    """Parse a standalone patch string, copied into an arena of its own."""
+    if not patch:
+        return ParsedPatch()
+    arena = PatchArena()
+    return parse_arena_patch(arena, arena.add(patch))
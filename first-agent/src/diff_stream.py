@@ -0,0 +1,95 @@
+import re
+from typing import Iterable, Iterator, List, Optional
+
+from src.models import FileChange
+
+DIFF_HEADER_PATTERN = re.compile(r'^diff --git a/(.*) b/(.*)$')
+
+class _FileDiff:
+    """Accumulates the lines of one file section of a raw diff."""
+
+    def __init__(self, header: str, max_patch_bytes: Optional[int]):
+        match = DIFF_HEADER_PATTERN.match(header)
+        self.filename = match.group(2) if match else header[len('diff --git '):]
+        self.status = "modified"
+        self.additions = 0
+        self.deletions = 0
+        self.max_patch_bytes = max_patch_bytes
+        self.patch_lines: List[str] = []
+        self.patch_bytes = 0  # UTF-8 size of patch_lines, newlines included
+        self.truncated = False  # Set at the first line over the cap; nothing after it is kept
+        self.in_hunks = False
+
+    def feed(self, line: str):
+        if not self.in_hunks:
+            if line.startswith('new file mode'):
+                self.status = "added"
+            elif line.startswith('deleted file mode'):
+                self.status = "removed"
+            elif line.startswith('rename to '):
+                self.status = "renamed"
+                self.filename = line[len('rename to '):]
+            elif line.startswith('+++ b/'):
+                self.filename = line[len('+++ b/'):]
+            elif line.startswith('@@'):
+                self.in_hunks = True
+            if not self.in_hunks:
+                return
+        elif line.startswith('+'):
+            self.additions += 1
+        elif line.startswith('-'):
+            self.deletions += 1
+
+        # Keep counting past the cap so the stats stay exact, but keep no lines
+        # after the first one that doesn't fit: a patch with lines missing from
+        # the middle of a hunk would read as a different change
+        if self.truncated:
+            return
+        line_bytes = len(line.encode('utf-8'))
+        if self.max_patch_bytes is not None and self.patch_bytes + line_bytes > self.max_patch_bytes:
+            self.truncated = True
+            return
+        self.patch_lines.append(line)
+        self.patch_bytes += line_bytes + 1
+
+    def finish(self) -> FileChange:
+        return FileChange(
+            filename=self.filename,
+            additions=self.additions,
+            deletions=self.deletions,
+            changes=self.additions + self.deletions,
+            patch='\n'.join(self.patch_lines) or None,
+            status=self.status
+        )
+
+def split_lines(chunks: Iterable[str]) -> Iterator[str]:
+    """Split streamed text chunks at line feeds only, so carriage returns in patches survive."""
+    pending = ''
+    for chunk in chunks:
+        pending += chunk
+        *lines, pending = pending.split('\n')
+        yield from lines
+    if pending:
+        yield pending
+
+def parse_unified_diff(lines: Iterable[str], max_patch_bytes: Optional[int] = None) -> Iterator[FileChange]:
+    """Parse a raw `git diff` into FileChange objects, yielding each file as soon as it ends.
+
+    Lines are consumed lazily, so only the file currently being parsed is held
+    in memory. Like the REST files API, a patch starts at its first hunk
+    header; patches longer than max_patch_bytes (UTF-8) are cut at the last
+    whole line that fits.
+    """
+    current = None
+    for line in lines:
+        if line.endswith('\n'):
+            line = line[:-1]
+        if line.startswith('diff --git '):
+            if current is not None:
+                yield current.finish()
+            current = _FileDiff(line, max_patch_bytes)
+        elif current is not None:
+            current.feed(line)
+
+    if current is not None:
+        yield current.finish()
@@ -0,0 +1,86 @@
+import time
+from typing import Any, Callable, List, NamedTuple, Optional
+
+from src.config import config
+from src.llm_cache import CompletionCache
+from src.prompt_context import estimate_tokens
+
+class CompletionResult(NamedTuple):
+    """Text and cost of one direct completion."""
+    text: str
+    prompt_tokens: int
+    completion_tokens: int
+    latency: float
+    time_to_first_token: Optional[float]
+    cached: bool = False
+
+class DirectCompletion:
+    """Single-shot prompt/response calls straight to the OpenAI-compatible endpoint.
+
+    For tasks that are one prompt and one answer (the PR comment, README
+    summaries) the CrewAI agent loop only adds its reasoning format, retries
+    and logging. This sends a short system prompt and the task, streams the
+    answer with a tight max_tokens, and shares the on-disk completion cache
+    with the crew's LLM.
+    """
+
+    def __init__(self, client: Any = None, model: Optional[str] = None,
+                 max_tokens: Optional[int] = None, cache: Optional[CompletionCache] = None):
+        self.client = client or config.get_openai_client()
+        self.model = model or config.model_name
+        self.max_tokens = max_tokens or config.direct_completion_max_tokens
+        self.cache = cache
+
+    def complete(self, system: str, prompt: str, max_tokens: Optional[int] = None,
+                 on_token: Optional[Callable[[str], None]] = None) -> CompletionResult:
+        """Stream one completion, passing each text delta to on_token as it arrives."""
+        start = time.perf_counter()
+        max_tokens = max_tokens or self.max_tokens
+        messages = [{"role": "system", "content": system}, {"role": "user", "content": prompt}]
+
+        key = None
+        if self.cache is not None:
+            key = self.cache.make_key(self.model, {"max_tokens": max_tokens, "direct": True}, messages)
+            text = self.cache.get(key)
+            if text is not None:
+                if on_token:
+                    on_token(text)
+                return CompletionResult(text, 0, 0, time.perf_counter() - start, 0.0, cached=True)
+
+        stream = self.client.chat.completions.create(
+            model=self.model,
+            messages=messages,
+            max_tokens=max_tokens,
+            stream=True,
+            stream_options={"include_usage": True},
+        )
+        parts: List[str] = []
+        usage = None
+        first_token_at = None
+        for chunk in stream:
+            if getattr(chunk, "usage", None):
+                usage = chunk.usage
+            if not chunk.choices:
+                continue
+            delta = chunk.choices[0].delta.content
+            if delta:
+                if first_token_at is None:
+                    first_token_at = time.perf_counter()
+                parts.append(delta)
+                if on_token:
+                    on_token(delta)
+
+        text = "".join(parts).strip()
+        if usage is not None:
+            prompt_tokens, completion_tokens = usage.prompt_tokens, usage.completion_tokens
+        else:
+            # Some OpenAI-compatible servers ignore include_usage
+            prompt_tokens = sum(estimate_tokens(message["content"]) for message in messages)
+            completion_tokens = estimate_tokens(text)
+
+        if key is not None and text:
+            self.cache.put(key, self.model, text)
+        return CompletionResult(
+            text, prompt_tokens, completion_tokens, time.perf_counter() - start,
+            first_token_at - start if first_token_at is not None else None,
+        )
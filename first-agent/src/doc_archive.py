@@ -0,0 +1,161 @@
+import os
+import re
+import shutil
+import tarfile
+import threading
+from typing import IO, List, Optional
+
+# Paths worth keeping from a repository archive: markup files anywhere, plus
+# README/CONTRIBUTING style files without an extension
+DOC_PATH_PATTERN = re.compile(
+    r'(\.(md|markdown|mdx|rst|adoc|txt)$)|((^|/)(README|CONTRIBUTING|CHANGELOG|TESTING)[^/]*$)',
+    re.IGNORECASE,
+)
+
+README_NAMES = ("readme.md", "readme.markdown", "readme.rst", "readme.txt", "readme")
+
+# Lists the documentation paths a revision had no room for. DOC_PATH_PATTERN
+# never matches the name, so no archived file can collide with it.
+SKIPPED_MANIFEST = ".skipped"
+
+class DocumentationArchive:
+    """Local extract of the documentation files of a repository revision.
+
+    The repository tarball is streamed once and only documentation paths are
+    written to disk, under <directory>/<owner>/<repo>/<revision>/. Every later
+    lookup for that revision is a local file read. Total disk use is capped
+    by evicting the least recently used revisions. A revision whose docs
+    alone exceed the cap keeps what fits and records the paths it skipped,
+    so readers can tell a missing file from one that was left out.
+    """
+
+    def __init__(self, directory: str, max_bytes: int, max_file_bytes: int):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.max_file_bytes = max_file_bytes
+        self._lock = threading.Lock()
+
+        os.makedirs(self.directory, exist_ok=True)
+
+    def revision_dir(self, owner: str, repo: str, revision: str) -> str:
+        return os.path.join(self.directory, owner, repo, revision)
+
+    def has(self, owner: str, repo: str, revision: str) -> bool:
+        return os.path.isdir(self.revision_dir(owner, repo, revision))
+
+    def is_partial(self, owner: str, repo: str, revision: str) -> bool:
+        """Whether some documentation files of the revision were skipped to stay within max_bytes."""
+        return os.path.isfile(os.path.join(self.revision_dir(owner, repo, revision), SKIPPED_MANIFEST))
+
+    def ingest(self, owner: str, repo: str, revision: str, tarball: IO[bytes]) -> int:
+        """Extract documentation paths from a gzipped tarball stream; returns files kept."""
+        target = self.revision_dir(owner, repo, revision)
+        staging = f"{target}.{threading.get_ident()}.partial"
+        shutil.rmtree(staging, ignore_errors=True)
+        os.makedirs(staging)
+
+        kept = 0
+        kept_bytes = 0
+        skipped: List[str] = []
+        try:
+            with tarfile.open(fileobj=tarball, mode='r|gz') as archive:
+                for member in archive:
+                    if not member.isfile() or member.size > self.max_file_bytes:
+                        continue
+
+                    # GitHub prefixes every entry with an "<owner>-<repo>-<sha>/" directory
+                    _, _, path = member.name.partition('/')
+                    if not path or not DOC_PATH_PATTERN.search(path):
+                        continue
+                    parts = path.split('/')
+                    if any(part in ('', '.', '..') for part in parts):
+                        continue
+                    if kept_bytes + member.size > self.max_bytes:
+                        # Later, smaller files may still fit
+                        skipped.append(path)
+                        continue
+
+                    source = archive.extractfile(member)
+                    if source is None:
+                        continue
+                    destination = os.path.join(staging, *parts)
+                    os.makedirs(os.path.dirname(destination), exist_ok=True)
+                    with open(destination, 'wb') as fh:
+                        shutil.copyfileobj(source, fh)
+                    kept += 1
+                    kept_bytes += member.size
+
+            if skipped:
+                with open(os.path.join(staging, SKIPPED_MANIFEST), 'w', encoding='utf-8') as fh:
+                    fh.write('\n'.join(skipped))
+
+            with self._lock:
+                if os.path.isdir(target):
+                    shutil.rmtree(staging, ignore_errors=True)
+                else:
+                    os.replace(staging, target)
+                self._evict(keep=target)
+        except BaseException:
+            shutil.rmtree(staging, ignore_errors=True)
+            raise
+
+        return kept
+
+    def read(self, owner: str, repo: str, revision: str, path: str) -> Optional[str]:
+        """Return a documentation file of the revision, or None if it was not archived."""
+        full_path = os.path.join(self.revision_dir(owner, repo, revision), *path.strip('/').split('/'))
+        try:
+            with open(full_path, 'r', encoding='utf-8', errors='replace') as fh:
+                return fh.read()
+        except OSError:
+            return None
+
+    def find_readme(self, owner: str, repo: str, revision: str, directory: str = "") -> Optional[str]:
+        """Path of the README in directory (repository root by default), if any."""
+        for path in self.list_files(owner, repo, revision, directory):
+            if path.rsplit('/', 1)[-1].lower() in README_NAMES:
+                return path
+        return None
+
+    def list_files(self, owner: str, repo: str, revision: str, directory: str = "") -> List[str]:
+        """Archived files directly inside directory, as repository paths."""
+        base = self.revision_dir(owner, repo, revision)
+        directory = directory.strip('/')
+        full_dir = os.path.join(base, *directory.split('/')) if directory else base
+        try:
+            names = sorted(os.listdir(full_dir))
+        except OSError:
+            return []
+        # Prefer README.md over README.rst and friends
+        names.sort(key=lambda name: README_NAMES.index(name.lower()) if name.lower() in README_NAMES else len(README_NAMES))
+        return [
+            f"{directory}/{name}" if directory else name
+            for name in names
+            if os.path.isfile(os.path.join(full_dir, name)) and (directory or name != SKIPPED_MANIFEST)
+        ]
+
+    def _evict(self, keep: str):
+        """Remove least recently extracted revisions other than keep until the archive fits in max_bytes."""
+        revisions = []
+        total = 0
+        for owner in os.listdir(self.directory):
+            for repo in os.listdir(os.path.join(self.directory, owner)):
+                repo_dir = os.path.join(self.directory, owner, repo)
+                for revision in os.listdir(repo_dir):
+                    path = os.path.join(repo_dir, revision)
+                    if path.endswith('.partial'):
+                        continue
+                    size = sum(
+                        os.path.getsize(os.path.join(root, name))
+                        for root, _, files in os.walk(path)
+                        for name in files
+                    )
+                    if path != keep:
+                        revisions.append((os.path.getmtime(path), size, path))
+                    total += size
+
+        for _, size, path in sorted(revisions):
+            if total <= self.max_bytes:
+                break
+            shutil.rmtree(path, ignore_errors=True)
+            total -= size
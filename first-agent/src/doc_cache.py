@@ -0,0 +1,105 @@
+import os
+import re
+import threading
+from collections import OrderedDict
+from typing import Optional, Tuple
+from src.models import DocumentationData
+
+DocKey = Tuple[str, str, str]  # (owner, repo, default-branch tree SHA)
+
+class DocumentationCache:
+    """Two-tier LRU cache of parsed repository documentation.
+
+    Entries are keyed by the default branch tree SHA, so they never go stale:
+    a docs change produces a new tree and therefore a new key. The memory tier
+    holds the hottest repositories; the disk tier survives restarts.
+    """
+
+    def __init__(self, directory: str, max_memory_entries: int, max_disk_entries: int):
+        self.directory = directory
+        self.max_memory_entries = max_memory_entries
+        self.max_disk_entries = max_disk_entries
+        self._memory: "OrderedDict[DocKey, DocumentationData]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+        os.makedirs(self.directory, exist_ok=True)
+
+    def _path(self, key: DocKey) -> str:
+        safe = "__".join(re.sub(r'[^A-Za-z0-9._-]', '_', part) for part in key)
+        return os.path.join(self.directory, f"{safe}.json")
+
+    def get(self, key: DocKey) -> Optional[DocumentationData]:
+        """Return cached documentation for key, promoting disk hits to memory."""
+        with self._lock:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                self.hits += 1
+                return self._memory[key].model_copy(deep=True)
+
+        path = self._path(key)
+        try:
+            with open(path, 'r', encoding='utf-8') as fh:
+                doc_data = DocumentationData.model_validate_json(fh.read())
+            os.utime(path)
+        except (OSError, ValueError):
+            with self._lock:
+                self.misses += 1
+            return None
+
+        with self._lock:
+            self.hits += 1
+            self._remember(key, doc_data)
+        return doc_data.model_copy(deep=True)
+
+    def put(self, key: DocKey, doc_data: DocumentationData):
+        """Store documentation in both tiers."""
+        path = self._path(key)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as fh:
+            fh.write(doc_data.model_dump_json())
+        os.replace(tmp_path, path)
+
+        with self._lock:
+            self._remember(key, doc_data.model_copy(deep=True))
+            self._evict_disk()
+
+    def invalidate(self, owner: str, repo: str):
+        """Forget every cached revision of a repository."""
+        prefix = os.path.basename(self._path((owner, repo, ""))).rsplit(".json", 1)[0]
+        with self._lock:
+            for key in [key for key in self._memory if key[:2] == (owner, repo)]:
+                del self._memory[key]
+            for name in os.listdir(self.directory):
+                if name.startswith(prefix) and name.endswith('.json'):
+                    os.remove(os.path.join(self.directory, name))
+
+    def _remember(self, key: DocKey, doc_data: DocumentationData):
+        self._memory[key] = doc_data
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_entries:
+            self._memory.popitem(last=False)
+
+    def _evict_disk(self):
+        entries = [
+            os.path.join(self.directory, name)
+            for name in os.listdir(self.directory)
+            if name.endswith('.json')
+        ]
+        if len(entries) <= self.max_disk_entries:
+            return
+        entries.sort(key=os.path.getmtime)
+        for path in entries[:len(entries) - self.max_disk_entries]:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "memory_entries": len(self._memory),
+            }
@@ -0,0 +1,91 @@
+import threading
+from collections import Counter
+from typing import Dict, Iterable, List, Optional
+
+from src.doc_archive import README_NAMES
+
+class _DirectoryNode:
+    __slots__ = ("children", "readme", "listed")
+
+    def __init__(self):
+        self.children: Dict[str, "_DirectoryNode"] = {}
+        self.readme: Optional[str] = None
+        self.listed = False
+
+class ReadmeIndex:
+    """Directory trie of one repository revision that knows where the READMEs are.
+
+    Built from a recursive tree listing, every directory is known up front.
+    When GitHub truncates that listing, directories are listed on demand
+    through mark_listed(). README bodies are memoized as they are fetched, so
+    each directory's docs are read at most once per revision.
+    """
+
+    def __init__(self, complete: bool = False):
+        self.root = _DirectoryNode()
+        self.complete = complete
+        self.contents: Dict[str, Optional[str]] = {}
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def _parts(path: str) -> List[str]:
+        return [part for part in path.strip('/').split('/') if part]
+
+    def _node(self, directory: str, create: bool = False) -> Optional[_DirectoryNode]:
+        node = self.root
+        for part in self._parts(directory):
+            child = node.children.get(part)
+            if child is None:
+                if not create:
+                    return None
+                child = node.children[part] = _DirectoryNode()
+            node = child
+        return node
+
+    def add_paths(self, paths: Iterable[str]):
+        """Register file paths, remembering the README of each directory."""
+        for path in paths:
+            directory, _, name = path.rpartition('/')
+            node = self._node(directory, create=True)
+            if name.lower() in README_NAMES:
+                current = node.readme.rsplit('/', 1)[-1].lower() if node.readme else None
+                # Prefer README.md over README.rst and friends
+                if current is None or README_NAMES.index(name.lower()) < README_NAMES.index(current):
+                    node.readme = path
+
+    def mark_listed(self, directory: str, paths: Iterable[str]):
+        """Record the files of a directory listed on demand."""
+        self.add_paths(paths)
+        self._node(directory, create=True).listed = True
+
+    def unlisted_ancestors(self, file_path: str) -> List[str]:
+        """Directories above file_path whose contents are still unknown."""
+        if self.complete:
+            return []
+        directories = []
+        parts = self._parts(file_path)[:-1]
+        for depth in range(len(parts) + 1):
+            directory = '/'.join(parts[:depth])
+            node = self._node(directory)
+            if node is None or not node.listed:
+                directories.append(directory)
+        return directories
+
+    def nearest_readme(self, file_path: str) -> Optional[str]:
+        """README path in the closest directory at or above file_path."""
+        node = self.root
+        nearest = node.readme
+        for part in self._parts(file_path)[:-1]:
+            node = node.children.get(part)
+            if node is None:
+                break
+            if node.readme:
+                nearest = node.readme
+        return nearest
+
+    def nearest_readmes(self, file_paths: Iterable[str], limit: int) -> List[str]:
+        """Nearest READMEs for a set of changed files, most-touched first."""
+        counts = Counter(
+            readme for readme in (self.nearest_readme(path) for path in file_paths) if readme
+        )
+        return [readme for readme, _ in counts.most_common(limit)]
@@ -0,0 +1,63 @@
+import time
+import hashlib
+from typing import Any, Dict, Optional
+
+from src.json_file_store import JsonFileStore
+
+class GitHubHttpCache:
+    """Persistent conditional-request cache for GitHub REST responses.
+
+    Each entry keeps the response body together with its ETag/Last-Modified
+    validators. Callers revalidate with If-None-Match/If-Modified-Since, and a
+    304 reply is served from disk without spending rate-limit quota. Entries
+    are evicted least-recently-used once the directory grows past max_bytes.
+    """
+
+    def __init__(self, directory: str, max_bytes: int):
+        self.files = JsonFileStore(directory, max_bytes)
+
+    @staticmethod
+    def make_key(url: str, params: Optional[Dict[str, Any]] = None, accept: Optional[str] = None) -> str:
+        """Build a stable cache key for a GET request."""
+        query = "&".join(f"{name}={value}" for name, value in sorted((params or {}).items()))
+        raw = f"{url}?{query}|{accept or ''}"
+        return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+    def lookup(self, key: str) -> Optional[Dict[str, Any]]:
+        """Return the stored entry for key, or None if it is not cached."""
+        return self.files.read(key)
+
+    def conditional_headers(self, entry: Optional[Dict[str, Any]]) -> Dict[str, str]:
+        """Validator headers that turn a request for a cached entry into a conditional one."""
+        headers = {}
+        if entry:
+            if entry.get('etag'):
+                headers['If-None-Match'] = entry['etag']
+            if entry.get('last_modified'):
+                headers['If-Modified-Since'] = entry['last_modified']
+        return headers
+
+    def hit(self, key: str, entry: Dict[str, Any]) -> str:
+        """Record a 304 revalidation and return the cached body."""
+        self.files.record(hit=True)
+        self.files.touch(key)
+        return entry['body']
+
+    def store(self, key: str, url: str, body: str, etag: Optional[str], last_modified: Optional[str]):
+        """Record a full response, keeping it only if it carries a validator."""
+        self.files.record(hit=False)
+
+        if not etag and not last_modified:
+            return
+
+        self.files.write(key, {
+            'url': url,
+            'etag': etag,
+            'last_modified': last_modified,
+            'body': body,
+            'stored_at': time.time(),
+        })
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters and current disk usage."""
+        return self.files.stats()
@@ -0,0 +1,223 @@
+import json
+import asyncio
+import math
+from typing import Any, Dict, Iterator, List, Optional
+import aiohttp
+import requests
+from src.config import config
+from src.github_cache import GitHubHttpCache
+from src.github_scheduler import GitHubRateLimitScheduler, scheduler as default_scheduler
+
+RAW_MEDIA_TYPE = 'application/vnd.github.raw'
+DIFF_MEDIA_TYPE = 'application/vnd.github.diff'
+SHA_MEDIA_TYPE = 'application/vnd.github.sha'
+
+# pulls/{n}/files lists at most this many files; later pages come back empty
+PR_FILES_LIMIT = 3000
+
+def create_default_cache() -> Optional[GitHubHttpCache]:
+    """Build the on-disk response cache described by the configuration."""
+    if not config.github_cache_enabled:
+        return None
+    return GitHubHttpCache(config.github_cache_dir, config.github_cache_max_mb * 1024 * 1024)
+
+class GitHubClient:
+    """Synchronous transport for the GitHub REST API with conditional-request caching."""
+
+    def __init__(self, base_url: Optional[str] = None,
+                 cache: Optional[GitHubHttpCache] = None,
+                 scheduler: Optional[GitHubRateLimitScheduler] = None):
+        self.base_url = (base_url or config.github_api_url).rstrip('/')
+        self.cache = cache
+        self.scheduler = scheduler or default_scheduler
+        self.session = requests.Session()
+        self.session.headers.update({
+            'Accept': 'application/vnd.github.v3+json'
+        })
+
+    def get_text(self, path: str, params: Optional[Dict[str, Any]] = None,
+                 accept: Optional[str] = None) -> str:
+        """GET a REST endpoint and return the body, revalidating cached copies."""
+        url = f"{self.base_url}{path}"
+        headers = {'Accept': accept} if accept else {}
+
+        key = entry = None
+        if self.cache is not None:
+            key = self.cache.make_key(url, params, accept)
+            entry = self.cache.lookup(key)
+            headers.update(self.cache.conditional_headers(entry))
+
+        response = self._send(url, params, headers)
+
+        if response.status_code == 304 and entry is not None:
+            return self.cache.hit(key, entry)
+
+        response.raise_for_status()
+
+        if self.cache is not None:
+            self.cache.store(key, url, response.text, response.headers.get('ETag'),
+                             response.headers.get('Last-Modified'))
+
+        return response.text
+
+    def get_json(self, path: str, params: Optional[Dict[str, Any]] = None,
+                 accept: Optional[str] = None) -> Any:
+        """GET a REST endpoint and return the decoded JSON body."""
+        return json.loads(self.get_text(path, params, accept))
+
+    def open_stream(self, path: str, accept: Optional[str] = None) -> requests.Response:
+        """GET an endpoint as an uncached streamed response; the caller must close it."""
+        headers = {'Accept': accept} if accept else {}
+        response = self._send(f"{self.base_url}{path}", None, headers, stream=True)
+        response.raise_for_status()
+        return response
+
+    def get_paginated(self, path: str, per_page: int = 100,
+                      params: Optional[Dict[str, Any]] = None) -> List[Any]:
+        """Walk a list endpoint page by page until a short page is returned."""
+        return list(self.iter_paginated(path, per_page, params))
+
+    def iter_paginated(self, path: str, per_page: int = 100,
+                       params: Optional[Dict[str, Any]] = None) -> Iterator[Any]:
+        """Yield the items of a list endpoint, fetching the next page only when needed."""
+        page = 1
+
+        while True:
+            page_items = self.get_json(path, params={**(params or {}), 'per_page': per_page, 'page': page})
+            yield from page_items
+            if len(page_items) < per_page:
+                break
+            page += 1
+
+    def _send(self, url: str, params: Optional[Dict[str, Any]], headers: Dict[str, str],
+              stream: bool = False) -> requests.Response:
+        """Send a GET through the scheduler, retrying rate-limited responses once it lets traffic through again."""
+        for _ in range(config.github_rate_limit_retries + 1):
+            # The scheduler picks the pooled token with the most quota left
+            token = self.scheduler.acquire()
+            headers['Authorization'] = f'token {token}'
+            response = self.session.get(url, params=params, headers=headers, timeout=60, stream=stream)
+            limited_body = response.text if response.status_code in (403, 429) else ""
+            if not self.scheduler.update(token, response.status_code, response.headers, limited_body):
+                return response
+            response.close()
+
+        raise RuntimeError(f"GitHub rate limit retries exhausted for {url}")
+
+class AsyncGitHubClient:
+    """Asyncio transport for the GitHub REST API on a pooled keep-alive session."""
+
+    def __init__(self, base_url: Optional[str] = None,
+                 max_connections: Optional[int] = None, cache: Optional[GitHubHttpCache] = None,
+                 graphql_url: Optional[str] = None,
+                 scheduler: Optional[GitHubRateLimitScheduler] = None):
+        self.base_url = (base_url or config.github_api_url).rstrip('/')
+        self.graphql_url = graphql_url or config.github_graphql_url
+        self.max_connections = max_connections or config.github_max_connections
+        self.cache = cache
+        self.scheduler = scheduler or default_scheduler
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    async def _get_session(self) -> aiohttp.ClientSession:
+        """Return the shared session, creating it on first use in the running loop."""
+        loop = asyncio.get_running_loop()
+
+        # aiohttp sessions are bound to the loop that created them; the CLI
+        # starts a fresh loop per run, so rebuild the session when it changes
+        if self._session is None or self._session.closed or self._loop is not loop:
+            connector = aiohttp.TCPConnector(
+                limit=self.max_connections,
+                keepalive_timeout=60,
+            )
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                headers={'Accept': 'application/vnd.github.v3+json'},
+                timeout=aiohttp.ClientTimeout(total=60),
+            )
+            self._loop = loop
+
+        return self._session
+
+    async def get_text(self, path: str, params: Optional[Dict[str, Any]] = None,
+                       accept: Optional[str] = None) -> str:
+        """GET a REST endpoint and return the body, revalidating cached copies."""
+        session = await self._get_session()
+        url = f"{self.base_url}{path}"
+        headers = {'Accept': accept} if accept else {}
+
+        key = entry = None
+        if self.cache is not None:
+            key = self.cache.make_key(url, params, accept)
+            entry = self.cache.lookup(key)
+            headers.update(self.cache.conditional_headers(entry))
+
+        for _ in range(config.github_rate_limit_retries + 1):
+            token = await self.scheduler.acquire_async()
+            headers['Authorization'] = f'token {token}'
+            async with session.get(url, params=params, headers=headers) as response:
+                body = await response.text()
+                limited_body = body if response.status in (403, 429) else ""
+                if self.scheduler.update(token, response.status, response.headers, limited_body):
+                    continue
+
+                if response.status == 304 and entry is not None:
+                    return self.cache.hit(key, entry)
+
+                response.raise_for_status()
+
+                if self.cache is not None:
+                    self.cache.store(key, url, body, response.headers.get('ETag'),
+                                     response.headers.get('Last-Modified'))
+
+                return body
+
+        raise RuntimeError(f"GitHub rate limit retries exhausted for {url}")
+
+    async def get_json(self, path: str, params: Optional[Dict[str, Any]] = None,
+                       accept: Optional[str] = None) -> Any:
+        """GET a REST endpoint and return the decoded JSON body."""
+        return json.loads(await self.get_text(path, params, accept))
+
+    async def graphql(self, query: str, variables: Dict[str, Any]) -> Dict[str, Any]:
+        """Run a GraphQL query and return its `data` payload."""
+        session = await self._get_session()
+
+        for _ in range(config.github_rate_limit_retries + 1):
+            token = await self.scheduler.acquire_async(resource='graphql')
+            async with session.post(self.graphql_url, json={'query': query, 'variables': variables},
+                                    headers={'Authorization': f'bearer {token}'}) as response:
+                body = await response.text()
+                limited_body = body if response.status in (403, 429) else ""
+                if self.scheduler.update(token, response.status, response.headers, limited_body):
+                    continue
+                response.raise_for_status()
+                payload = json.loads(body)
+                break
+        else:
+            raise RuntimeError("GitHub rate limit retries exhausted for GraphQL query")
+
+        if payload.get('errors'):
+            messages = '; '.join(error.get('message', str(error)) for error in payload['errors'])
+            raise RuntimeError(f"GitHub GraphQL query failed: {messages}")
+
+        return payload['data']
+
+    async def get_paginated(self, path: str, total: int, per_page: int = 100,
+                            params: Optional[Dict[str, Any]] = None) -> List[Any]:
+        """Fetch every page of a list endpoint concurrently once the item count is known."""
+        pages = max(1, math.ceil(total / per_page))
+
+        results = await asyncio.gather(*(
+            self.get_json(path, params={**(params or {}), 'per_page': per_page, 'page': page})
+            for page in range(1, pages + 1)
+        ))
+
+        return [item for page_items in results for item in page_items]
+
+    async def close(self):
+        """Close the pooled session."""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+        self._loop = None
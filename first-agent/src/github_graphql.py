@@ -0,0 +1,80 @@
+# GraphQL documents for fetching a pull request and its repository docs in one round trip
+
+# Candidate documentation blobs, fetched as aliases on the default branch HEAD
+README_ALIASES = {
+    "readme": "README.md",
+    "readmeLower": "readme.md",
+    "readmeRst": "README.rst",
+    "readmePlain": "README",
+}
+
+TESTING_ALIASES = {
+    "testingMd": "TESTING.md",
+    "testMd": "TEST.md",
+    "testReadme": "test/README.md",
+}
+
+# GraphQL PullRequestChangedFile.changeType -> REST pulls/{n}/files status
+CHANGE_TYPE_STATUS = {
+    "ADDED": "added",
+    "DELETED": "removed",
+    "MODIFIED": "modified",
+    "RENAMED": "renamed",
+    "COPIED": "copied",
+    "CHANGED": "changed",
+}
+
+_FILES_CONNECTION = """
+        pageInfo { hasNextPage endCursor }
+        nodes { path additions deletions changeType }
+"""
+
+_COMMENTS_CONNECTION = """
+        pageInfo { hasNextPage endCursor }
+        nodes { body createdAt }
+"""
+
+def _blob_fields(aliases):
+    return "\n".join(
+        f'    {alias}: object(expression: "HEAD:{path}") {{ ... on Blob {{ text }} }}'
+        for alias, path in aliases.items()
+    )
+
+PR_CONTEXT_QUERY = f"""
+query PRContext($owner: String!, $name: String!, $number: Int!) {{
+  repository(owner: $owner, name: $name) {{
+    pullRequest(number: $number) {{
+      title
+      body
+      additions
+      deletions
+      changedFiles
+      createdAt
+      updatedAt
+      headRefOid
+      commits {{ totalCount }}
+      labels(first: 100) {{ nodes {{ name }} }}
+      files(first: 100) {{{_FILES_CONNECTION}      }}
+      comments(first: 100) {{{_COMMENTS_CONNECTION}      }}
+    }}
+{_blob_fields(README_ALIASES)}
+{_blob_fields(TESTING_ALIASES)}
+    docs: object(expression: "HEAD:docs") {{ ... on Tree {{ oid }} }}
+    defaultBranchRef {{ target {{ ... on Commit {{ tree {{ oid }} }} }} }}
+  }}
+}}
+"""
+
+# Follow-up query for PRs with more than 100 files or comments
+PR_MORE_PAGES_QUERY = f"""
+query PRMorePages($owner: String!, $name: String!, $number: Int!,
+                  $filesCursor: String, $commentsCursor: String,
+                  $moreFiles: Boolean!, $moreComments: Boolean!) {{
+  repository(owner: $owner, name: $name) {{
+    pullRequest(number: $number) {{
+      files(first: 100, after: $filesCursor) @include(if: $moreFiles) {{{_FILES_CONNECTION}      }}
+      comments(first: 100, after: $commentsCursor) @include(if: $moreComments) {{{_COMMENTS_CONNECTION}      }}
+    }}
+  }}
+}}
+"""
@@ -0,0 +1,220 @@
+import time
+import heapq
+import asyncio
+import itertools
+import threading
+import contextvars
+from contextlib import contextmanager
+from enum import IntEnum
+from typing import Any, Dict, List, Mapping, Optional, Tuple
+from src.config import config
+from src.github_tokens import GitHubTokenPool
+
+class RequestPriority(IntEnum):
+    """Scheduling class of a GitHub request; lower values are served first."""
+    INTERACTIVE = 0
+    BACKGROUND = 1
+
+_current_priority = contextvars.ContextVar("github_request_priority", default=RequestPriority.INTERACTIVE)
+
+@contextmanager
+def request_priority(priority: RequestPriority):
+    """Run the enclosed GitHub calls at the given priority."""
+    token = _current_priority.set(priority)
+    try:
+        yield
+    finally:
+        _current_priority.reset(token)
+
+def current_priority() -> RequestPriority:
+    """The priority GitHub calls made from the current context run at."""
+    return _current_priority.get()
+
+class GitHubRateLimitScheduler:
+    """Central pacing point for GitHub traffic.
+
+    Every request takes a ticket from a priority queue and leaves it once a
+    token-bucket slot is free and some credential in the token pool still has
+    quota; the grant names the token to send the request with. Budgets are
+    learned from X-RateLimit-* headers per token and resource (core, graphql,
+    ...) and, once the pool's combined budget runs low, what is left is spread
+    evenly until the reset time. Primary and secondary limit responses park
+    the offending token, so callers wait instead of failing.
+    """
+
+    # GitHub asks clients to wait at least a minute after a secondary limit without Retry-After
+    SECONDARY_LIMIT_BACKOFF = 60.0
+    POLL_INTERVAL = 0.05
+    # Below this share of the quota, requests are paced to last until the reset
+    LOW_QUOTA_FRACTION = 0.1
+
+    def __init__(self, token_pool: GitHubTokenPool, rate_per_second: float, burst: int, max_wait_seconds: float):
+        self.token_pool = token_pool
+        self.rate_per_second = rate_per_second
+        self.burst = burst
+        self.max_wait_seconds = max_wait_seconds
+        self._cond = threading.Condition()
+        self._queue: List[Tuple[int, int]] = []
+        self._sequence = itertools.count()
+        self._tokens = float(burst)
+        self._last_refill = time.monotonic()
+        self._last_grant = 0.0
+        self.granted = 0
+        self.throttled = 0
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._last_refill) * self.rate_per_second)
+        self._last_refill = now
+
+    def _try_grant(self, ticket: Tuple[int, int], resource: str) -> Tuple[Optional[float], Optional[str]]:
+        """Grant ticket if possible.
+
+        Returns (0, token) when granted, (seconds to wait, None) if ticket is
+        next in line, or (None, None) if other tickets are ahead of it.
+        """
+        if self._queue[0] != ticket:
+            return None, None
+
+        token, wait = self.token_pool.choose(resource)
+        if token is None:
+            return wait, None
+
+        now = time.time()
+        rate = self.rate_per_second
+        budget = self.token_pool.aggregate(resource)
+        if budget and budget["reset_at"] > now and budget["remaining"] < budget["limit"] * self.LOW_QUOTA_FRACTION:
+            # Running low: spread what is left evenly until the reset
+            rate = min(rate, max(budget["remaining"], 1) / (budget["reset_at"] - now))
+
+        self._refill()
+        if rate < self.rate_per_second:
+            wait = self._last_grant + 1 / rate - time.monotonic()
+            if wait > 0:
+                return wait, None
+        elif self._tokens < 1:
+            return (1 - self._tokens) / self.rate_per_second, None
+
+        self._tokens = max(0.0, self._tokens - 1)
+        self._last_grant = time.monotonic()
+        self.token_pool.consume(token, resource)
+        heapq.heappop(self._queue)
+        self.granted += 1
+        self._cond.notify_all()
+        return 0.0, token
+
+    def _enqueue(self, priority: Optional[RequestPriority]) -> Tuple[int, int]:
+        ticket = (int(priority if priority is not None else _current_priority.get()), next(self._sequence))
+        heapq.heappush(self._queue, ticket)
+        self._cond.notify_all()
+        return ticket
+
+    def _discard(self, ticket: Tuple[int, int]):
+        if ticket in self._queue:
+            self._queue.remove(ticket)
+            heapq.heapify(self._queue)
+            self._cond.notify_all()
+
+    def _check_wait(self, wait: float, ticket: Tuple[int, int]):
+        if wait > self.max_wait_seconds:
+            self._discard(ticket)
+            raise RuntimeError(f"GitHub rate limit exhausted; next request allowed in {wait:.0f}s")
+
+    def acquire(self, resource: str = "core", priority: Optional[RequestPriority] = None) -> str:
+        """Block the calling thread until a request may be sent; returns the token to use."""
+        with self._cond:
+            ticket = self._enqueue(priority)
+            try:
+                while True:
+                    wait, token = self._try_grant(ticket, resource)
+                    if token is not None:
+                        return token
+                    if wait is not None:
+                        self._check_wait(wait, ticket)
+                    self._cond.wait(wait if wait is not None else self.POLL_INTERVAL)
+            except BaseException:
+                self._discard(ticket)
+                raise
+
+    async def acquire_async(self, resource: str = "core", priority: Optional[RequestPriority] = None) -> str:
+        """Wait without blocking the event loop until a request may be sent; returns the token to use."""
+        with self._cond:
+            ticket = self._enqueue(priority)
+        try:
+            while True:
+                with self._cond:
+                    wait, token = self._try_grant(ticket, resource)
+                    if token is not None:
+                        return token
+                    if wait is not None:
+                        self._check_wait(wait, ticket)
+                # Re-check at least every poll interval so a newly queued
+                # interactive request can overtake a long background wait
+                await asyncio.sleep(min(wait, self.POLL_INTERVAL) if wait is not None else self.POLL_INTERVAL)
+        except BaseException:
+            with self._cond:
+                self._discard(ticket)
+            raise
+
+    def update(self, token: str, status: int, headers: Mapping[str, str], body: str = "") -> bool:
+        """Record rate-limit headers from a response sent with token.
+
+        Returns True when the response was a rate-limit rejection and the
+        request should be retried once the scheduler lets it through again.
+        """
+        now = time.time()
+        resource = self.token_pool.record(token, headers)
+
+        limited = False
+        if status in (403, 429):
+            retry_after = headers.get("Retry-After")
+            if retry_after is not None:
+                self.token_pool.park(token, now + float(retry_after))
+                limited = True
+            elif headers.get("X-RateLimit-Remaining") == "0":
+                self.token_pool.park(token, self.token_pool.reset_time(token, resource) or now + self.SECONDARY_LIMIT_BACKOFF)
+                limited = True
+            elif "rate limit" in body.lower():
+                self.token_pool.park(token, now + self.SECONDARY_LIMIT_BACKOFF)
+                limited = True
+
+        with self._cond:
+            if limited:
+                self.throttled += 1
+            self._cond.notify_all()
+
+        return limited
+
+    def stats(self) -> Dict[str, Any]:
+        """Current budgets and queue depth, for monitoring."""
+        with self._cond:
+            self._refill()
+            now = time.time()
+            budgets = {}
+            for resource in ("core", "graphql"):
+                budget = self.token_pool.aggregate(resource)
+                if budget:
+                    budgets[resource] = {
+                        "limit": budget["limit"],
+                        "remaining": budget["remaining"],
+                        "resets_in_seconds": max(0.0, round(budget["reset_at"] - now, 1)),
+                    }
+            return {
+                "queue_depth": len(self._queue),
+                "queued_interactive": sum(1 for p, _ in self._queue if p == RequestPriority.INTERACTIVE),
+                "queued_background": sum(1 for p, _ in self._queue if p == RequestPriority.BACKGROUND),
+                "bucket_tokens": round(self._tokens, 2),
+                "rate_per_second": self.rate_per_second,
+                "granted": self.granted,
+                "throttled": self.throttled,
+                "budgets": budgets,
+                "tokens": self.token_pool.stats(),
+            }
+
+# Process-wide scheduler shared by every GitHub client
+scheduler = GitHubRateLimitScheduler(
+    token_pool=GitHubTokenPool(config.github_tokens),
+    rate_per_second=config.github_requests_per_second,
+    burst=config.github_burst,
+    max_wait_seconds=config.github_max_queue_wait_seconds,
+)
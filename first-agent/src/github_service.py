@@ -1,22 +1,50 @@
 import re
 import time
-from typing import Optional, Tuple, List
-from datetime import datetime
-import requests
-from github import Github, PullRequest
+import asyncio
+import threading
+from collections import OrderedDict
+from typing import Optional, Tuple, List, Dict, Iterable, Iterator
 from src.models import PRData, DocumentationData, DeploymentInfo, FileChange
 from src.config import config
+from src.github_client import GitHubClient, AsyncGitHubClient, RAW_MEDIA_TYPE, DIFF_MEDIA_TYPE, SHA_MEDIA_TYPE, PR_FILES_LIMIT, create_default_cache
+from src.doc_cache import DocumentationCache
+from src.doc_archive import DocumentationArchive
+from src.doc_index import ReadmeIndex
+from src.diff_stream import parse_unified_diff, split_lines
+from src.patch_arena import PatchArena
+from src.deployment_watcher import DeploymentWatcher
+from src.webhooks import PRStateStore
+from src.github_graphql import PR_CONTEXT_QUERY, PR_MORE_PAGES_QUERY, README_ALIASES, TESTING_ALIASES, CHANGE_TYPE_STATUS
+
+def _is_not_found(error: Exception) -> bool:
+    """Whether a request failed because the resource doesn't exist, rather than a rate limit or network error."""
+    response = getattr(error, "response", None)
+    return response is not None and response.status_code == 404
 
 class GitHubService:
     """Service for interacting with GitHub API."""
     
     def __init__(self):
-        self.github = Github(config.github_token)
-        self.session = requests.Session()
-        self.session.headers.update({
-            'Authorization': f'token {config.github_token}',
-            'Accept': 'application/vnd.github.v3+json'
-        })
+        # Both transports share one conditional-request cache
+        self.cache = create_default_cache()
+        self.client = GitHubClient(cache=self.cache)
+        self.async_client = AsyncGitHubClient(cache=self.cache)
+        self.doc_cache = DocumentationCache(
+            config.doc_cache_dir,
+            max_memory_entries=config.doc_cache_memory_entries,
+            max_disk_entries=config.doc_cache_disk_entries,
+        )
+        self.doc_archive = DocumentationArchive(
+            config.docs_archive_dir,
+            max_bytes=config.docs_archive_max_mb * 1024 * 1024,
+            max_file_bytes=config.docs_archive_max_file_kb * 1024,
+        )
+        self._readme_indexes: "OrderedDict[tuple, ReadmeIndex]" = OrderedDict()
+        self._readme_indexes_lock = threading.Lock()
+        self._deployment_watchers: "OrderedDict[str, DeploymentWatcher]" = OrderedDict()
+        self._deployment_watchers_lock = threading.Lock()
+        # Filled by webhook deliveries when the server receives them
+        self.pr_states = PRStateStore()
     
     def parse_pr_url(self, pr_url: str) -> Tuple[str, str, int]:
         """Parse PR URL to extract owner, repo, and PR number."""
@@ -32,63 +60,275 @@ class GitHubService:
     def get_pr_data(self, pr_url: str) -> PRData:
         """Fetch comprehensive PR data from GitHub."""
         owner, repo_name, pr_number = self.parse_pr_url(pr_url)
+        repo_path = f"/repos/{owner}/{repo_name}"
         
-        repo = self.github.get_repo(f"{owner}/{repo_name}")
-        pr = repo.get_pull(pr_number)
+        pr = self.client.get_json(f"{repo_path}/pulls/{pr_number}")
         
         # Get files changed with detailed information
-        files_changed = []
-        file_changes = []
-        
-        pr_files = pr.get_files()
-        for file in pr_files:
-            files_changed.append(file.filename)
-            
-            # Create detailed file change info
-            file_change = FileChange(
-                filename=file.filename,
-                additions=file.additions,
-                deletions=file.deletions,
-                changes=file.changes,
-                patch=file.patch,  # This contains the actual diff!
-                status=file.status
-            )
-            file_changes.append(file_change)
+        patch_budget = None
+        if config.stream_pr_diffs:
+            file_changes = self.iter_file_changes(owner, repo_name, pr_number, pr["changed_files"])
+            patch_budget = config.stream_patch_budget_kb * 1024
+        else:
+            pr_files = self.client.get_paginated(f"{repo_path}/pulls/{pr_number}/files")
+            file_changes = (self._file_change_from_json(file) for file in pr_files)
         
         # Get PR comments for additional context
         pr_comments = []
         try:
-            comments = list(pr.get_issue_comments())
-            for comment in comments:
-                pr_comments.append(comment.body)
+            comments = self.client.get_paginated(f"{repo_path}/issues/{pr_number}/comments")
+            pr_comments = [comment["body"] for comment in comments]
         except Exception as e:
             print(f"Could not fetch PR comments: {e}")
         
-        # Get labels
-        labels = [label.name for label in pr.labels]
+        return self._build_pr_data(pr_url, owner, repo_name, pr, file_changes, pr_comments, patch_budget)
+    
+    def iter_file_changes(self, owner: str, repo_name: str, pr_number: int,
+                          changed_files: Optional[int] = None) -> Iterator[FileChange]:
+        """Yield the PR's file changes one REST page at a time.
+        
+        GitHub leaves `patch` out of files whose diff is too large and stops
+        listing files after 3000. Those files are filled in at the end from the
+        raw diff of the PR, which is streamed and parsed line by line.
+        """
+        repo_path = f"/repos/{owner}/{repo_name}"
+        listed = set()
+        truncated = {}  # filename -> files entry whose patch was withheld
+        
+        for file in self.client.iter_paginated(f"{repo_path}/pulls/{pr_number}/files"):
+            listed.add(file["filename"])
+            if file.get("patch") is None and file["changes"] > 0:
+                truncated[file["filename"]] = file
+                continue
+            yield self._file_change_from_json(file)
+        
+        listing_incomplete = changed_files is not None and len(listed) < changed_files
+        if not truncated and not listing_incomplete:
+            return
+        
+        try:
+            with self.client.open_stream(f"{repo_path}/pulls/{pr_number}", accept=DIFF_MEDIA_TYPE) as response:
+                response.encoding = 'utf-8'
+                lines = split_lines(response.iter_content(chunk_size=64 * 1024, decode_unicode=True))
+                for file_change in parse_unified_diff(lines, config.stream_patch_max_kb * 1024):
+                    if file_change.filename in truncated:
+                        file = truncated.pop(file_change.filename)
+                        yield self._file_change_from_json({**file, "patch": file_change.patch})
+                    elif listing_incomplete and file_change.filename not in listed:
+                        yield file_change
+        except Exception as e:
+            print(f"Could not stream raw diff: {e}")
+        
+        # Files the raw diff did not cover are still reported, without a patch
+        for file in truncated.values():
+            yield self._file_change_from_json(file)
+    
+    async def get_pr_data_async(self, pr_url: str) -> PRData:
+        """Fetch PR data over the async client, paging files and comments in parallel."""
+        owner, repo_name, pr_number = self.parse_pr_url(pr_url)
+        repo_path = f"/repos/{owner}/{repo_name}"
+        
+        pr = await self.async_client.get_json(f"{repo_path}/pulls/{pr_number}")
+        
+        # The PR payload carries the totals, so every page can be requested at once
+        pr_files, comments = await asyncio.gather(
+            self.async_client.get_paginated(f"{repo_path}/pulls/{pr_number}/files",
+                                            min(pr["changed_files"], PR_FILES_LIMIT)),
+            self.async_client.get_paginated(f"{repo_path}/issues/{pr_number}/comments", pr["comments"]),
+            return_exceptions=True
+        )
+        
+        if isinstance(pr_files, Exception):
+            raise pr_files
+        
+        pr_comments = []
+        if isinstance(comments, Exception):
+            print(f"Could not fetch PR comments: {comments}")
+        else:
+            pr_comments = [comment["body"] for comment in comments]
+        
+        file_changes = (self._file_change_from_json(file) for file in pr_files)
+        return self._build_pr_data(pr_url, owner, repo_name, pr, file_changes, pr_comments)
+    
+    async def get_pr_context_async(self, pr_url: str, include_patches: bool = True) -> Tuple[PRData, DocumentationData]:
+        """Fetch PR data and repository documentation through GraphQL.
+        
+        One query returns the PR metadata, the first 100 files and comments, the
+        README and the testing guideline blobs. PRs with more files or comments
+        need follow-up page queries. GraphQL has no patch text, so patches are
+        still read from the REST files endpoint when include_patches is set.
+        """
+        owner, repo_name, pr_number = self.parse_pr_url(pr_url)
+        variables = {"owner": owner, "name": repo_name, "number": pr_number}
+        
+        data = await self.async_client.graphql(PR_CONTEXT_QUERY, variables)
+        repository = data["repository"]
+        pr = repository["pullRequest"]
+        if pr is None:
+            raise ValueError(f"Pull request not found: {pr_url}")
+        
+        files = list(pr["files"]["nodes"])
+        comments = list(pr["comments"]["nodes"])
+        files_page = pr["files"]["pageInfo"]
+        comments_page = pr["comments"]["pageInfo"]
+        
+        patches_task = None
+        if include_patches:
+            patches_task = asyncio.ensure_future(self.async_client.get_paginated(
+                f"/repos/{owner}/{repo_name}/pulls/{pr_number}/files", min(pr["changedFiles"], PR_FILES_LIMIT)
+            ))
+        
+        try:
+            while files_page["hasNextPage"] or comments_page["hasNextPage"]:
+                more = await self.async_client.graphql(PR_MORE_PAGES_QUERY, {
+                    **variables,
+                    "filesCursor": files_page["endCursor"],
+                    "commentsCursor": comments_page["endCursor"],
+                    "moreFiles": files_page["hasNextPage"],
+                    "moreComments": comments_page["hasNextPage"],
+                })
+                more_pr = more["repository"]["pullRequest"]
+                if files_page["hasNextPage"]:
+                    files.extend(more_pr["files"]["nodes"])
+                    files_page = more_pr["files"]["pageInfo"]
+                if comments_page["hasNextPage"]:
+                    comments.extend(more_pr["comments"]["nodes"])
+                    comments_page = more_pr["comments"]["pageInfo"]
+        except Exception:
+            if patches_task is not None:
+                patches_task.cancel()
+            raise
+        
+        patches = {}
+        if patches_task is not None:
+            try:
+                patches = {file["filename"]: file.get("patch") for file in await patches_task}
+            except Exception as e:
+                print(f"Could not fetch PR patches: {e}")
+        
+        file_changes = [
+            self._file_change_from_json({
+                "filename": file["path"],
+                "additions": file["additions"],
+                "deletions": file["deletions"],
+                "changes": file["additions"] + file["deletions"],
+                "status": CHANGE_TYPE_STATUS.get(file["changeType"], file["changeType"].lower()),
+                "patch": patches.get(file["path"]),
+            })
+            for file in files
+        ]
+        
+        pr_payload = {
+            "title": pr["title"],
+            "body": pr["body"],
+            "labels": pr["labels"]["nodes"],
+            "additions": pr["additions"],
+            "deletions": pr["deletions"],
+            "commits": pr["commits"]["totalCount"],
+            "created_at": pr["createdAt"],
+            "updated_at": pr["updatedAt"],
+            "head": {"sha": pr["headRefOid"]},
+        }
+        pr_comments = [comment["body"] for comment in comments]
+        pr_data = self._build_pr_data(pr_url, owner, repo_name, pr_payload, file_changes, pr_comments)
+        
+        doc_data = self._documentation_from_graphql(repository)
+        
+        # Seed the docs cache so later REST lookups for this revision are free
+        head = repository.get("defaultBranchRef")
+        if head and head.get("target"):
+            self.doc_cache.put((owner, repo_name, head["target"]["tree"]["oid"]), doc_data)
+        
+        return pr_data, doc_data
+    
+    def _documentation_from_graphql(self, repository: dict) -> DocumentationData:
+        """Build DocumentationData from the blob aliases of PR_CONTEXT_QUERY."""
+        doc_data = DocumentationData()
+        
+        readme_content = self._first_blob_text(repository, README_ALIASES)
+        if readme_content:
+            doc_data.readme_content = readme_content
+            doc_data.setup_instructions = self._extract_setup_instructions(readme_content)
+            doc_data.key_features = self._extract_key_features(readme_content)
+        
+        if repository.get("docs"):
+            doc_data.api_documentation = "Documentation folder exists in repo"
+        
+        doc_data.testing_guidelines = self._first_blob_text(repository, TESTING_ALIASES)
+        
+        return doc_data
+    
+    def _first_blob_text(self, repository: dict, aliases: dict) -> Optional[str]:
+        """Return the text of the first alias that resolved to a blob."""
+        for alias in aliases:
+            blob = repository.get(alias)
+            if blob and blob.get("text") is not None:
+                return blob["text"]
+        return None
+    
+    def _build_pr_data(self, pr_url: str, owner: str, repo_name: str, pr: dict,
+                       file_changes: Iterable[FileChange], pr_comments: List[str],
+                       patch_budget: Optional[int] = None) -> PRData:
+        """Assemble PRData from the REST pull request payload and its file changes.
+        
+        file_changes is consumed once, so it may be a generator. With a
+        patch_budget (in characters), patches beyond it are summarized and then
+        dropped, keeping memory bounded on very large PRs. Kept patches are
+        moved into one PatchArena shared by the whole PR.
+        """
+        arena = PatchArena()
+        kept_changes = []
+        file_summaries = []
+        for file_change in file_changes:
+            over_budget = False
+            if patch_budget is not None and file_change.patch:
+                over_budget = len(file_change.patch) > patch_budget
+                if not over_budget:
+                    patch_budget -= len(file_change.patch)
+            if not over_budget:
+                file_change.attach_patch(arena)
+            file_summaries.extend(self._summarize_file_change(file_change))
+            if over_budget:
+                # Summarized above, but the patch itself is not kept
+                file_change.drop_patch()
+            kept_changes.append(file_change)
+        files_changed = [file_change.filename for file_change in kept_changes]
         
         # Create diff summary
-        diff_summary = self._create_diff_summary(file_changes, pr.title, pr.body)
+        diff_summary = self._create_diff_summary(pr["title"], pr["body"], len(kept_changes), file_summaries)
         
         return PRData(
-            title=pr.title,
-            description=pr.body,
-            labels=labels,
+            title=pr["title"],
+            description=pr["body"],
+            labels=[label["name"] for label in pr["labels"]],
             files_changed=files_changed,
-            file_changes=file_changes,
-            additions=pr.additions,
-            deletions=pr.deletions,
-            commits_count=pr.commits,
-            created_at=pr.created_at,
-            updated_at=pr.updated_at,
+            file_changes=kept_changes,
+            additions=pr["additions"],
+            deletions=pr["deletions"],
+            commits_count=pr["commits"],
+            created_at=pr["created_at"],
+            updated_at=pr["updated_at"],
             pr_url=pr_url,
             repo_name=repo_name,
             repo_owner=owner,
+            head_sha=pr["head"]["sha"],
             diff_summary=diff_summary,
             pr_comments=pr_comments
         )
     
-    def _create_diff_summary(self, file_changes: List[FileChange], title: str, description: str) -> str:
+    def _file_change_from_json(self, file: dict) -> FileChange:
+        """Build a FileChange from a REST `pulls/{n}/files` entry."""
+        return FileChange(
+            filename=file["filename"],
+            additions=file["additions"],
+            deletions=file["deletions"],
+            changes=file["changes"],
+            patch=file.get("patch"),  # Absent for binary or very large files
+            status=file["status"]
+        )
+    
+    def _create_diff_summary(self, title: str, description: str, file_count: int,
+                             file_summaries: List[str]) -> str:
         """Create a summary of what changed in the PR."""
         summary_parts = []
         
@@ -96,106 +336,279 @@ class GitHubService:
         if description:
             summary_parts.append(f"Description: {description}")
         
-        summary_parts.append(f"Files changed: {len(file_changes)}")
+        summary_parts.append(f"Files changed: {file_count}")
+        summary_parts.extend(file_summaries)
         
-        for file_change in file_changes:
-            summary_parts.append(f"\n📁 {file_change.filename} ({file_change.status})")
-            summary_parts.append(f"   +{file_change.additions} -{file_change.deletions} lines")
+        return '\n'.join(summary_parts)
+    
+    def _summarize_file_change(self, file_change: FileChange) -> List[str]:
+        """Summary lines for one changed file."""
+        summary_parts = []
+        summary_parts.append(f"\n📁 {file_change.filename} ({file_change.status})")
+        summary_parts.append(f"   +{file_change.additions} -{file_change.deletions} lines")
+        
+        if file_change.has_patch:
+            # Extract key changes from the patch
+            parsed = file_change.parsed_patch()
+            added_lines = parsed.changed_lines('+', limit=3)
+            removed_lines = parsed.changed_lines('-', limit=3)
             
-            if file_change.patch:
-                # Extract key changes from the patch
-                lines = file_change.patch.split('\n')
-                added_lines = [line[1:] for line in lines if line.startswith('+') and not line.startswith('+++')]
-                removed_lines = [line[1:] for line in lines if line.startswith('-') and not line.startswith('---')]
-                
-                if added_lines:
-                    summary_parts.append(f"   Added: {', '.join(added_lines[:3])}")
-                if removed_lines:
-                    summary_parts.append(f"   Removed: {', '.join(removed_lines[:3])}")
+            if added_lines:
+                summary_parts.append(f"   Added: {', '.join(added_lines)}")
+            if removed_lines:
+                summary_parts.append(f"   Removed: {', '.join(removed_lines)}")
         
-        return '\n'.join(summary_parts)
+        return summary_parts
     
     def get_documentation_data(self, owner: str, repo_name: str) -> DocumentationData:
-        """Fetch repository documentation."""
-        repo = self.github.get_repo(f"{owner}/{repo_name}")
+        """Fetch repository documentation, reusing parsed docs for an unchanged default branch."""
+        repo_path = f"/repos/{owner}/{repo_name}"
+        
+        # The root tree identifies the docs revision and lists which files exist
+        try:
+            tree = self.client.get_json(f"{repo_path}/git/trees/HEAD")
+        except Exception as e:
+            print(f"Could not fetch repository tree: {e}")
+            return self._fetch_documentation(repo_path, None)[0]
+        
+        cache_key = (owner, repo_name, tree["sha"])
+        doc_data = self.doc_cache.get(cache_key)
+        if doc_data is None:
+            root_entries = {entry["path"]: entry["type"] for entry in tree["tree"]}
+            complete = True
+            if config.docs_bulk_ingest:
+                try:
+                    # Tarballs are served by commit; the tree SHA only names the docs revision
+                    commit_sha = self.client.get_text(f"{repo_path}/commits/HEAD", accept=SHA_MEDIA_TYPE).strip()
+                    doc_data = self._documentation_from_archive(owner, repo_name, commit_sha, root_entries)
+                except Exception as e:
+                    print(f"Could not ingest repository archive: {e}")
+            if doc_data is None:
+                doc_data, complete = self._fetch_documentation(repo_path, root_entries)
+            # The key only changes with the docs, so a failed download would stick until then
+            if complete:
+                self.doc_cache.put(cache_key, doc_data)
+        
+        return doc_data
+    
+    def ensure_archive(self, owner: str, repo_name: str, commit_sha: str):
+        """Stream the tarball of a commit into the local docs archive, once per commit."""
+        if self.doc_archive.has(owner, repo_name, commit_sha):
+            return
+        
+        response = self.client.open_stream(f"/repos/{owner}/{repo_name}/tarball/{commit_sha}")
+        try:
+            response.raw.decode_content = True
+            self.doc_archive.ingest(owner, repo_name, commit_sha, response.raw)
+        finally:
+            response.close()
+    
+    def _documentation_from_archive(self, owner: str, repo_name: str, revision: str,
+                                    root_entries: dict) -> Optional[DocumentationData]:
+        """Build DocumentationData from local reads of the archived revision.
+        
+        Returns None when the README may be among the files a full archive
+        had no room for, so the caller fetches the docs over the API instead.
+        """
+        self.ensure_archive(owner, repo_name, revision)
         
         doc_data = DocumentationData()
         
+        readme_path = self.doc_archive.find_readme(owner, repo_name, revision)
+        if readme_path is None and self.doc_archive.is_partial(owner, repo_name, revision):
+            return None
+        if readme_path:
+            doc_data.readme_content = self.doc_archive.read(owner, repo_name, revision, readme_path)
+            doc_data.setup_instructions = self._extract_setup_instructions(doc_data.readme_content)
+            doc_data.key_features = self._extract_key_features(doc_data.readme_content)
+        
+        if root_entries.get("docs") == "tree":
+            doc_data.api_documentation = "Documentation folder exists in repo"
+        
+        for test_file in ['TESTING.md', 'TEST.md', 'test/README.md']:
+            content = self.doc_archive.read(owner, repo_name, revision, test_file)
+            if content is not None:
+                doc_data.testing_guidelines = content
+                break
+        
+        return doc_data
+    
+    def _fetch_documentation(self, repo_path: str, root_entries: Optional[dict]) -> Tuple[DocumentationData, bool]:
+        """Download and parse documentation, skipping paths the root tree shows are absent.
+        
+        Also returns whether every download either succeeded or found nothing
+        there; False after a rate limit, server or network error.
+        """
+        def may_exist(path: str) -> bool:
+            if root_entries is None:
+                return True
+            top, _, rest = path.partition('/')
+            return root_entries.get(top) == ("tree" if rest else "blob")
+        
+        doc_data = DocumentationData()
+        complete = True
+        
         # Get README
         try:
-            readme = repo.get_readme()
-            doc_data.readme_content = readme.decoded_content.decode('utf-8')
+            doc_data.readme_content = self.client.get_text(f"{repo_path}/readme", accept=RAW_MEDIA_TYPE)
             doc_data.setup_instructions = self._extract_setup_instructions(doc_data.readme_content)
             doc_data.key_features = self._extract_key_features(doc_data.readme_content)
         except Exception as e:
             print(f"Could not fetch README: {e}")
+            complete = _is_not_found(e)
         
         # Look for additional documentation
-        try:
-            contents = repo.get_contents("docs")
-            if contents:
+        if root_entries is not None:
+            if root_entries.get("docs") == "tree":
                 doc_data.api_documentation = "Documentation folder exists in repo"
-        except Exception:
-            pass
+        else:
+            try:
+                contents = self.client.get_json(f"{repo_path}/contents/docs")
+                if contents:
+                    doc_data.api_documentation = "Documentation folder exists in repo"
+            except Exception:
+                pass
         
         # Check for testing guidelines
-        try:
-            testing_files = ['TESTING.md', 'TEST.md', 'test/README.md']
-            for test_file in testing_files:
-                try:
-                    test_content = repo.get_contents(test_file)
-                    doc_data.testing_guidelines = test_content.decoded_content.decode('utf-8')
-                    break
-                except Exception:
+        testing_files = ['TESTING.md', 'TEST.md', 'test/README.md']
+        for test_file in testing_files:
+            if not may_exist(test_file):
+                continue
+            try:
+                doc_data.testing_guidelines = self.client.get_text(
+                    f"{repo_path}/contents/{test_file}", accept=RAW_MEDIA_TYPE
+                )
+                break
+            except Exception as e:
+                complete = complete and _is_not_found(e)
+                continue
+        
+        return doc_data, complete
+    
+    def get_nearest_readmes(self, pr_data: PRData) -> Dict[str, str]:
+        """Fetch the README closest to the changed files, keyed by README path.
+        
+        Each changed path is walked up to the nearest directory with a README
+        at the PR head revision. The root README is left out; it is already
+        in DocumentationData.readme_content.
+        """
+        owner, repo_name = pr_data.repo_owner, pr_data.repo_name
+        repo_path = f"/repos/{owner}/{repo_name}"
+        revision = pr_data.head_sha or "HEAD"
+        index = self._get_readme_index(owner, repo_name, revision)
+        
+        readmes = {}
+        with index.lock:
+            if not index.complete:
+                # The recursive listing was truncated: list just the directories we need
+                for path in pr_data.files_changed:
+                    for directory in index.unlisted_ancestors(path):
+                        try:
+                            listing = self.client.get_json(f"{repo_path}/contents/{directory}".rstrip('/'),
+                                                           params={"ref": revision})
+                        except Exception:
+                            listing = []
+                        index.mark_listed(directory, [entry["path"] for entry in listing if entry["type"] == "file"])
+            
+            for readme_path in index.nearest_readmes(pr_data.files_changed, config.max_package_readmes + 1):
+                if '/' not in readme_path:
                     continue
-        except Exception:
-            pass
+                if readme_path not in index.contents:
+                    try:
+                        index.contents[readme_path] = self.client.get_text(
+                            f"{repo_path}/contents/{readme_path}", params={"ref": revision}, accept=RAW_MEDIA_TYPE
+                        )
+                    except Exception as e:
+                        print(f"Could not fetch {readme_path}: {e}")
+                        index.contents[readme_path] = None
+                if index.contents[readme_path]:
+                    readmes[readme_path] = index.contents[readme_path]
         
-        return doc_data
+        return dict(list(readmes.items())[:config.max_package_readmes])
     
-    def monitor_deployment_comments(self, pr_url: str) -> DeploymentInfo:
-        """Monitor PR comments for deployment links."""
-        owner, repo_name, pr_number = self.parse_pr_url(pr_url)
-        repo = self.github.get_repo(f"{owner}/{repo_name}")
-        pr = repo.get_pull(pr_number)
+    def _get_readme_index(self, owner: str, repo_name: str, revision: str) -> ReadmeIndex:
+        """Return the README index of a revision, building it from one recursive tree listing."""
+        key = (owner, repo_name, revision)
+        with self._readme_indexes_lock:
+            if key in self._readme_indexes:
+                self._readme_indexes.move_to_end(key)
+                return self._readme_indexes[key]
         
-        deployment_info = DeploymentInfo()
+        tree = self.client.get_json(f"/repos/{owner}/{repo_name}/git/trees/{revision}", params={"recursive": "1"})
+        index = ReadmeIndex(complete=not tree.get("truncated", False))
+        index.add_paths(entry["path"] for entry in tree["tree"] if entry["type"] == "blob")
         
-        # Check comments for deployment links
-        comments = list(pr.get_issue_comments())
+        # A symbolic revision like HEAD moves, so only pin indexes of concrete SHAs
+        if revision != "HEAD":
+            with self._readme_indexes_lock:
+                index = self._readme_indexes.setdefault(key, index)
+                while len(self._readme_indexes) > config.doc_cache_memory_entries:
+                    self._readme_indexes.popitem(last=False)
         
-        # Look for deployment URLs in comments
-        deployment_patterns = [
-            r'https://[^/]+\.fly\.dev[^\s]*',
-            r'https://[^/]+\.vercel\.app[^\s]*',
-            r'https://[^/]+\.netlify\.app[^\s]*',
-            r'https://[^/]+\.herokuapp\.com[^\s]*',
-        ]
+        return index
+    
+    def monitor_deployment_comments(self, pr_url: str) -> DeploymentInfo:
+        """Look up the PR's deployment: head-commit deployments and statuses first, then new PR comments.
         
-        for comment in comments:
-            for pattern in deployment_patterns:
-                matches = re.findall(pattern, comment.body)
-                if matches:
-                    deployment_info.url = matches[0]
-                    deployment_info.status = "deployed"
-                    deployment_info.deployment_time = comment.created_at
-                    
-                    # Determine provider
-                    if 'fly.dev' in deployment_info.url:
-                        deployment_info.provider = "fly.io"
-                    elif 'vercel.app' in deployment_info.url:
-                        deployment_info.provider = "vercel"
-                    elif 'netlify.app' in deployment_info.url:
-                        deployment_info.provider = "netlify"
-                    elif 'herokuapp.com' in deployment_info.url:
-                        deployment_info.provider = "heroku"
-                    
-                    break
-            
-            if deployment_info.url:
-                break
+        A deployment already reported by a webhook is returned without calling GitHub.
+        """
+        return self.pr_states.deployment(pr_url) or self._get_deployment_watcher(pr_url).poll(self._known_head_sha(pr_url))
+    
+    def wait_for_deployment(self, pr_url: str, max_wait_minutes: Optional[float] = None) -> DeploymentInfo:
+        """Wait until a deployment link appears or MAX_DEPLOYMENT_WAIT_MINUTES passes.
+        
+        With webhooks configured, one comment scan covers deployments made
+        before the server started listening and the rest of the wait blocks on
+        webhook deliveries. Otherwise the lookup is polled with backoff.
+        """
+        if not config.github_webhook_secret:
+            return self._get_deployment_watcher(pr_url).wait(max_wait_minutes, head_sha=self._known_head_sha(pr_url))
         
-        return deployment_info
+        info = self.monitor_deployment_comments(pr_url)
+        if info.url:
+            return info
+        if max_wait_minutes is None:
+            max_wait_minutes = config.max_deployment_wait_minutes
+        deployment = self.pr_states.wait_for_deployment(pr_url, max_wait_minutes * 60)
+        if deployment is None:
+            info.status = "timeout"
+            return info
+        return deployment
+    
+    async def get_head_sha_async(self, pr_url: str) -> str:
+        """Current head commit of a PR: from webhook state when known, else one ETag-revalidated call."""
+        known = self._known_head_sha(pr_url)
+        if known:
+            return known
+        owner, repo_name, pr_number = self.parse_pr_url(pr_url)
+        pr = await self.async_client.get_json(f"/repos/{owner}/{repo_name}/pulls/{pr_number}")
+        return pr["head"]["sha"]
+    
+    def _known_head_sha(self, pr_url: str) -> Optional[str]:
+        """Head commit of a PR as last reported by webhooks; None makes the watcher ask GitHub."""
+        state = self.pr_states.get(pr_url)
+        return state.head_sha if state is not None else None
+    
+    def forget_deployment_watcher(self, pr_url: str):
+        """Drop a PR's comment-scan state so its next lookup starts from scratch.
+        
+        A push alone doesn't need this: the watcher notices the new head on its next poll.
+        """
+        with self._deployment_watchers_lock:
+            self._deployment_watchers.pop(pr_url, None)
+    
+    def _get_deployment_watcher(self, pr_url: str) -> DeploymentWatcher:
+        """Return the watcher of a PR, keeping its scan position between calls."""
+        owner, repo_name, pr_number = self.parse_pr_url(pr_url)
+        with self._deployment_watchers_lock:
+            watcher = self._deployment_watchers.get(pr_url)
+            if watcher is None:
+                watcher = DeploymentWatcher(self.client, owner, repo_name, pr_number)
+                self._deployment_watchers[pr_url] = watcher
+            self._deployment_watchers.move_to_end(pr_url)
+            while len(self._deployment_watchers) > config.deployment_watcher_max_prs:
+                self._deployment_watchers.popitem(last=False)
+        return watcher
     
     def _extract_setup_instructions(self, readme_content: str) -> Optional[str]:
         """Extract setup/installation instructions from README."""
@@ -0,0 +1,113 @@
+import time
+import threading
+from typing import Any, Dict, List, Mapping, Optional, Tuple
+
+class GitHubTokenPool:
+    """Pool of GitHub credentials balanced by remaining quota.
+
+    Each token keeps its own X-RateLimit budget per resource. Requests go to
+    the token with the most quota left; a token that is exhausted or hit a
+    secondary limit is parked until its reset time. Personal access tokens and
+    GitHub App installation tokens are used the same way.
+    """
+
+    # Quota assumed for a token before GitHub has reported its real budget
+    DEFAULT_LIMIT = 5000
+
+    def __init__(self, tokens: List[str]):
+        if not tokens:
+            raise ValueError("GitHubTokenPool needs at least one token")
+        self.tokens = list(dict.fromkeys(tokens))
+        self._lock = threading.Lock()
+        self._budgets: Dict[str, Dict[str, Dict[str, float]]] = {token: {} for token in self.tokens}
+        self._parked_until: Dict[str, float] = {token: 0.0 for token in self.tokens}
+
+    def _remaining(self, token: str, resource: str, now: float) -> float:
+        budget = self._budgets[token].get(resource)
+        if budget is None or budget["reset_at"] <= now:
+            return budget["limit"] if budget else self.DEFAULT_LIMIT
+        return budget["remaining"]
+
+    def _available_at(self, token: str, resource: str, now: float) -> float:
+        """Time at which token may be used again (now if it is usable)."""
+        available = max(now, self._parked_until[token])
+        budget = self._budgets[token].get(resource)
+        if budget and budget["remaining"] <= 0 and budget["reset_at"] > now:
+            available = max(available, budget["reset_at"])
+        return available
+
+    def choose(self, resource: str = "core") -> Tuple[Optional[str], float]:
+        """Pick the usable token with the most remaining quota.
+
+        Returns (token, 0) or, when every token is parked, (None, seconds
+        until the first one becomes usable).
+        """
+        now = time.time()
+        with self._lock:
+            usable = [token for token in self.tokens if self._available_at(token, resource, now) <= now]
+            if usable:
+                return max(usable, key=lambda token: self._remaining(token, resource, now)), 0.0
+            return None, min(self._available_at(token, resource, now) for token in self.tokens) - now
+
+    def consume(self, token: str, resource: str = "core"):
+        """Count a request against token before its response headers arrive."""
+        with self._lock:
+            budget = self._budgets[token].get(resource)
+            if budget:
+                budget["remaining"] -= 1
+
+    def record(self, token: str, headers: Mapping[str, str]) -> str:
+        """Update token's budget from X-RateLimit headers; returns the resource name."""
+        resource = headers.get("X-RateLimit-Resource", "core")
+        if headers.get("X-RateLimit-Remaining") is not None:
+            with self._lock:
+                self._budgets[token][resource] = {
+                    "limit": int(headers.get("X-RateLimit-Limit", self.DEFAULT_LIMIT)),
+                    "remaining": int(headers["X-RateLimit-Remaining"]),
+                    "reset_at": float(headers.get("X-RateLimit-Reset", time.time())),
+                }
+        return resource
+
+    def park(self, token: str, until: float):
+        """Keep token out of rotation until the given epoch time."""
+        with self._lock:
+            self._parked_until[token] = max(self._parked_until[token], until)
+
+    def reset_time(self, token: str, resource: str = "core") -> Optional[float]:
+        with self._lock:
+            budget = self._budgets[token].get(resource)
+            return budget["reset_at"] if budget else None
+
+    def aggregate(self, resource: str = "core") -> Optional[Dict[str, float]]:
+        """Combined budget of all tokens for resource, if any has been reported."""
+        now = time.time()
+        with self._lock:
+            budgets = [self._budgets[token].get(resource) for token in self.tokens]
+            if not any(budgets):
+                return None
+            live = [budget for budget in budgets if budget and budget["reset_at"] > now]
+            return {
+                "limit": sum(budget["limit"] if budget else self.DEFAULT_LIMIT for budget in budgets),
+                "remaining": sum(self._remaining(token, resource, now) for token in self.tokens),
+                "reset_at": min((budget["reset_at"] for budget in live), default=now),
+            }
+
+    def stats(self) -> List[Dict[str, Any]]:
+        """Per-token budgets with the token itself masked."""
+        now = time.time()
+        with self._lock:
+            return [
+                {
+                    "token": "***" + token[-4:],
+                    "parked_for_seconds": max(0.0, round(self._parked_until[token] - now, 1)),
+                    "budgets": {
+                        resource: {
+                            "limit": budget["limit"],
+                            "remaining": budget["remaining"],
+                            "resets_in_seconds": max(0.0, round(budget["reset_at"] - now, 1)),
+                        }
+                        for resource, budget in self._budgets[token].items()
+                    },
+                }
+                for token in self.tokens
+            ]
@@ -0,0 +1,126 @@
+import asyncio
+import time
+import uuid
+from collections import OrderedDict
+from datetime import datetime
+from enum import Enum
+from typing import Any, Awaitable, Callable, List, Optional
+
+from pydantic import BaseModel, Field
+
+from src.config import config
+
+class JobStatus(str, Enum):
+    QUEUED = "queued"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+
+class Job(BaseModel):
+    """One report generation run, as reported by GET /jobs/{id}."""
+    id: str
+    pr_url: str
+    output_file: Optional[str] = None
+    refresh: bool = False
+    status: JobStatus = JobStatus.QUEUED
+    stage: str = "queued"
+    progress: float = 0.0  # 0.0 to 1.0
+    created_at: datetime = Field(default_factory=datetime.now)
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    result: Optional[Any] = None
+    error: Optional[str] = None
+
+    def advance(self, stage: str, progress: float):
+        """Record that the run reached a stage."""
+        self.stage = stage
+        self.progress = max(self.progress, min(progress, 1.0))
+
+class JobQueueFull(Exception):
+    """Raised when JOB_MAX_QUEUED jobs are already waiting for a worker."""
+
+JobRunner = Callable[[Job], Awaitable[Any]]
+
+class JobManager:
+    """In-process job queue worked by a fixed pool of asyncio workers.
+
+    Submitting only enqueues, so the request that asked for a report returns
+    at once with the job ID. Finished jobs keep their result for
+    JOB_RESULT_TTL_SECONDS and are then forgotten.
+    """
+
+    def __init__(self, run: JobRunner, workers: Optional[int] = None,
+                 result_ttl_seconds: Optional[float] = None, max_queued: Optional[int] = None):
+        self.run = run
+        self.workers = workers or config.job_workers
+        self.result_ttl_seconds = config.job_result_ttl_seconds if result_ttl_seconds is None else result_ttl_seconds
+        self.max_queued = max_queued or config.job_max_queued
+        self._jobs: "OrderedDict[str, Job]" = OrderedDict()
+        self._finished_at: "OrderedDict[str, float]" = OrderedDict()  # job id -> monotonic finish time, oldest first
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks: List[asyncio.Task] = []
+
+    async def start(self):
+        """Start the worker pool in the running loop."""
+        self._queue = asyncio.Queue(maxsize=self.max_queued)
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    async def stop(self):
+        """Cancel the workers; queued jobs are dropped."""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def submit(self, pr_url: str, output_file: Optional[str] = None, refresh: bool = False) -> Job:
+        """Queue a run and return its job without waiting for a worker."""
+        self._expire()
+        job = Job(id=uuid.uuid4().hex, pr_url=pr_url, output_file=output_file, refresh=refresh)
+        try:
+            self._queue.put_nowait(job.id)
+        except asyncio.QueueFull:
+            raise JobQueueFull(f"{self.max_queued} jobs are already queued")
+        self._jobs[job.id] = job
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        self._expire()
+        return self._jobs.get(job_id)
+
+    def stats(self) -> dict:
+        counts = {status.value: 0 for status in JobStatus}
+        for job in self._jobs.values():
+            counts[job.status.value] += 1
+        return {"workers": self.workers, "queued": self._queue.qsize() if self._queue else 0, "jobs": counts}
+
+    async def _worker(self):
+        while True:
+            job = self._jobs.get(await self._queue.get())
+            if job is None:
+                continue
+            job.status = JobStatus.RUNNING
+            job.started_at = datetime.now()
+            job.advance("starting", 0.0)
+            try:
+                job.result = await self.run(job)
+                job.status = JobStatus.SUCCEEDED
+                job.advance("done", 1.0)
+            except asyncio.CancelledError:
+                job.status = JobStatus.FAILED
+                job.error = "Server shut down before the job finished"
+                raise
+            except Exception as e:
+                job.status = JobStatus.FAILED
+                job.error = str(e)
+            finally:
+                job.finished_at = datetime.now()
+                self._finished_at[job.id] = time.monotonic()
+
+    def _expire(self):
+        cutoff = time.monotonic() - self.result_ttl_seconds
+        while self._finished_at:
+            job_id, finished = next(iter(self._finished_at.items()))
+            if finished > cutoff:
+                break
+            del self._finished_at[job_id]
+            self._jobs.pop(job_id, None)
@@ -0,0 +1,116 @@
+import os
+import json
+import time
+import threading
+from typing import Any, Dict, Optional, Tuple
+
+class JsonFileStore:
+    """Directory of JSON entries, one file per key, capped in size by LRU eviction.
+
+    The on-disk layer shared by the GitHub response cache and the LLM
+    completion cache. File modification times double as last-access times,
+    so the LRU order survives restarts; the index of sizes and access times
+    is built from one directory scan on first use. Hits and misses are
+    counted here too, as each cache defines them (record()).
+    """
+
+    def __init__(self, directory: str, max_bytes: int):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._index: Optional[Dict[str, Tuple[int, float]]] = None  # key -> (size, last access)
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        os.makedirs(self.directory, exist_ok=True)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.json")
+
+    def _load_index(self) -> Dict[str, Tuple[int, float]]:
+        """Scan the directory once to learn entry sizes and access times."""
+        if self._index is None:
+            self._index = {}
+            for name in os.listdir(self.directory):
+                if not name.endswith('.json'):
+                    continue
+                stat = os.stat(os.path.join(self.directory, name))
+                self._index[name[:-5]] = (stat.st_size, stat.st_mtime)
+        return self._index
+
+    def read(self, key: str) -> Optional[Dict[str, Any]]:
+        """Return the stored entry for key, or None if there is none (or it is unreadable)."""
+        try:
+            with open(self._path(key), 'r', encoding='utf-8') as fh:
+                return json.load(fh)
+        except (OSError, ValueError):
+            return None
+
+    def record(self, hit: bool):
+        """Count a lookup for stats()."""
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def touch(self, key: str):
+        """Mark an entry as just used, moving it to the back of the eviction order."""
+        now = time.time()
+        with self._lock:
+            index = self._load_index()
+            if key in index:
+                index[key] = (index[key][0], now)
+        try:
+            os.utime(self._path(key), (now, now))
+        except OSError:
+            pass
+
+    def write(self, key: str, entry: Dict[str, Any]):
+        """Store an entry, then evict the least recently used ones over max_bytes."""
+        data = json.dumps(entry)
+
+        # Write to a temp file first so concurrent readers never see a partial entry
+        path = self._path(key)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as fh:
+            fh.write(data)
+        os.replace(tmp_path, path)
+
+        with self._lock:
+            index = self._load_index()
+            index[key] = (len(data.encode('utf-8')), time.time())
+            self._evict(index)
+
+    def _evict(self, index: Dict[str, Tuple[int, float]]):
+        """Drop least recently used entries until the store fits in max_bytes."""
+        total = sum(size for size, _ in index.values())
+        if total <= self.max_bytes:
+            return
+
+        for key, (size, _) in sorted(index.items(), key=lambda item: item[1][1]):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(self._path(key))
+            except OSError:
+                pass
+            del index[key]
+            total -= size
+            self.evictions += 1
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters and current disk usage."""
+        with self._lock:
+            index = self._load_index()
+            requests = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / requests if requests else 0.0,
+                'evictions': self.evictions,
+                'entries': len(index),
+                'size_bytes': sum(size for size, _ in index.values()),
+                'max_bytes': self.max_bytes,
+            }
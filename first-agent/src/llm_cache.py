@@ -0,0 +1,118 @@
+import json
+import time
+import hashlib
+from typing import Any, Dict, List, Optional
+
+from crewai.llms.base_llm import BaseLLM
+from pydantic import Field
+
+from src.json_file_store import JsonFileStore
+
+# Request fields that change what the model answers; anything else (API key, callbacks) doesn't
+CACHED_PARAMS = ("temperature", "top_p", "max_tokens", "seed", "frequency_penalty", "presence_penalty", "n", "stop")
+
+class CompletionCache:
+    """Persistent cache of LLM completions keyed by model, parameters and messages.
+
+    One JSON file per completion in a JsonFileStore, like the GitHub response
+    cache. Entries older than the TTL count as misses, and the least recently
+    used ones are evicted once the directory grows past max_bytes.
+    """
+
+    def __init__(self, directory: str, max_bytes: int, ttl_seconds: float):
+        self.files = JsonFileStore(directory, max_bytes)
+        self.ttl_seconds = ttl_seconds
+
+    @staticmethod
+    def make_key(model: str, params: Dict[str, Any], messages: Any) -> str:
+        """Hash of everything that determines the completion."""
+        raw = json.dumps({"model": model, "params": params, "messages": messages},
+                         sort_keys=True, ensure_ascii=False, default=str)
+        return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        """Return the cached completion for key, or None if missing or expired."""
+        entry = self.files.read(key)
+        if entry is None or time.time() - entry['stored_at'] > self.ttl_seconds:
+            self.files.record(hit=False)
+            return None
+
+        self.files.record(hit=True)
+        self.files.touch(key)
+        return entry['completion']
+
+    def put(self, key: str, model: str, completion: str):
+        self.files.write(key, {'model': model, 'completion': completion, 'stored_at': time.time()})
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters and current disk usage."""
+        return self.files.stats()
+
+class CachedLLM(BaseLLM):
+    """CrewAI LLM that answers repeated prompts from a CompletionCache.
+
+    Plain text completions are cached; calls with tools, functions or a
+    response model go straight to the wrapped LLM, since their result is
+    more than the returned text. A miss that fails isn't stored, so a retry
+    after a transient error only pays for the calls that didn't complete.
+    """
+
+    llm_type: str = "cached"
+    llm: Any = Field(exclude=True)
+    cache: Any = Field(exclude=True)
+
+    @classmethod
+    def wrap(cls, llm: BaseLLM, cache: CompletionCache) -> "CachedLLM":
+        return cls(
+            model=llm.model, llm=llm, cache=cache, provider=llm.provider, base_url=llm.base_url,
+            **{name: getattr(llm, name) for name in CACHED_PARAMS if getattr(llm, name, None) is not None},
+        )
+
+    def cache_key(self, messages: Any) -> str:
+        # CrewAI sets stop words on the agent's LLM, which is this wrapper; pass them on
+        self.llm.stop = self.stop
+        params = {name: getattr(self.llm, name, None) for name in CACHED_PARAMS}
+        params["additional_params"] = getattr(self.llm, "additional_params", None)
+        return self.cache.make_key(self.llm.model, params, messages)
+
+    def call(self, messages: Any, tools: Optional[List[dict]] = None, callbacks: Optional[List[Any]] = None,
+             available_functions: Optional[Dict[str, Any]] = None, from_task: Any = None,
+             from_agent: Any = None, response_model: Any = None) -> Any:
+        if tools or available_functions or response_model:
+            self.llm.stop = self.stop
+            return self.llm.call(messages, tools, callbacks, available_functions, from_task, from_agent, response_model)
+
+        key = self.cache_key(messages)
+        completion = self.cache.get(key)
+        if completion is None:
+            completion = self.llm.call(messages, tools, callbacks, available_functions,
+                                       from_task, from_agent, response_model)
+            if isinstance(completion, str):
+                self.cache.put(key, self.llm.model, completion)
+        return completion
+
+    async def acall(self, messages: Any, tools: Optional[List[dict]] = None, callbacks: Optional[List[Any]] = None,
+                    available_functions: Optional[Dict[str, Any]] = None, from_task: Any = None,
+                    from_agent: Any = None, response_model: Any = None) -> Any:
+        if tools or available_functions or response_model:
+            self.llm.stop = self.stop
+            return await self.llm.acall(messages, tools, callbacks, available_functions,
+                                        from_task, from_agent, response_model)
+
+        key = self.cache_key(messages)
+        completion = self.cache.get(key)
+        if completion is None:
+            completion = await self.llm.acall(messages, tools, callbacks, available_functions,
+                                              from_task, from_agent, response_model)
+            if isinstance(completion, str):
+                self.cache.put(key, self.llm.model, completion)
+        return completion
+
+    def supports_function_calling(self) -> bool:
+        return getattr(self.llm, "supports_function_calling", lambda: False)()
+
+    def supports_stop_words(self) -> bool:
+        return self.llm.supports_stop_words()
+
+    def get_context_window_size(self) -> int:
+        return self.llm.get_context_window_size()
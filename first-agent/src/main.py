@@ -1,6 +1,6 @@
 import asyncio
 from datetime import datetime
-from typing import Optional
+from typing import Callable, Optional
 import weave
 from rich.console import Console
 from rich.progress import Progress, SpinnerColumn, TextColumn
@@ -8,9 +8,11 @@ from rich.panel import Panel
 from rich.markdown import Markdown
 
 from src.config import config
-from src.agents import QAContextAgents
+from src.agents import QAContextAgents, QA_PROMPT_VERSION
 from src.report_formatter import ReportFormatter
 from src.models import QAReport
+from src.stage_executor import stage_executor
+from src.report_cache import ReportCache, ReportKey
 
 class QAContextGenerator:
     """Main orchestrator for the QA Context Generator application."""
@@ -19,19 +21,35 @@ class QAContextGenerator:
         self.console = Console()
         self.agents = QAContextAgents()
         self.formatter = ReportFormatter()
+        self.report_cache = ReportCache(
+            config.report_cache_path,
+            max_memory_entries=config.report_cache_memory_entries,
+            max_entries=config.report_cache_max_entries,
+            ttl_seconds=config.report_cache_ttl_hours * 3600,
+        ) if config.report_cache_enabled else None
         
         # Initialize W&B Weave
         self.project_name = config.initialize_weave()
         self.console.print(f"[green]✓[/green] Initialized W&B Weave project: {self.project_name}")
     
     @weave.op()
-    async def generate_qa_context(self, pr_url: str, output_file: Optional[str] = None) -> QAReport:
+    async def generate_qa_context(self, pr_url: str, output_file: Optional[str] = None,
+                                  progress: Optional[Callable[[str, float], None]] = None,
+                                  head_sha: Optional[str] = None, use_cache: bool = True,
+                                  on_token: Optional[Callable[[str, str], None]] = None) -> QAReport:
         """
         Generate comprehensive QA context from a GitHub PR URL.
         
+        A report already generated for the PR's current head commit, model and
+        prompt version is returned from the report cache without running the crew.
+        
         Args:
             pr_url: GitHub pull request URL
             output_file: Optional output file path (without extension)
+            progress: Optional callback told each stage name and the fraction done
+            head_sha: PR head commit if the caller already resolved it
+            use_cache: Set to False to regenerate (the new report still replaces the cached one)
+            on_token: Optional callback given the task name and each chunk of model output
             
         Returns:
             QAReport: Complete QA report with all context
@@ -44,9 +62,20 @@ class QAContextGenerator:
 
         print("generate_qa_context from main.py")
         
+        cache_key = await self._report_cache_key(pr_url, head_sha)
+        if use_cache and cache_key is not None:
+            cached_report = self.report_cache.get(cache_key)
+            if cached_report is not None:
+                self.console.print(f"[green]✓[/green] Using cached QA report for commit {cache_key.head_sha[:7]}")
+                if progress:
+                    progress("cached", 1.0)
+                return cached_report
+        
         # Collect GitHub data
+        if progress:
+            progress("collecting_github_data", 0.1)
         self.console.print("Collecting GitHub data...")
-        github_result = self.agents.collect_github_data(pr_url)
+        github_result = await self.agents.collect_github_data_async(pr_url, progress=progress)
         
         if not github_result.success:
             self.console.print(f"[red]❌ Failed to collect GitHub data: {github_result.error}[/red]")
@@ -74,15 +103,37 @@ class QAContextGenerator:
         else:
             self.console.print("[yellow]⚠️  No README found in repository[/yellow]")
         
+        if doc_data.package_readmes:
+            self.console.print(f"[bold]Package READMEs near the changes:[/bold]")
+            for path in doc_data.package_readmes:
+                self.console.print(f"  • {path}")
+        
         # Generate QA context using agents
+        if progress:
+            progress("generating_qa_context", 0.4)
         self.console.print(f"\n[bold]🤖 Generating QA Context...[/bold]")
-        qa_context_result = self.agents.generate_qa_context(
-            pr_title=pr_data.title,
-            pr_description=pr_data.description,
-            readme_content=doc_data.readme_content
-        )
+        # The deployment lookup and readiness probe run while the model works
+        deployment_task = asyncio.ensure_future(self.agents.monitor_deployment(pr_url))
+        try:
+            # crew.kickoff() blocks for the whole LLM run; keep it off the event loop
+            qa_context_result = await stage_executor.run(
+                "llm",
+                self.agents.generate_qa_context,
+                pr_title=pr_data.title,
+                pr_description=pr_data.description,
+                readme_content=doc_data.readme_content,
+                file_changes=pr_data.file_changes,
+                package_readmes=doc_data.package_readmes,
+                on_token=on_token
+            )
+        except BaseException:
+            deployment_task.cancel()
+            raise
+        self._display_deployment(deployment_task)
         
         if qa_context_result.success:
+            if cache_key is not None and isinstance(qa_context_result.data, str):
+                self.report_cache.put(cache_key, qa_context_result.data)
             self.console.print(f"[green]✓[/green] QA Context generated successfully!")
             self.console.print(f"[bold]Execution time:[/bold] {qa_context_result.execution_time:.2f} seconds")
             return qa_context_result.data
@@ -90,6 +141,47 @@ class QAContextGenerator:
             self.console.print(f"[red]❌ Failed to generate QA context: {qa_context_result.error}[/red]")
             raise Exception(f"QA context generation failed: {qa_context_result.error}")
     
+    async def _report_cache_key(self, pr_url: str, head_sha: Optional[str]) -> Optional[ReportKey]:
+        """Cache key of the PR's current revision, or None when caching is off or the head is unknown."""
+        if self.report_cache is None:
+            return None
+        if head_sha is None:
+            try:
+                head_sha = await self.agents.github_service.get_head_sha_async(pr_url)
+            except Exception as e:
+                print(f"Could not resolve PR head commit, not caching: {e}")
+                return None
+        return ReportKey(pr_url, head_sha, config.model_name, QA_PROMPT_VERSION)
+    
+    async def aclose(self):
+        """Release pooled network resources held by the generator."""
+        await self.agents.github_service.async_client.close()
+        if self.report_cache is not None:
+            self.report_cache.close()
+    
+    def _display_deployment(self, deployment_task: "asyncio.Future"):
+        """Print what the deployment check found; a probe still running is not waited for."""
+        if not deployment_task.done():
+            deployment_task.cancel()
+            self.console.print("[dim]Deployment is still being probed; not waiting for it[/dim]")
+            return
+        
+        deployment_result = deployment_task.result()
+        if not deployment_result.success:
+            self.console.print(f"[yellow]⚠️  Could not check deployment: {deployment_result.error}[/yellow]")
+            return
+        
+        deployment = deployment_result.data
+        if not deployment.url:
+            self.console.print("[yellow]⚠️  No deployment link found yet[/yellow]")
+        elif deployment.ready:
+            ready_after = f" after {deployment.time_to_ready:.1f}s" if deployment.time_to_ready is not None else ""
+            self.console.print(f"[green]✓[/green] Deployment ready{ready_after}: {deployment.url}")
+        elif config.deployment_probe_enabled:
+            self.console.print(f"[yellow]⚠️  Deployment not answering yet: {deployment.url}[/yellow]")
+        else:
+            self.console.print(f"[green]✓[/green] Deployment: {deployment.url}")
+    
     def _display_results(self, qa_report: QAReport):
         """Display the QA report results in the console."""
         self.console.print("\n" + "="*80)
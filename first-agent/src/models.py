@@ -1,7 +1,9 @@
-from pydantic import BaseModel, Field, HttpUrl
+from pydantic import BaseModel, Field, HttpUrl, PrivateAttr, field_serializer
 from typing import List, Optional, Dict, Any
 from datetime import datetime
 from enum import Enum
+from src.patch_arena import PatchArena
+from src.diff_parser import ParsedPatch, parse_arena_patch, parse_patch
 
 class Priority(str, Enum):
     HIGH = "High"
@@ -14,8 +16,55 @@ class FileChange(BaseModel):
     additions: int
     deletions: int
     changes: int
-    patch: Optional[str] = None  # The actual diff content
+    patch: Optional[str] = None  # The actual diff content, until moved into a PatchArena
     status: str  # modified, added, removed, etc.
+    _arena: Optional[PatchArena] = PrivateAttr(default=None)
+    _patch_handle: Optional[int] = PrivateAttr(default=None)
+    _parsed_patch: Optional[ParsedPatch] = PrivateAttr(default=None)
+    
+    @field_serializer('patch')
+    def _serialize_patch(self, patch: Optional[str]) -> Optional[str]:
+        return self.patch_text()
+    
+    def attach_patch(self, arena: PatchArena):
+        """Move the patch into the PR's shared arena, releasing the string."""
+        if self.patch is None:
+            return
+        self._patch_handle = arena.add(self.patch)
+        self._arena = arena
+        self.patch = None
+    
+    def drop_patch(self):
+        """Forget the patch text and anything parsed from it; the line stats stay."""
+        self.patch = None
+        self._arena = None
+        self._patch_handle = None
+        self._parsed_patch = None
+    
+    @property
+    def has_patch(self) -> bool:
+        return self._arena is not None or bool(self.patch)
+    
+    def patch_text(self) -> Optional[str]:
+        """The full patch as a string (decoded from the arena when stored there)."""
+        if self._arena is not None:
+            return self._arena.text(self._patch_handle)
+        return self.patch
+    
+    def parsed_patch(self) -> ParsedPatch:
+        """Hunks of the patch, found on first use and then reused.
+
+        The parse keeps hunk headers and offsets into the arena, not line text,
+        so holding it for the life of the PR costs next to nothing.
+        """
+        parsed = self._parsed_patch
+        if parsed is None:
+            if self._arena is not None:
+                parsed = parse_arena_patch(self._arena, self._patch_handle)
+            else:
+                parsed = parse_patch(self.patch)
+            self._parsed_patch = parsed
+        return parsed
 
 class PRData(BaseModel):
     """Model for GitHub Pull Request data."""
@@ -32,6 +81,7 @@ class PRData(BaseModel):
     pr_url: str
     repo_name: str
     repo_owner: str
+    head_sha: Optional[str] = None  # Commit the PR currently points at
     # Debug fields
     diff_summary: Optional[str] = None  # Summary of what changed
     pr_comments: List[str] = []  # PR comments for additional context
@@ -44,6 +94,7 @@ class DocumentationData(BaseModel):
     key_features: List[str] = []
     testing_guidelines: Optional[str] = None
     known_issues: List[str] = []
+    package_readmes: Dict[str, str] = {}  # README path -> content, nearest to the changed files
 
 class DeploymentInfo(BaseModel):
     """Model for deployment information."""
@@ -53,6 +104,20 @@ class DeploymentInfo(BaseModel):
     status: str = "pending"
     deployment_time: Optional[datetime] = None
     provider: Optional[str] = None  # fly.io, vercel, etc.
+    ready: bool = False  # Set once the URL answered healthy, not just when it was announced
+    time_to_ready: Optional[float] = None  # Seconds of probing until it did
+
+class PRState(BaseModel):
+    """Latest known state of a pull request, kept current by GitHub webhooks."""
+    pr_url: str
+    repo_full_name: str
+    number: int
+    title: Optional[str] = None
+    state: str = "open"
+    head_ref: Optional[str] = None
+    head_sha: Optional[str] = None
+    updated_at: datetime = Field(default_factory=datetime.now)
+    deployment: Optional[DeploymentInfo] = None
 
 class TestingScenario(BaseModel):
     """Model for individual testing scenarios."""
@@ -0,0 +1,69 @@
+from array import array
+from typing import Any, Iterator, List, Match, Optional, Pattern, Tuple
+
+class PatchArena:
+    """Contiguous UTF-8 storage for the patches of one pull request.
+
+    Every patch is appended to a single bytearray and one offset array records
+    where each patch starts. ASCII text costs what a str would, but one emoji
+    no longer makes CPython widen a whole patch to two or four bytes per
+    character. Readers scan byte ranges of the buffer in place and decode
+    only the ranges they use.
+    """
+
+    def __init__(self):
+        self._buffer = bytearray()
+        # Offset where each patch starts, plus one past the end of the buffer.
+        # Every patch is followed by a newline, so a hunk header is always at
+        # the start of the patch or right after a newline.
+        # 32-bit offsets cap an arena at 4 GiB, far above GitHub's diff limits.
+        self._patch_starts = array('I', [0])
+
+    def __len__(self) -> int:
+        return len(self._patch_starts) - 1
+
+    def __deepcopy__(self, memo):
+        # Patches are never modified once added, so copies of the models
+        # that point into the arena can keep sharing it
+        return self
+
+    @property
+    def nbytes(self) -> int:
+        """Bytes held by the buffer and offset array."""
+        return len(self._buffer) + len(self._patch_starts) * self._patch_starts.itemsize
+
+    def add(self, patch: str) -> int:
+        """Append a patch and return the handle used to read it back."""
+        self._buffer += patch.encode('utf-8')
+        self._buffer += b'\n'
+        self._patch_starts.append(len(self._buffer))
+        return len(self) - 1
+
+    def span(self, handle: int) -> Tuple[int, int]:
+        """Byte offsets of a patch in the buffer, excluding its trailing newline."""
+        return self._patch_starts[handle], self._patch_starts[handle + 1] - 1
+
+    def text(self, handle: int) -> str:
+        """Decode a whole patch back into a string."""
+        return self.decode(*self.span(handle))
+
+    def decode(self, start: int, end: int) -> str:
+        """Decode a byte range of the buffer, e.g. one hunk of a patch, without copying it first."""
+        with memoryview(self._buffer) as view:
+            return str(view[start:end], 'utf-8')
+
+    # Scans of a byte range in place, for parsers that keep offsets rather than text
+    def count(self, sub: bytes, start: int, end: int) -> int:
+        return self._buffer.count(sub, start, end)
+
+    def find(self, sub: bytes, start: int, end: int) -> int:
+        return self._buffer.find(sub, start, end)
+
+    def match(self, pattern: Pattern[bytes], start: int, end: int) -> Optional[Match[bytes]]:
+        return pattern.match(self._buffer, start, end)
+
+    def findall(self, pattern: Pattern[bytes], start: int, end: int) -> List[Any]:
+        return pattern.findall(self._buffer, start, end)
+
+    def finditer(self, pattern: Pattern[bytes], start: int, end: int) -> Iterator[Match[bytes]]:
+        return pattern.finditer(self._buffer, start, end)
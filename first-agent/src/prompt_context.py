@@ -0,0 +1,303 @@
+import re
+from functools import partial
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional, Set, Tuple, Union
+
+from src.config import config
+from src.diff_parser import DiffHunk
+from src.models import FileChange
+
+# Context windows by model name fragment (matched case-insensitively, first hit wins)
+MODEL_CONTEXT_WINDOWS = (
+    ("llama-3.1", 128_000),
+    ("llama-3.2", 128_000),
+    ("llama-3.3", 128_000),
+    ("llama-4", 128_000),
+    ("gpt-4o", 128_000),
+    ("gpt-4.1", 1_000_000),
+    ("deepseek", 64_000),
+    ("qwen", 32_768),
+    ("phi-4", 16_384),
+)
+DEFAULT_CONTEXT_WINDOW = 8_192
+# Left free for the task instructions and the model's answer
+RESPONSE_RESERVE_TOKENS = 4_096
+
+# The description is high priority but shouldn't crowd out the diff when someone pastes a log into it
+DESCRIPTION_BUDGET_SHARE = 0.5
+# Diff hunks come before the README, but leave it some room; anything the diff doesn't use goes to the README
+DIFF_BUDGET_SHARE = 0.7
+# The changed-file list is a table of contents; past this share it crowds out the hunks it names
+FILE_LIST_BUDGET_SHARE = 0.1
+# Below this, a truncated piece carries too little to be worth its tag
+MIN_PIECE_TOKENS = 48
+
+# Files whose diffs say little about what to test
+LOW_VALUE_FILE_PATTERN = re.compile(
+    r'(^|/)(package-lock\.json|yarn\.lock|pnpm-lock\.yaml|poetry\.lock|Pipfile\.lock|Cargo\.lock|go\.sum)$'
+    r'|\.(min\.js|min\.css|map|snap|svg|lock)$'
+    r'|(^|/)(dist|build|vendor|node_modules|__snapshots__)/',
+    re.IGNORECASE,
+)
+TEST_FILE_PATTERN = re.compile(r'(^|/)(tests?|__tests__|spec)/|(^|/)test_[^/]*$|[._-](test|spec)\.[^/]+$', re.IGNORECASE)
+
+# Path fragments too common to say which README section is relevant
+GENERIC_PATH_TERMS = {
+    "src", "lib", "app", "apps", "pkg", "packages", "index", "main", "test", "tests", "spec", "utils", "util",
+    "common", "components", "component", "public", "static", "assets", "docs", "readme",
+    "js", "jsx", "ts", "tsx", "py", "go", "rs", "rb", "java", "css", "scss", "html", "md", "json", "yml", "yaml",
+}
+PATH_TERM_PATTERN = re.compile(r'[a-z][a-z0-9]{2,}')
+CAMEL_CASE_BOUNDARY = re.compile(r'(?<=[a-z0-9])(?=[A-Z])')
+HEADING_PATTERN = re.compile(r'^#{1,6}\s+(.*?)\s*#*\s*$')
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count: BPE vocabularies average about four characters per token on English and code.
+
+    Good enough to budget a prompt without loading a tokenizer; errs high on
+    short strings so many small pieces don't add up to an overrun.
+    """
+    return len(text) // 4 + 1
+
+def context_window(model_name: str) -> int:
+    name = model_name.lower()
+    for fragment, window in MODEL_CONTEXT_WINDOWS:
+        if fragment in name:
+            return window
+    return DEFAULT_CONTEXT_WINDOW
+
+def context_budget(model_name: Optional[str] = None) -> int:
+    """Tokens of PR context to put in the prompt for a model.
+
+    PROMPT_CONTEXT_TOKENS keeps prompts short (time to first token grows with
+    prompt length) even on long-context models; small models get what their
+    window leaves after the instructions and answer.
+    """
+    window = context_window(model_name or config.model_name)
+    return max(min(config.prompt_context_tokens, window - RESPONSE_RESERVE_TOKENS), MIN_PIECE_TOKENS)
+
+class ContextPiece(NamedTuple):
+    """One tagged block of the assembled prompt context."""
+    source: str
+    text: str
+    tokens: int
+    truncated: bool = False
+
+class PromptContext(NamedTuple):
+    """The pieces that fit the budget, in prompt order, and the sources that didn't."""
+    pieces: List[ContextPiece]
+    omitted: List[str]
+    budget: int
+
+    @property
+    def tokens(self) -> int:
+        return sum(piece.tokens for piece in self.pieces)
+
+    def render(self) -> str:
+        blocks = [f"[source: {piece.source}]\n{piece.text}" for piece in self.pieces]
+        if self.omitted:
+            blocks.append(f"[omitted to fit the {self.budget}-token budget: {', '.join(self.omitted)}]")
+        return "\n\n".join(blocks)
+
+def _truncate(text: str, max_tokens: int) -> Tuple[str, bool]:
+    """Cut text on a line boundary to about max_tokens, noting how much was dropped."""
+    if estimate_tokens(text) <= max_tokens:
+        return text, False
+    lines = text.split('\n')
+    kept: List[str] = []
+    available = max_tokens - 12  # room for the marker
+    for line in lines:
+        cost = estimate_tokens(line)
+        if cost > available:
+            if available > 8:
+                kept.append(line[:(available - 1) * 4])  # keep the start of a long paragraph
+            break
+        kept.append(line)
+        available -= cost
+    return '\n'.join(kept) + f"\n[truncated: {len(lines) - len(kept)} of {len(lines)} lines cut]", True
+
+def _file_weight(filename: str) -> float:
+    if TEST_FILE_PATTERN.search(filename):
+        return 0.6
+    if filename.lower().endswith(('.md', '.rst', '.txt')):
+        return 0.5
+    return 1.0
+
+class LazyText(NamedTuple):
+    """Candidate text rendered only when chosen, with an upper bound on its length known up front."""
+    render: Callable[[], str]
+    max_chars: int
+
+def _render_hunk(hunk: DiffHunk) -> str:
+    return '\n'.join(f"{marker} {text}" for marker, _, text in hunk.changes)
+
+def _file_list(file_changes: List[FileChange], max_tokens: int) -> str:
+    """The changed files in PR order, or when they don't fit, the most changed ones and a count of the rest."""
+    entries = [f"{fc.filename} ({fc.status}, +{fc.additions} -{fc.deletions})" for fc in file_changes]
+    text = ", ".join(entries)
+    if estimate_tokens(text) <= max_tokens:
+        return text
+
+    available = max_tokens - 8  # room for the count
+    ranked = sorted(range(len(file_changes)), key=lambda index: (
+        bool(LOW_VALUE_FILE_PATTERN.search(file_changes[index].filename)),
+        -(file_changes[index].additions + file_changes[index].deletions),
+    ))
+    kept = []
+    for index in ranked:
+        cost = estimate_tokens(entries[index]) + 1
+        if cost > available:
+            break
+        kept.append(index)
+        available -= cost
+    rest = len(entries) - len(kept)
+    return ", ".join(entries[index] for index in sorted(kept)) + f" and {rest} more file{'s' if rest != 1 else ''}"
+
+def _diff_candidates(file_changes: Iterable[FileChange]) -> List[Tuple[float, int, str, LazyText]]:
+    """(score, patch order, source tag, lazily rendered hunk) for every hunk of every patch.
+
+    Scores come from the hunk line counts and the size bound from the hunk's
+    byte length (each rendered line is at most as long as its "\n+text" in
+    the arena), so _fill decodes only the hunks it may use.
+    """
+    candidates = []
+    order = 0
+    for file_change in file_changes:
+        if not file_change.has_patch:
+            continue
+        if LOW_VALUE_FILE_PATTERN.search(file_change.filename):
+            continue  # Named in the file list; the hunks aren't worth their tokens
+        weight = _file_weight(file_change.filename)
+        for hunk in file_change.parsed_patch().hunks:
+            changed = hunk.additions + hunk.deletions
+            if not changed:
+                continue
+            header = f"@@ -{hunk.old_start},{hunk.old_count} +{hunk.new_start},{hunk.new_count} @@"
+            if hunk.section:
+                header += f" {hunk.section}"
+            # A hunk named after its enclosing function tells the tester where to look
+            score = weight * (min(changed, 50) + (5 if hunk.section else 0))
+            candidates.append((score, order, f"diff {file_change.filename} {header}",
+                               LazyText(partial(_render_hunk, hunk), hunk.nbytes)))
+            order += 1
+    return candidates
+
+def split_markdown_sections(content: str) -> List[Tuple[str, str]]:
+    """(heading, text) per markdown section; text before the first heading is the intro."""
+    sections: List[Tuple[str, List[str]]] = [("Introduction", [])]
+    in_fence = False
+    for line in content.split('\n'):
+        if line.lstrip().startswith(('```', '~~~')):
+            in_fence = not in_fence
+        match = None if in_fence else HEADING_PATTERN.match(line)
+        if match:
+            sections.append((match.group(1) or "Untitled", [line]))
+        else:
+            sections[-1][1].append(line)
+    return [(heading, '\n'.join(lines).strip()) for heading, lines in sections if '\n'.join(lines).strip()]
+
+def path_terms(paths: Iterable[str]) -> Set[str]:
+    """Distinctive words of the changed paths, e.g. 'src/DataTable/cells.tsx' -> {'data', 'table', 'datatable', 'cells'}."""
+    terms = set()
+    for path in paths:
+        words = CAMEL_CASE_BOUNDARY.sub(' ', path).lower()
+        terms.update(PATH_TERM_PATTERN.findall(words))
+        terms.update(PATH_TERM_PATTERN.findall(path.lower()))
+    return terms - GENERIC_PATH_TERMS
+
+def _readme_candidates(readmes: Dict[str, str], terms: Set[str],
+                       near_changes: Set[str]) -> List[Tuple[float, int, str, str]]:
+    """(score, document order, source tag, text) per README section, scored by overlap with the changed paths."""
+    candidates = []
+    order = 0
+    for path, content in readmes.items():
+        if not content:
+            continue
+        for index, (heading, text) in enumerate(split_markdown_sections(content)):
+            lowered_heading = heading.lower()
+            lowered = text.lower()
+            score = sum(2 if term in lowered_heading else 1 for term in terms if term in lowered)
+            if path in near_changes:
+                score += 1
+            if index == 0:
+                score += 0.5  # The intro says what the application is, which every tester needs
+            candidates.append((score, order, f"{path}#{heading}", text))
+            order += 1
+    return candidates
+
+def _fill(candidates: List[Tuple[float, int, str, Union[str, LazyText]]], budget: int,
+          omitted_label: str) -> Tuple[List[Tuple[int, ContextPiece]], int, Optional[str]]:
+    """Take candidates best first while they fit, truncating the first one that straddles the budget.
+
+    A LazyText is rendered only if it will be used: when its size bound fits
+    the remaining budget, or when it is the one to be truncated. Once the
+    truncation has happened or the budget is nearly spent, candidates whose
+    bound doesn't fit are skipped without rendering them.
+    """
+    chosen: List[Tuple[int, ContextPiece]] = []
+    used = 0
+    skipped = 0
+    truncated = False
+    for score, order, source, text in sorted(candidates, key=lambda c: (-c[0], c[1])):
+        remaining = budget - used
+        can_truncate = not truncated and remaining >= MIN_PIECE_TOKENS
+        if isinstance(text, LazyText):
+            max_tokens = text.max_chars // 4 + 1 + estimate_tokens(source) + 3
+            if max_tokens > remaining and not can_truncate:
+                skipped += 1
+                continue
+            text = text.render()
+        tokens = estimate_tokens(text) + estimate_tokens(source) + 3
+        if tokens <= remaining:
+            chosen.append((order, ContextPiece(source, text, tokens)))
+            used += tokens
+        elif can_truncate:
+            truncated = True
+            text, _ = _truncate(text, remaining - estimate_tokens(source) - 3)
+            tokens = estimate_tokens(text) + estimate_tokens(source) + 3
+            chosen.append((order, ContextPiece(source, text, tokens, truncated=True)))
+            used += tokens
+        else:
+            skipped += 1
+    return chosen, used, f"{skipped} {omitted_label}" if skipped else None
+
+def assemble_prompt_context(title: str, description: Optional[str], file_changes: List[FileChange],
+                            readmes: Dict[str, str], near_changes: Iterable[str] = (),
+                            budget: Optional[int] = None) -> PromptContext:
+    """Fill a token budget with PR context by priority, tagging each piece with its source.
+
+    The PR title, description and changed-file list go first (a long list
+    keeps the most changed files and counts the rest), then the diff hunks
+    worth most to a tester (source files over tests and docs, larger hunks
+    first; lockfiles and build output are skipped), then the README sections
+    sharing the most words with the changed paths. Chosen hunks and sections keep their original order so the
+    prompt reads like the diff and the docs.
+    """
+    budget = context_budget() if budget is None else budget
+    pieces: List[ContextPiece] = []
+    omitted: List[str] = []
+
+    pr_text = f"Title: {title}"
+    description = (description or "").strip() or "No description provided"
+    description, cut = _truncate(description, int(budget * DESCRIPTION_BUDGET_SHARE))
+    pr_text += f"\nDescription: {description}"
+    if file_changes:
+        pr_text += "\nChanged files: " + _file_list(file_changes, int(budget * FILE_LIST_BUDGET_SHARE))
+    pr_text, truncated = _truncate(pr_text, budget)
+    pieces.append(ContextPiece("pull request", pr_text, estimate_tokens(pr_text) + 5, cut or truncated))
+    remaining = budget - pieces[0].tokens
+
+    diff_budget = int(remaining * DIFF_BUDGET_SHARE)
+    diff_pieces, used, skipped = _fill(_diff_candidates(file_changes), diff_budget, "diff hunks")
+    pieces.extend(piece for _, piece in sorted(diff_pieces))
+    if skipped:
+        omitted.append(skipped)
+    remaining -= used
+
+    terms = path_terms(fc.filename for fc in file_changes)
+    readme_pieces, _, skipped = _fill(_readme_candidates(readmes, terms, set(near_changes)), remaining,
+                                      "README sections")
+    pieces.extend(piece for _, piece in sorted(readme_pieces))
+    if skipped:
+        omitted.append(skipped)
+
+    return PromptContext(pieces, omitted, budget)
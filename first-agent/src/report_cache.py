@@ -0,0 +1,143 @@
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import NamedTuple, Optional, Tuple
+
+class ReportKey(NamedTuple):
+    """What a generated report depends on: the PR revision, the model and the prompts."""
+    pr_url: str
+    head_sha: str
+    model: str
+    prompt_version: str
+
+class ReportCache:
+    """Two-tier cache of final QA reports: an in-memory LRU over a SQLite table.
+
+    A new commit changes the head SHA and a prompt change bumps the prompt
+    version, so entries don't go stale on their own; the TTL bounds how long
+    a report generated by an older model deployment is served. The SQLite
+    tier survives restarts and is shared by the CLI and the API server; when
+    another process changes the table (e.g. `cli.py clear-cache` next to a
+    running server) the memory tier is dropped before it is read again.
+    """
+
+    def __init__(self, path: str, max_memory_entries: int = 256, max_entries: int = 5000,
+                 ttl_seconds: float = 7 * 24 * 3600):
+        self.path = path
+        self.max_memory_entries = max_memory_entries
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._memory: "OrderedDict[ReportKey, Tuple[str, float]]" = OrderedDict()  # key -> (report, created_at)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS reports ("
+            " pr_url TEXT NOT NULL, head_sha TEXT NOT NULL, model TEXT NOT NULL, prompt_version TEXT NOT NULL,"
+            " report TEXT NOT NULL, created_at REAL NOT NULL, accessed_at REAL NOT NULL,"
+            " PRIMARY KEY (pr_url, head_sha, model, prompt_version))"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS reports_accessed_at ON reports (accessed_at)")
+        self._data_version = self._read_data_version()
+
+    def get(self, key: ReportKey) -> Optional[str]:
+        """Return a fresh cached report, promoting SQLite hits to memory."""
+        now = time.time()
+        with self._lock:
+            self._sync_with_other_connections()
+            entry = self._memory.get(key)
+            if entry is not None and now - entry[1] < self.ttl_seconds:
+                self._memory.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+            self._memory.pop(key, None)
+
+            row = self._db.execute(
+                "SELECT report, created_at FROM reports"
+                " WHERE pr_url = ? AND head_sha = ? AND model = ? AND prompt_version = ?",
+                key,
+            ).fetchone()
+            if row is None or now - row[1] >= self.ttl_seconds:
+                if row is not None:
+                    self._delete(key)
+                self.misses += 1
+                return None
+
+            self._db.execute(
+                "UPDATE reports SET accessed_at = ?"
+                " WHERE pr_url = ? AND head_sha = ? AND model = ? AND prompt_version = ?",
+                (now, *key),
+            )
+            self.hits += 1
+            self._remember(key, row[0], row[1])
+            return row[0]
+
+    def put(self, key: ReportKey, report: str):
+        """Store a report in both tiers, evicting the least recently used rows over the limit."""
+        now = time.time()
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO reports VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (*key, report, now, now),
+            )
+            self._remember(key, report, now)
+            self._db.execute(
+                "DELETE FROM reports WHERE created_at < ? OR rowid IN"
+                " (SELECT rowid FROM reports ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)",
+                (now - self.ttl_seconds, self.max_entries),
+            )
+
+    def invalidate(self, pr_url: Optional[str] = None) -> int:
+        """Forget every cached report of a PR, or all reports; returns how many rows went."""
+        with self._lock:
+            if pr_url is None:
+                self._memory.clear()
+                return self._db.execute("DELETE FROM reports").rowcount
+            for key in [key for key in self._memory if key.pr_url == pr_url]:
+                del self._memory[key]
+            return self._db.execute("DELETE FROM reports WHERE pr_url = ?", (pr_url,)).rowcount
+
+    def stats(self) -> dict:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "memory_entries": len(self._memory),
+                "stored_entries": self._db.execute("SELECT COUNT(*) FROM reports").fetchone()[0],
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / total, 3) if total else 0.0,
+            }
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+    def _read_data_version(self) -> int:
+        return self._db.execute("PRAGMA data_version").fetchone()[0]
+
+    def _sync_with_other_connections(self):
+        # data_version moves only when another connection commits, so this
+        # costs one pragma per lookup and our own writes keep the memory tier
+        data_version = self._read_data_version()
+        if data_version != self._data_version:
+            self._memory.clear()
+            self._data_version = data_version
+
+    def _remember(self, key: ReportKey, report: str, created_at: float):
+        self._memory[key] = (report, created_at)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_entries:
+            self._memory.popitem(last=False)
+
+    def _delete(self, key: ReportKey):
+        self._db.execute(
+            "DELETE FROM reports WHERE pr_url = ? AND head_sha = ? AND model = ? AND prompt_version = ?",
+            key,
+        )
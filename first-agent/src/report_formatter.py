@@ -52,6 +52,9 @@ class ReportFormatter:
             if deployment.deployment_time:
                 markdown.append(f"- **Deployed:** {deployment.deployment_time.strftime('%Y-%m-%d at %H:%M:%S')}")
             
+            if deployment.time_to_ready is not None:
+                markdown.append(f"- **Responding after:** {deployment.time_to_ready:.1f}s of probing")
+            
             markdown.append("")
             markdown.append("**✅ Ready for testing! Use the live URL above.**")
         else:
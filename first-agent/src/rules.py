@@ -0,0 +1,133 @@
+import json
+from typing import Dict, List, Optional, Set
+
+import re2
+
+from src.models import PRData
+
+# Where a rule's keywords are looked for: the changed lines of each patch,
+# each changed file's path, or the PR title. Matching is case-insensitive.
+TARGETS = ("patch", "filename", "title")
+
+DEFAULT_RULES = [
+    {"focus_area": "Emoji/Icon Display", "keywords": ["emoji", "✅", "❌", "🟢", "🔴"]},
+    {"focus_area": "Text Formatting and Alignment", "keywords": ["align", "text-align", "monospace", "font-family"]},
+    {"focus_area": "Table Display and Readability", "keywords": ["table", "th", "td", "tr"]},
+    {"focus_area": "Boolean Value Display", "keywords": ["yes", "no", "true", "false"]},
+    {"focus_area": "Numeric Value Display", "keywords": ["number", "digit", "numeric"]},
+    {"focus_area": "Visual Styling Changes", "keywords": ["css", "style", "class"]},
+    {"focus_area": "Responsive Design", "keywords": ["responsive", "mobile", "width"]},
+    {"focus_area": "User Interface Changes", "target": "filename",
+     "keywords": ["component", "ui", "view", "page", "template"]},
+    {"focus_area": "Visual Styling Changes", "target": "filename", "keywords": ["css", "scss", "style"]},
+    {
+        "target": "title",
+        "keywords": ["table", "readability"],
+        "scenario": {
+            "title": "Table Readability Verification",
+            "description": "Verify that table readability improvements have been implemented correctly",
+            "steps": [
+                "Navigate to the application (deployed URL or local setup)",
+                "Find pages with tables",
+                "Check if Yes/No values are displayed as emojis (✅/❌)",
+                "Verify that numeric values are right-aligned and monospaced",
+                "Check table formatting across different screen sizes",
+                "Compare before/after readability"
+            ],
+            "expected_outcome": "Tables display improved readability with emoji indicators and proper number formatting"
+        }
+    },
+    {
+        "keywords": ["✅", "❌", "🟢", "🔴", "emoji"],
+        "scenario": {
+            "title": "Emoji Display Testing",
+            "description": "Test that emoji replacements for Yes/No values work correctly",
+            "steps": [
+                "Open the application in your browser",
+                "Find sections where Yes/No values are displayed",
+                "Verify Yes values show as ✅ or appropriate emoji",
+                "Verify No values show as ❌ or appropriate emoji",
+                "Test emoji display across different browsers",
+                "Check emoji accessibility (screen readers)"
+            ],
+            "expected_outcome": "Yes/No values are consistently displayed as appropriate emojis"
+        }
+    },
+    {
+        "keywords": ["monospace", "text-align", "right", "font-family"],
+        "scenario": {
+            "title": "Number Formatting Verification",
+            "description": "Test that numeric values are properly formatted for comparison",
+            "steps": [
+                "Access the application",
+                "Navigate to sections with numeric data",
+                "Verify numbers are displayed in monospace font",
+                "Check that numbers are right-aligned",
+                "Test with different number formats (integers, decimals, percentages)",
+                "Verify alignment consistency across different data"
+            ],
+            "expected_outcome": "Numeric values are consistently monospaced and right-aligned for easy comparison"
+        }
+    },
+]
+
+def load_rules(path: Optional[str] = None) -> List[dict]:
+    """The default rule table, followed by the rules in a JSON file (a list of rule objects) if given."""
+    rules = list(DEFAULT_RULES)
+    if path:
+        with open(path, 'r', encoding='utf-8') as fh:
+            rules.extend(json.load(fh))
+    return rules
+
+class RuleEngine:
+    """Focus-area and scenario rules compiled into one multi-pattern matcher per target.
+
+    Each target's rules go into a single RE2 set, one alternation of escaped
+    keywords per rule. RE2 runs every pattern of the set together as one
+    DFA, much like an Aho-Corasick automaton. A text is therefore scanned
+    once in linear time and yields every rule with a keyword anywhere in it,
+    overlapping keywords included. Adding rules adds DFA states, not passes
+    over the text.
+    """
+
+    def __init__(self, rules: List[dict]):
+        self.rules = rules
+        self.matchers = {}
+        self._rule_indexes: Dict[str, List[int]] = {}
+
+        for index, rule in enumerate(rules):
+            target = rule.get("target", "patch")
+            if target not in TARGETS:
+                raise ValueError(f"Unknown rule target {target!r}; expected one of {', '.join(TARGETS)}")
+            if not rule.get("keywords") or not (rule.get("focus_area") or rule.get("scenario")):
+                raise ValueError(f"Rule {index} needs keywords and a focus_area or scenario")
+
+            if target not in self.matchers:
+                self.matchers[target] = re2.Set.SearchSet()
+                self._rule_indexes[target] = []
+            self.matchers[target].Add('|'.join(re2.escape(keyword.lower()) for keyword in rule["keywords"]))
+            self._rule_indexes[target].append(index)
+
+        for matcher in self.matchers.values():
+            matcher.Compile()
+
+    def match(self, pr_data: PRData) -> List[dict]:
+        """Rules matched anywhere in the PR, in table order.
+        
+        The texts of a target are joined with newlines, which no keyword
+        contains, so one pass scans each patch exactly once. Patches are
+        scanned as UTF-8 bytes straight from the PR's patch arena.
+        """
+        texts = {
+            "title": pr_data.title.lower(),
+            "filename": '\n'.join(file_change.filename.lower() for file_change in pr_data.file_changes),
+            # Already lowercase, and empty for files without a patch
+            "patch": b'\n'.join(file_change.parsed_patch().changed_bytes() for file_change in pr_data.file_changes),
+        }
+        
+        matched: Set[int] = set()
+        for target, matcher in self.matchers.items():
+            found = matcher.Match(texts[target]) or []  # None when nothing matched
+            matched.update(self._rule_indexes[target][position] for position in found)
+        
+        return [self.rules[index] for index in sorted(matched)]
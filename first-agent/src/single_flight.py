@@ -0,0 +1,65 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable, Iterable, List, Optional, Tuple
+
+ProgressCallback = Callable[[str, float], None]
+
+class _Flight:
+    __slots__ = ("task", "listeners", "last_progress")
+
+    def __init__(self):
+        self.task: Optional[asyncio.Task] = None
+        self.listeners: List[ProgressCallback] = []
+        self.last_progress: Optional[Tuple[str, float]] = None
+
+    def report(self, stage: str, fraction: float):
+        self.last_progress = (stage, fraction)
+        for listener in list(self.listeners):
+            listener(stage, fraction)
+
+class SingleFlight:
+    """Coalesces concurrent calls with the same key onto one running computation.
+
+    The first caller for a key starts the work; callers arriving while it
+    runs attach to the same task and receive its result or exception. Once it
+    finishes the key is free again, so nothing is cached beyond the flight.
+    The shared task is shielded: a caller that goes away (a dropped HTTP
+    connection) doesn't cancel the work for the others. Stage progress
+    reported by the work is forwarded to every attached caller.
+    """
+
+    def __init__(self):
+        self._flights: Dict[Hashable, _Flight] = {}
+        self.started = 0
+        self.joined = 0
+
+    async def do(self, key: Hashable, func: Callable[[ProgressCallback], Awaitable[Any]],
+                 progress: Optional[ProgressCallback] = None, joinable: Iterable[Hashable] = ()) -> Any:
+        """Run func(progress) for the key, or wait for the run already in flight.
+
+        joinable lists other keys whose runs would also satisfy this caller
+        (but not the other way round); the first one in flight is joined.
+        """
+        flight = self._flights.get(key)
+        if flight is None:
+            flight = next((self._flights[other] for other in joinable if other in self._flights), None)
+        if flight is None:
+            flight = _Flight()
+            self._flights[key] = flight
+            flight.task = asyncio.ensure_future(func(flight.report))
+            flight.task.add_done_callback(lambda _: self._flights.pop(key, None))
+            self.started += 1
+        else:
+            self.joined += 1
+            if progress and flight.last_progress:
+                progress(*flight.last_progress)
+
+        if progress:
+            flight.listeners.append(progress)
+        try:
+            return await asyncio.shield(flight.task)
+        finally:
+            if progress:
+                flight.listeners.remove(progress)
+
+    def stats(self) -> dict:
+        return {"in_flight": len(self._flights), "started": self.started, "joined": self.joined}
@@ -0,0 +1,84 @@
+import asyncio
+import contextvars
+import functools
+import threading
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+from src.config import config
+
+class StageExecutor:
+    """Runs blocking pipeline work off the event loop, with a concurrency cap per stage.
+
+    All stages share one bounded thread pool, so blocking GitHub and CrewAI
+    calls never run on the loop serving requests. Each stage ("github",
+    "llm", ...) also has its own limit. A burst of generations then queues
+    for LLM slots without taking every thread away from GitHub fetches,
+    and the other way round. Calls keep the caller's context variables, so
+    request priorities and tracing follow the work onto the worker thread.
+    """
+
+    def __init__(self, max_workers: Optional[int] = None, stage_limits: Optional[Dict[str, int]] = None):
+        self.max_workers = max_workers or config.executor_max_workers
+        self.stage_limits = stage_limits if stage_limits is not None else {
+            "github": config.github_stage_concurrency,
+            "llm": config.llm_stage_concurrency,
+        }
+        self._pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="qa-stage")
+        # asyncio semaphores belong to one loop; the CLI starts a new loop per run
+        self._semaphores: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[str, asyncio.Semaphore]]" = \
+            weakref.WeakKeyDictionary()
+        self._lock = threading.Lock()
+        self.running: Dict[str, int] = {}
+        self.waiting: Dict[str, int] = {}
+
+    async def run(self, stage: str, func: Callable[..., Any], *args, **kwargs) -> Any:
+        """Run func(*args, **kwargs) on the pool once the stage has a free slot."""
+        loop = asyncio.get_running_loop()
+        call = functools.partial(contextvars.copy_context().run, func, *args, **kwargs)
+
+        semaphore = self._semaphore(loop, stage)
+        if semaphore is None:
+            return await loop.run_in_executor(self._pool, call)
+
+        self._count(self.waiting, stage, 1)
+        try:
+            await semaphore.acquire()
+        finally:
+            self._count(self.waiting, stage, -1)
+        self._count(self.running, stage, 1)
+        try:
+            return await loop.run_in_executor(self._pool, call)
+        finally:
+            self._count(self.running, stage, -1)
+            semaphore.release()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "max_workers": self.max_workers,
+                "stage_limits": dict(self.stage_limits),
+                "running": dict(self.running),
+                "waiting": dict(self.waiting),
+            }
+
+    def shutdown(self):
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+    def _semaphore(self, loop: asyncio.AbstractEventLoop, stage: str) -> Optional[asyncio.Semaphore]:
+        limit = self.stage_limits.get(stage)
+        if not limit:
+            return None
+        with self._lock:
+            semaphores = self._semaphores.setdefault(loop, {})
+            if stage not in semaphores:
+                semaphores[stage] = asyncio.Semaphore(limit)
+            return semaphores[stage]
+
+    def _count(self, counter: Dict[str, int], stage: str, delta: int):
+        with self._lock:
+            counter[stage] = counter.get(stage, 0) + delta
+
+# Process-wide executor shared by the CLI and the API server
+stage_executor = StageExecutor()
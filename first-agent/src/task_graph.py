@@ -0,0 +1,56 @@
+import contextvars
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple
+
+TaskFunc = Callable[[Dict[str, Any]], Any]
+
+class TaskGraph:
+    """Runs blocking tasks in parallel as soon as the tasks they depend on finish.
+
+    Each task is a callable given the results of its dependencies by name.
+    Dependencies must be added first, so the graph can't have cycles. The
+    first failure cancels tasks that haven't started and is re-raised; wall
+    time is that of the slowest dependency chain rather than the sum.
+    """
+
+    def __init__(self, max_workers: Optional[int] = None):
+        self.max_workers = max_workers
+        self._tasks: Dict[str, Tuple[TaskFunc, Tuple[str, ...]]] = {}
+
+    def add(self, name: str, func: TaskFunc, depends_on: Iterable[str] = ()) -> "TaskGraph":
+        depends_on = tuple(depends_on)
+        if name in self._tasks:
+            raise ValueError(f"Task {name!r} was already added")
+        unknown = [dependency for dependency in depends_on if dependency not in self._tasks]
+        if unknown:
+            raise ValueError(f"Task {name!r} depends on tasks not added yet: {', '.join(unknown)}")
+        self._tasks[name] = (func, depends_on)
+        return self
+
+    def run(self) -> Dict[str, Any]:
+        """Run every task and return their results in the order they were added."""
+        results: Dict[str, Any] = {}
+        pending = dict(self._tasks)
+        running: Dict[Future, str] = {}
+
+        with ThreadPoolExecutor(max_workers=self.max_workers or max(len(self._tasks), 1),
+                                thread_name_prefix="crew-task") as pool:
+            while pending or running:
+                for name in [name for name, (_, deps) in pending.items() if all(d in results for d in deps)]:
+                    func, deps = pending.pop(name)
+                    inputs = {dependency: results[dependency] for dependency in deps}
+                    # Each task runs in a copy of the caller's context, so tracing spans nest under it
+                    context = contextvars.copy_context()
+                    running[pool.submit(context.run, func, inputs)] = name
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    name = running.pop(future)
+                    try:
+                        results[name] = future.result()
+                    except BaseException:
+                        for other in running:
+                            other.cancel()
+                        raise
+
+        return {name: results[name] for name in self._tasks}
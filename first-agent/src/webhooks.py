@@ -0,0 +1,216 @@
+import hashlib
+import hmac
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from pydantic import BaseModel, Field
+
+from src.deployment_watcher import deployment_from_comment, deployment_from_status
+from src.models import DeploymentInfo, PRState
+
+# Events the endpoint acts on; anything else (including `ping`) is acknowledged and ignored
+HANDLED_EVENTS = ("pull_request", "issue_comment", "deployment_status", "push")
+
+def verify_signature(secret: str, body: bytes, signature_header: Optional[str]) -> bool:
+    """Check an X-Hub-Signature-256 header against the HMAC-SHA256 of the raw body."""
+    if not secret or not signature_header or not signature_header.startswith("sha256="):
+        return False
+    expected = hmac.new(secret.encode('utf-8'), body, hashlib.sha256).hexdigest()
+    return hmac.compare_digest(expected, signature_header[len("sha256="):])
+
+def sign(secret: str, body: bytes) -> str:
+    """The X-Hub-Signature-256 value GitHub would send for a body."""
+    return "sha256=" + hmac.new(secret.encode('utf-8'), body, hashlib.sha256).hexdigest()
+
+class PRStateStore:
+    """Pull request state and deployments as reported by webhooks.
+
+    Deployments announced through `deployment_status` only name a commit, so
+    they are also kept by (repository, SHA) and picked up by a PR once its
+    head reaches that commit. Readers waiting for a deployment are woken as
+    soon as one is recorded.
+    """
+
+    def __init__(self, max_entries: int = 1024):
+        self.max_entries = max_entries
+        self._states: "OrderedDict[str, PRState]" = OrderedDict()
+        self._sha_deployments: "OrderedDict[Tuple[str, str], DeploymentInfo]" = OrderedDict()
+        self._changed = threading.Condition()
+
+    def get(self, pr_url: str) -> Optional[PRState]:
+        with self._changed:
+            state = self._states.get(pr_url)
+            return state.model_copy(deep=True) if state is not None else None
+
+    def update_pull_request(self, pull_request: dict, repo_full_name: str) -> PRState:
+        """Record the title, state and head of a PR from a `pull_request` payload."""
+        pr_url = pull_request["html_url"]
+        head = pull_request.get("head") or {}
+        with self._changed:
+            state = self._state(pr_url, repo_full_name, pull_request["number"])
+            state.title = pull_request.get("title")
+            state.state = "merged" if pull_request.get("merged") else pull_request.get("state", "open")
+            state.head_ref = head.get("ref")
+            self._move_head(state, head.get("sha"))
+            self._changed.notify_all()
+            return state.model_copy(deep=True)
+
+    def update_head(self, repo_full_name: str, head_ref: str, head_sha: str) -> List[str]:
+        """Move every tracked PR of a branch to a newly pushed commit."""
+        with self._changed:
+            moved = []
+            for state in self._states.values():
+                if state.repo_full_name == repo_full_name and state.head_ref == head_ref:
+                    self._move_head(state, head_sha)
+                    moved.append(state.pr_url)
+            self._changed.notify_all()
+            return moved
+
+    def record_deployment(self, pr_url: str, repo_full_name: str, number: int, deployment: DeploymentInfo):
+        """Attach a deployment found for a PR, e.g. a preview link in a comment."""
+        with self._changed:
+            self._state(pr_url, repo_full_name, number).deployment = deployment
+            self._changed.notify_all()
+
+    def record_commit_deployment(self, repo_full_name: str, sha: str, deployment: DeploymentInfo) -> List[str]:
+        """Attach a deployment of a commit to the PRs whose head it is; returns their URLs."""
+        with self._changed:
+            self._sha_deployments[(repo_full_name, sha)] = deployment
+            self._sha_deployments.move_to_end((repo_full_name, sha))
+            while len(self._sha_deployments) > self.max_entries:
+                self._sha_deployments.popitem(last=False)
+
+            updated = []
+            for state in self._states.values():
+                if state.repo_full_name == repo_full_name and state.head_sha == sha:
+                    state.deployment = deployment
+                    updated.append(state.pr_url)
+            self._changed.notify_all()
+            return updated
+
+    def deployment(self, pr_url: str) -> Optional[DeploymentInfo]:
+        """The live deployment known for a PR, if any."""
+        with self._changed:
+            return self._live_deployment(pr_url)
+
+    def wait_for_deployment(self, pr_url: str, timeout: float) -> Optional[DeploymentInfo]:
+        """Block until a webhook reports a live deployment for the PR, or the timeout passes."""
+        deadline = time.monotonic() + timeout
+        with self._changed:
+            while True:
+                deployment = self._live_deployment(pr_url)
+                remaining = deadline - time.monotonic()
+                if deployment is not None or remaining <= 0:
+                    return deployment
+                self._changed.wait(remaining)
+
+    def _live_deployment(self, pr_url: str) -> Optional[DeploymentInfo]:
+        state = self._states.get(pr_url)
+        if state is None or state.deployment is None:
+            return None
+        if not state.deployment.url or state.deployment.status != "deployed":
+            return None
+        return state.deployment.model_copy()
+
+    def _state(self, pr_url: str, repo_full_name: str, number: int) -> PRState:
+        state = self._states.get(pr_url)
+        if state is None:
+            state = PRState(pr_url=pr_url, repo_full_name=repo_full_name, number=number)
+            self._states[pr_url] = state
+        state.updated_at = datetime.now()
+        self._states.move_to_end(pr_url)
+        while len(self._states) > self.max_entries:
+            self._states.popitem(last=False)
+        return state
+
+    def _move_head(self, state: PRState, head_sha: Optional[str]):
+        if not head_sha or head_sha == state.head_sha:
+            return
+        state.head_sha = head_sha
+        # A preview deployed for an older head no longer shows this PR's code
+        state.deployment = self._sha_deployments.get((state.repo_full_name, head_sha))
+
+class WebhookResult(BaseModel):
+    """What a delivery changed, and the follow-up work it calls for."""
+    event: str
+    action: Optional[str] = None
+    handled: bool = False
+    pr_urls: List[str] = Field(default_factory=list)
+    prefetch_prs: List[str] = Field(default_factory=list)  # PRs whose GitHub context should be warmed
+    refresh_docs: Optional[str] = None  # "owner/repo" whose default-branch docs changed
+
+class GitHubWebhookHandler:
+    """Applies GitHub webhook deliveries to the service's PR state and caches."""
+
+    def __init__(self, github_service):
+        self.github_service = github_service
+        self.pr_states: PRStateStore = github_service.pr_states
+        self.deliveries = 0
+        self.counts: Dict[str, int] = {}
+
+    def handle(self, event: str, payload: dict) -> WebhookResult:
+        """Dispatch one delivery by its X-GitHub-Event name."""
+        self.deliveries += 1
+        self.counts[event] = self.counts.get(event, 0) + 1
+        result = WebhookResult(event=event, action=payload.get("action"))
+        if event in HANDLED_EVENTS:
+            getattr(self, f"_on_{event}")(payload, result)
+        return result
+
+    def stats(self) -> dict:
+        return {"deliveries": self.deliveries, "events": dict(self.counts)}
+
+    def _on_pull_request(self, payload: dict, result: WebhookResult):
+        pull_request = payload["pull_request"]
+        repo_full_name = payload["repository"]["full_name"]
+        previous = self.pr_states.get(pull_request["html_url"])
+        state = self.pr_states.update_pull_request(pull_request, repo_full_name)
+
+        result.handled = True
+        result.pr_urls = [state.pr_url]
+        if state.state == "open" and (previous is None or previous.head_sha != state.head_sha
+                                      or result.action in ("opened", "reopened", "synchronize")):
+            self.github_service.forget_deployment_watcher(state.pr_url)
+            result.prefetch_prs = [state.pr_url]
+
+    def _on_issue_comment(self, payload: dict, result: WebhookResult):
+        issue = payload["issue"]
+        # Issue comments fire for plain issues too; only PR conversations matter here
+        if "pull_request" not in issue or result.action == "deleted":
+            return
+        comment = payload["comment"]
+        deployment = deployment_from_comment(comment.get("body"), comment["created_at"])
+        if deployment is None:
+            return
+
+        pr_url = issue["pull_request"]["html_url"]
+        self.pr_states.record_deployment(pr_url, payload["repository"]["full_name"], issue["number"], deployment)
+        result.handled = True
+        result.pr_urls = [pr_url]
+
+    def _on_deployment_status(self, payload: dict, result: WebhookResult):
+        deployment = payload["deployment"]
+        info = deployment_from_status(deployment, payload["deployment_status"])
+        result.handled = True
+        result.pr_urls = self.pr_states.record_commit_deployment(
+            payload["repository"]["full_name"], deployment["sha"], info
+        )
+
+    def _on_push(self, payload: dict, result: WebhookResult):
+        repository = payload["repository"]
+        ref = payload.get("ref", "")
+        if payload.get("deleted") or not ref.startswith("refs/heads/"):
+            return
+
+        branch = ref[len("refs/heads/"):]
+        result.handled = True
+        if branch == repository.get("default_branch"):
+            # Docs are cached per tree SHA, so older revisions are now dead weight
+            owner, repo_name = repository["full_name"].split("/", 1)
+            self.github_service.doc_cache.invalidate(owner, repo_name)
+            result.refresh_docs = repository["full_name"]
+        else:
+            result.pr_urls = self.pr_states.update_head(repository["full_name"], branch, payload["after"])
@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+Tests for deployment readiness probing.
+
+Runs the prober against a local HTTP/1.1 server that plays a cold preview:
+it answers 503 for the first few requests and 200 afterwards.
+"""
+
+import asyncio
+import socket
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from types import SimpleNamespace
+
+from src.agents import QAContextAgents
+from src.deployment_probe import DeploymentProber
+from src.models import DeploymentInfo
+
+class ColdStartHandler(BaseHTTPRequestHandler):
+    """Unhealthy for the first `cold_requests` requests of each path; optionally rejects HEAD."""
+
+    protocol_version = "HTTP/1.1"
+    cold_requests = {}
+    allow_head = True
+    seen = []  # (method, path, client port)
+
+    def do_HEAD(self):
+        if not ColdStartHandler.allow_head:
+            self._reply(405)
+            return
+        self._reply(self._status())
+
+    def do_GET(self):
+        self._reply(self._status())
+
+    def _status(self) -> int:
+        ColdStartHandler.seen.append((self.command, self.path, self.client_address[1]))
+        remaining = ColdStartHandler.cold_requests.get(self.path, 0)
+        if remaining:
+            ColdStartHandler.cold_requests[self.path] = remaining - 1
+            return 503
+        return 200
+
+    def _reply(self, status: int):
+        self.send_response(status)
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+
+    def log_message(self, format, *args):
+        pass
+
+def run_server(cold_requests, allow_head=True):
+    ColdStartHandler.cold_requests = dict(cold_requests)
+    ColdStartHandler.allow_head = allow_head
+    ColdStartHandler.seen = []
+    server = ThreadingHTTPServer(('127.0.0.1', 0), ColdStartHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+def unused_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+def test_waits_until_healthy_on_one_connection():
+    server = run_server({"/app": 3})
+    base = f"http://127.0.0.1:{server.server_port}"
+
+    try:
+        prober = DeploymentProber(timeout=10, initial_interval=0.05, max_interval=0.2)
+        deployment = asyncio.run(prober.mark_ready(DeploymentInfo(url=f"{base}/app", status="deployed")))
+
+        assert deployment.ready
+        assert deployment.time_to_ready > 0
+        assert [method for method, _, _ in ColdStartHandler.seen] == ["HEAD"] * 4
+        # Keep-alive: every retry reused the first connection
+        assert len({port for _, _, port in ColdStartHandler.seen}) == 1
+    finally:
+        server.shutdown()
+
+def test_probes_urls_concurrently():
+    server = run_server({"/a": 2, "/b": 2, "/c": 2})
+    base = f"http://127.0.0.1:{server.server_port}"
+
+    try:
+        prober = DeploymentProber(timeout=10, initial_interval=0.2, max_interval=0.2)
+        start = time.monotonic()
+        results = asyncio.run(prober.probe_many([f"{base}/a", f"{base}/b", f"{base}/c"]))
+        elapsed = time.monotonic() - start
+
+        assert [result.ready for result in results] == [True, True, True]
+        assert [result.attempts for result in results] == [3, 3, 3]
+        # Each URL sleeps at least 2 x 0.1s between attempts; one after another would take 0.6s+
+        assert elapsed < 0.55
+    finally:
+        server.shutdown()
+
+def test_falls_back_to_get_when_head_is_not_allowed():
+    server = run_server({}, allow_head=False)
+
+    try:
+        prober = DeploymentProber(timeout=5, initial_interval=0.05)
+        result = asyncio.run(prober.probe(f"http://127.0.0.1:{server.server_port}/"))
+
+        assert result.ready
+        assert result.status_code == 200
+        assert [method for method, _, _ in ColdStartHandler.seen] == ["GET"]
+    finally:
+        server.shutdown()
+
+def test_unreachable_deployment_is_not_ready():
+    prober = DeploymentProber(timeout=0.3, initial_interval=0.05, max_interval=0.1)
+    deployment = asyncio.run(prober.mark_ready(
+        DeploymentInfo(url=f"http://127.0.0.1:{unused_port()}/", status="deployed")
+    ))
+
+    assert not deployment.ready
+    assert deployment.time_to_ready is None
+
+def test_monitor_deployment_probes_on_the_running_loop():
+    """The deployment stage is awaited from async pipeline code and runs beside other work."""
+    server = run_server({"/app": 0})
+    base = f"http://127.0.0.1:{server.server_port}"
+    agents = object.__new__(QAContextAgents)
+    agents.github_service = SimpleNamespace(
+        monitor_deployment_comments=lambda pr_url: DeploymentInfo(url=f"{base}/app", status="deployed")
+    )
+
+    async def run():
+        # Something else is running on the loop while the deployment is checked
+        other = asyncio.ensure_future(asyncio.sleep(0.01, result="other stage"))
+        result = await agents.monitor_deployment("https://github.com/o/r/pull/7")
+        return result, await other
+
+    try:
+        result, other = asyncio.run(run())
+
+        assert result.success, result.error
+        assert result.data.ready
+        assert other == "other stage"
+        assert [method for method, _, _ in ColdStartHandler.seen] == ["HEAD"]
+    finally:
+        server.shutdown()
+
+if __name__ == "__main__":
+    test_waits_until_healthy_on_one_connection()
+    test_probes_urls_concurrently()
+    test_falls_back_to_get_when_head_is_not_allowed()
+    test_unreachable_deployment_is_not_ready()
+    test_monitor_deployment_probes_on_the_running_loop()
+    print("✅ Deployment probe tests passed")
@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+"""
+Tests for deployment lookup: head-commit deployments and statuses first,
+then incremental deployment-comment scanning.
+
+Runs the watcher against a local HTTP server that serves the PR, its head
+commit's deployments and statuses, and filters comments by the `since`
+parameter like the GitHub issue comments endpoint.
+"""
+
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from src.deployment_watcher import DeploymentWatcher
+from src.github_client import GitHubClient
+
+HEAD_SHA = "abc1234def5678abc1234def5678abc1234def56"
+NEW_HEAD_SHA = "fed9876cba5432fed9876cba5432fed9876cba54"
+
+class FakeCommentsHandler(BaseHTTPRequestHandler):
+    """Serves one PR's head commit deployments, statuses and comments, honouring `since`."""
+
+    head_sha = HEAD_SHA
+    comments = []
+    deployments = []  # (deployment, [statuses newest first])
+    commit_statuses = []  # Statuses of HEAD_SHA; other commits have none
+    queries = []
+    paths = []
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        query = parse_qs(url.query)
+        FakeCommentsHandler.paths.append(url.path)
+
+        if url.path == "/repos/o/r/pulls/1":
+            page = {"number": 1, "head": {"sha": FakeCommentsHandler.head_sha}}
+        elif url.path == "/repos/o/r/deployments":
+            page = [d for d, _ in FakeCommentsHandler.deployments if d["sha"] == query["sha"][0]]
+        elif url.path.startswith("/repos/o/r/deployments/"):
+            deployment_id = int(url.path.split("/")[5])
+            page = next(s for d, s in FakeCommentsHandler.deployments if d["id"] == deployment_id)[:1]
+        elif url.path.startswith("/repos/o/r/commits/"):
+            statuses = FakeCommentsHandler.commit_statuses if url.path.split("/")[5] == HEAD_SHA else []
+            page = {"state": "success", "statuses": statuses}
+        else:
+            since = query.get("since", [None])[0]
+            FakeCommentsHandler.queries.append(since)
+            page = [c for c in FakeCommentsHandler.comments if since is None or c["updated_at"] >= since]
+            if query.get("page", ["1"])[0] != "1":
+                page = []
+
+        body = json.dumps(page).encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+def comment(comment_id, body, updated_at, user_type="User"):
+    return {"id": comment_id, "body": body, "created_at": "2024-05-01T10:00:00Z",
+            "updated_at": updated_at, "user": {"type": user_type}}
+
+def run_server(deployments=(), commit_statuses=()):
+    FakeCommentsHandler.deployments = list(deployments)
+    FakeCommentsHandler.commit_statuses = list(commit_statuses)
+    FakeCommentsHandler.paths = []
+    FakeCommentsHandler.head_sha = HEAD_SHA
+    server = HTTPServer(('127.0.0.1', 0), FakeCommentsHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+def test_polls_only_ask_for_newer_comments():
+    """Later polls pass `since` and pick up a bot comment edited to add the link."""
+    server = run_server()
+    FakeCommentsHandler.queries = []
+    FakeCommentsHandler.comments = [
+        comment(1, "Looks good", "2024-05-01T10:00:00Z"),
+        comment(2, "Deploying preview...", "2024-05-01T10:01:00Z", "Bot"),
+    ]
+
+    try:
+        client = GitHubClient(base_url=f"http://127.0.0.1:{server.server_port}")
+        watcher = DeploymentWatcher(client, "o", "r", 1)
+
+        assert watcher.poll().url is None
+        FakeCommentsHandler.comments[1] = comment(
+            2, "Preview ready: https://pr-1.vercel.app/dashboard", "2024-05-01T10:05:00Z", "Bot"
+        )
+        info = watcher.poll()
+
+        assert FakeCommentsHandler.queries == [None, "2024-05-01T10:01:00Z"]
+        assert str(info.url) == "https://pr-1.vercel.app/dashboard"
+        assert info.provider == "vercel"
+        assert watcher.bot_comments == 1
+    finally:
+        server.shutdown()
+
+def test_wait_gives_up_when_bots_posted_no_link():
+    """Waiting stops once deploy bots have commented without a deployment link."""
+    server = run_server()
+    FakeCommentsHandler.comments = [
+        comment(1, "Build started", "2024-05-01T10:00:00Z", "Bot"),
+        comment(2, "Checks passed", "2024-05-01T10:01:00Z", "Bot"),
+    ]
+
+    try:
+        client = GitHubClient(base_url=f"http://127.0.0.1:{server.server_port}")
+        info = DeploymentWatcher(client, "o", "r", 1).wait(max_wait_minutes=1, initial_interval=0.01)
+
+        assert info.url is None
+        assert info.status == "not_found"
+    finally:
+        server.shutdown()
+
+def test_deployments_api_is_used_before_comments():
+    """A successful deployment of the head commit is found without reading comments."""
+    deployment = {"id": 7, "sha": HEAD_SHA, "environment": "Preview – storefront",
+                  "created_at": "2024-05-01T10:00:00Z", "creator": {"login": "vercel[bot]"}}
+    statuses = [
+        {"state": "success", "environment_url": "https://storefront-abc1234.vercel.app",
+         "created_at": "2024-05-01T10:03:00Z"},
+        {"state": "in_progress", "environment_url": "", "created_at": "2024-05-01T10:01:00Z"},
+    ]
+    server = run_server(deployments=[(deployment, statuses)])
+    FakeCommentsHandler.comments = [comment(1, "https://old-preview.vercel.app", "2024-05-01T09:00:00Z")]
+
+    try:
+        client = GitHubClient(base_url=f"http://127.0.0.1:{server.server_port}")
+        info = DeploymentWatcher(client, "o", "r", 1).poll()
+
+        assert str(info.url) == "https://storefront-abc1234.vercel.app/"
+        assert info.environment == "Preview – storefront"
+        assert info.version == HEAD_SHA
+        assert info.deployment_time.isoformat() == "2024-05-01T10:03:00+00:00"
+        assert info.provider == "vercel"
+        assert not any(path.endswith("/comments") for path in FakeCommentsHandler.paths)
+    finally:
+        server.shutdown()
+
+def test_commit_status_preview_link():
+    """A commit status pointing at a preview host counts; CI links don't."""
+    server = run_server(commit_statuses=[
+        {"state": "success", "context": "ci/build", "target_url": "https://ci.example.com/builds/1",
+         "created_at": "2024-05-01T10:00:00Z"},
+        {"state": "success", "context": "netlify/storefront/deploy-preview",
+         "target_url": "https://deploy-preview-1--storefront.netlify.app",
+         "created_at": "2024-05-01T10:02:00Z", "updated_at": "2024-05-01T10:04:00Z"},
+    ])
+
+    try:
+        client = GitHubClient(base_url=f"http://127.0.0.1:{server.server_port}")
+        info = DeploymentWatcher(client, "o", "r", 1).poll(head_sha=HEAD_SHA)
+
+        assert str(info.url) == "https://deploy-preview-1--storefront.netlify.app/"
+        assert info.environment == "netlify/storefront/deploy-preview"
+        assert info.provider == "netlify"
+        assert info.deployment_time.isoformat() == "2024-05-01T10:04:00+00:00"
+        # The caller knew the head SHA, so the PR itself was not fetched
+        assert FakeCommentsHandler.paths[0] == "/repos/o/r/deployments"
+    finally:
+        server.shutdown()
+
+def test_new_head_commit_is_looked_up_again():
+    """A preview found for one head is not reported once the PR moves to a new commit."""
+    server = run_server(commit_statuses=[
+        {"state": "success", "context": "netlify/storefront/deploy-preview",
+         "target_url": "https://deploy-preview-1--storefront.netlify.app",
+         "created_at": "2024-05-01T10:02:00Z"},
+    ])
+    FakeCommentsHandler.comments = []
+
+    try:
+        client = GitHubClient(base_url=f"http://127.0.0.1:{server.server_port}")
+        watcher = DeploymentWatcher(client, "o", "r", 1)
+
+        assert str(watcher.poll().url) == "https://deploy-preview-1--storefront.netlify.app/"
+        FakeCommentsHandler.paths = []
+        assert watcher.poll().url is not None
+        # Same head: only the PR was read, the deployment came from memory
+        assert FakeCommentsHandler.paths == ["/repos/o/r/pulls/1"]
+
+        FakeCommentsHandler.head_sha = NEW_HEAD_SHA
+        assert watcher.poll().url is None
+        assert watcher.head_sha == NEW_HEAD_SHA
+
+        FakeCommentsHandler.comments = [
+            comment(1, "Preview ready: https://pr-1-fed9876.vercel.app", "2024-05-01T11:00:00Z", "Bot"),
+        ]
+        assert str(watcher.poll().url) == "https://pr-1-fed9876.vercel.app/"
+        # A caller that knows the head skips the PR read and still gets a fresh lookup
+        assert watcher.poll(head_sha=HEAD_SHA).version == HEAD_SHA
+    finally:
+        server.shutdown()
+
+if __name__ == "__main__":
+    test_polls_only_ask_for_newer_comments()
+    test_wait_gives_up_when_bots_posted_no_link()
+    test_deployments_api_is_used_before_comments()
+    test_commit_status_preview_link()
+    test_new_head_commit_is_looked_up_again()
+    print("✅ Deployment watcher tests passed")
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Tests for the shared hunk parser.
+"""
+
+from src.diff_parser import parse_patch
+from src.models import FileChange
+from src.patch_arena import PatchArena
+
+PATCH = """@@ -10,4 +10,5 @@ def render_table(rows):
+     for row in rows:
+-        cells = [str(value) for value in row]
++        cells = [format_cell(value) for value in row]
++        cells = align_numbers(cells)
+         print(cells)
+@@ -40 +41 @@
+-    return "Yes" if value else "No"
++    return "✅" if value else "❌"
+\\ No newline at end of file"""
+
+def test_hunks_and_line_numbers():
+    """Hunk ranges, numbered changes and stats come from a single walk."""
+    parsed = parse_patch(PATCH)
+
+    assert [(hunk.old_start, hunk.old_count, hunk.new_start, hunk.new_count) for hunk in parsed.hunks] == [
+        (10, 4, 10, 5), (40, 1, 41, 1)
+    ]
+    assert parsed.hunks[0].section == "def render_table(rows):"
+    assert parsed.hunks[0].new_range == (10, 14)
+    assert parsed.hunks[0].changes == [
+        ('-', 11, "        cells = [str(value) for value in row]"),
+        ('+', 11, "        cells = [format_cell(value) for value in row]"),
+        ('+', 12, "        cells = align_numbers(cells)"),
+    ]
+    assert (parsed.additions, parsed.deletions) == (3, 2)
+    assert parsed.changed_lines('+')[-1] == '    return "✅" if value else "❌"'
+    assert parsed.changed_lines('-', limit=1) == ["        cells = [str(value) for value in row]"]
+    assert b"format_cell" in parsed.changed_bytes()
+    assert "✅".encode() in parsed.changed_bytes()
+
+def test_file_headers_and_empty_hunks():
+    """Lines before the first header are skipped; a header on the last line has no changes."""
+    parsed = parse_patch("--- a/notes.md\n+++ b/notes.md\n@@ -1,2 +1,2 @@\n-old\n+++new\n@@ -9 +9 @@")
+
+    assert [(hunk.additions, hunk.deletions) for hunk in parsed.hunks] == [(1, 1), (0, 0)]
+    assert list(parsed.iter_changes()) == [('-', 1, "old"), ('+', 1, "++new")]
+    assert parsed.hunks[1].changes == []
+
+def test_parse_is_memoized_on_file_change():
+    """Every consumer of a FileChange shares one parse of its arena-backed patch."""
+    arena = PatchArena()
+    change = FileChange(filename="table.py", additions=3, deletions=2, changes=5,
+                        patch=PATCH, status="modified")
+    change.attach_patch(arena)
+
+    parsed = change.parsed_patch()
+    assert change.parsed_patch() is parsed
+    assert parsed.deletions == 2
+    # Only headers and offsets are kept; line text is decoded from the arena on demand
+    assert all(hunk._arena is arena for hunk in parsed.hunks)
+    assert parsed.hunks[1].changes[1] == ('+', 41, '    return "✅" if value else "❌"')
+
+    change.drop_patch()
+    assert not change.has_patch
+    assert change.parsed_patch().hunks == []
+
+if __name__ == "__main__":
+    test_hunks_and_line_numbers()
+    test_file_headers_and_empty_hunks()
+    test_parse_is_memoized_on_file_change()
+    print("✅ Diff parser tests passed")
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Tests for streaming diff ingestion.
+
+The service test runs against a local HTTP server that withholds one patch
+from the files endpoint, as GitHub does for very large diffs.
+"""
+
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+from src.diff_stream import parse_unified_diff
+from src.github_client import GitHubClient
+from src.github_service import GitHubService
+
+RAW_DIFF = """diff --git a/app/table.py b/app/table.py
+index 1111111..2222222 100644
+--- a/app/table.py
++++ b/app/table.py
+@@ -1,3 +1,3 @@
+ def render(value):
+-    return "Yes" if value else "No"
++    return "✅" if value else "❌"
+diff --git a/assets/logo.png b/assets/logo.png
+new file mode 100644
+index 0000000..3333333
+Binary files /dev/null and b/assets/logo.png differ
+diff --git a/old_name.py b/new_name.py
+similarity index 90%
+rename from old_name.py
+rename to new_name.py
+index 4444444..5555555 100644
+--- a/old_name.py
++++ b/new_name.py
+@@ -1 +1,2 @@
+ import os
++import sys
+"""
+
+class FakeGitHubHandler(BaseHTTPRequestHandler):
+    """Serves a files listing with one withheld patch, plus the raw diff."""
+
+    def do_GET(self):
+        if self.path.startswith('/repos/o/r/pulls/1/files'):
+            body = json.dumps([
+                {"filename": "app/table.py", "additions": 1, "deletions": 1, "changes": 2, "status": "modified"},
+                {"filename": "assets/logo.png", "additions": 0, "deletions": 0, "changes": 0, "status": "added"},
+            ])
+            content_type = 'application/json'
+        elif self.path == '/repos/o/r/pulls/1':
+            body = RAW_DIFF
+            content_type = 'text/plain'
+        else:
+            self.send_response(404)
+            self.end_headers()
+            return
+
+        data = body.encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass
+
+def test_parse_unified_diff():
+    """Raw diffs are split per file with statuses, counts and hunk-only patches."""
+    changes = list(parse_unified_diff(RAW_DIFF.splitlines(keepends=True)))
+
+    assert [change.filename for change in changes] == ["app/table.py", "assets/logo.png", "new_name.py"]
+    assert [change.status for change in changes] == ["modified", "added", "renamed"]
+    assert (changes[0].additions, changes[0].deletions) == (1, 1)
+    assert changes[0].patch.startswith("@@ -1,3 +1,3 @@")
+    assert changes[1].patch is None
+    assert changes[2].patch == "@@ -1 +1,2 @@\n import os\n+import sys"
+
+def test_patch_cap_keeps_exact_counts():
+    """Patches over max_patch_bytes are cut but additions are still counted."""
+    diff = ["diff --git a/big.txt b/big.txt", "@@ -0,0 +1,100 @@"] + [f"+line {i}" for i in range(100)]
+    (change,) = parse_unified_diff(diff, max_patch_bytes=100)
+
+    assert change.additions == 100
+    assert len(change.patch) <= 100
+
+def test_patch_cap_stops_at_first_line_over_it():
+    """Shorter lines after an oversized one are not kept, and the cap counts UTF-8 bytes."""
+    diff = ["diff --git a/app.py b/app.py", "@@ -1,3 +1,3 @@", "+short", "+" + "x" * 200, "+tail"]
+    (change,) = parse_unified_diff(diff, max_patch_bytes=100)
+
+    assert change.patch == "@@ -1,3 +1,3 @@\n+short"
+    assert change.additions == 3
+
+    # 20 characters, 60 bytes: fits a 30-character cap only if characters are counted
+    (change,) = parse_unified_diff(["diff --git a/i18n.txt b/i18n.txt", "@@ -0,0 +1 @@", "+" + "€" * 20],
+                                   max_patch_bytes=30)
+    assert change.patch == "@@ -0,0 +1 @@"
+
+def test_withheld_patch_recovered_from_raw_diff():
+    """A files entry without a patch is filled in from the streamed raw diff."""
+    server = HTTPServer(('127.0.0.1', 0), FakeGitHubHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+
+    try:
+        service = GitHubService()
+        service.client = GitHubClient(base_url=f"http://127.0.0.1:{server.server_port}")
+
+        changes = list(service.iter_file_changes("o", "r", 1, changed_files=2))
+
+        assert [change.filename for change in changes] == ["assets/logo.png", "app/table.py"]
+        assert "+    return \"✅\" if value else \"❌\"" in changes[1].patch
+        assert changes[1].status == "modified"
+    finally:
+        server.shutdown()
+
+if __name__ == "__main__":
+    test_parse_unified_diff()
+    test_patch_cap_keeps_exact_counts()
+    test_patch_cap_stops_at_first_line_over_it()
+    test_withheld_patch_recovered_from_raw_diff()
+    print("✅ Diff streaming tests passed")
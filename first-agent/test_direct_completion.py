@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Tests for the direct-completion fast path used by single-shot tasks.
+
+A local OpenAI-compatible endpoint streams the answer in chunks.
+"""
+
+import json
+import tempfile
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+import openai
+
+from src.direct_completion import DirectCompletion
+from src.llm_cache import CompletionCache
+
+ANSWER = ["🧪 QA will", " check the", " new table", " formatting."]
+
+class FakeChatHandler(BaseHTTPRequestHandler):
+    requests = []
+    include_usage = True
+
+    def log_message(self, *args):
+        pass
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        FakeChatHandler.requests.append(body)
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.end_headers()
+        base = {"id": "c1", "object": "chat.completion.chunk", "created": 0, "model": body["model"]}
+        for text in ANSWER:
+            chunk = {**base, "choices": [{"index": 0, "delta": {"content": text}, "finish_reason": None}]}
+            self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode())
+        if FakeChatHandler.include_usage:
+            usage = {"prompt_tokens": 57, "completion_tokens": 9, "total_tokens": 66}
+            self.wfile.write(f"data: {json.dumps({**base, 'choices': [], 'usage': usage})}\n\n".encode())
+        self.wfile.write(b"data: [DONE]\n\n")
+
+def start_server():
+    FakeChatHandler.requests = []
+    FakeChatHandler.include_usage = True
+    server = HTTPServer(("127.0.0.1", 0), FakeChatHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    client = openai.OpenAI(base_url=f"http://127.0.0.1:{server.server_port}/v1", api_key="test", max_retries=0)
+    return server, client
+
+def test_streams_tokens_and_reports_usage():
+    server, client = start_server()
+    try:
+        tokens = []
+        direct = DirectCompletion(client=client, model="meta-llama/Llama-3.1-8B-Instruct", max_tokens=120)
+        result = direct.complete("You are a GitHub Comment Generator.", "Summarize the QA scope.",
+                                 on_token=tokens.append)
+
+        assert result.text == "🧪 QA will check the new table formatting."
+        assert tokens == ANSWER
+        assert (result.prompt_tokens, result.completion_tokens) == (57, 9)
+        assert result.time_to_first_token is not None and result.time_to_first_token <= result.latency
+        assert not result.cached
+
+        request = FakeChatHandler.requests[0]
+        assert request["stream"] is True
+        assert request["max_tokens"] == 120
+        assert request["stream_options"] == {"include_usage": True}
+        assert [message["role"] for message in request["messages"]] == ["system", "user"]
+
+        # Servers that ignore include_usage get an estimate instead
+        FakeChatHandler.include_usage = False
+        result = direct.complete("System", "Prompt", max_tokens=40)
+        assert result.completion_tokens > 0 and result.prompt_tokens > 0
+        assert FakeChatHandler.requests[-1]["max_tokens"] == 40
+    finally:
+        server.shutdown()
+
+def test_repeated_prompts_use_the_completion_cache():
+    server, client = start_server()
+    try:
+        with tempfile.TemporaryDirectory() as directory:
+            cache = CompletionCache(directory, max_bytes=1024 * 1024, ttl_seconds=3600)
+            direct = DirectCompletion(client=client, model="m", max_tokens=120, cache=cache)
+
+            first = direct.complete("System", "Prompt")
+            tokens = []
+            second = direct.complete("System", "Prompt", on_token=tokens.append)
+
+            assert second.cached and second.text == first.text
+            assert tokens == [first.text]
+            assert len(FakeChatHandler.requests) == 1
+
+            # A different token limit can give a different answer
+            direct.complete("System", "Prompt", max_tokens=60)
+            assert len(FakeChatHandler.requests) == 2
+    finally:
+        server.shutdown()
+
+if __name__ == "__main__":
+    test_streams_tokens_and_reports_usage()
+    test_repeated_prompts_use_the_completion_cache()
+    print("✅ Direct completion tests passed")
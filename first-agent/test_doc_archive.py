@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Tests for the docs-only extract of repository tarballs.
+"""
+
+import io
+import os
+import tarfile
+import tempfile
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+from src.config import config
+from src.doc_archive import DocumentationArchive
+from src.doc_cache import DocumentationCache
+from src.github_client import GitHubClient
+from src.github_service import GitHubService
+
+def make_tarball(files: dict, prefix: str = "octo-shop-abc1234/") -> io.BytesIO:
+    """A gzipped tarball laid out like GitHub's, with every entry under one top-level directory."""
+    buffer = io.BytesIO()
+    with tarfile.open(fileobj=buffer, mode='w:gz') as archive:
+        for name, content in files.items():
+            data = content.encode('utf-8')
+            member = tarfile.TarInfo(name if name.startswith(('/', '..')) else prefix + name)
+            member.size = len(data)
+            archive.addfile(member, io.BytesIO(data))
+    buffer.seek(0)
+    return buffer
+
+def test_extracts_only_documentation():
+    """Markup and README-style files are kept; source files and traversal paths are not."""
+    with tempfile.TemporaryDirectory() as directory:
+        archive = DocumentationArchive(directory, max_bytes=1024 * 1024, max_file_bytes=1024)
+        tarball = make_tarball({
+            "README.md": "# Shop",
+            "docs/guide.md": "## Checkout",
+            "packages/cart/README": "Cart package",
+            "src/app.py": "print('hi')",
+            "docs/../../escape.md": "outside",
+            "docs/huge.md": "x" * 2048,
+        })
+
+        kept = archive.ingest("octo", "shop", "abc1234", tarball)
+
+        assert kept == 3
+        assert archive.has("octo", "shop", "abc1234")
+        assert not archive.is_partial("octo", "shop", "abc1234")
+        assert archive.find_readme("octo", "shop", "abc1234") == "README.md"
+        assert archive.read("octo", "shop", "abc1234", "docs/guide.md") == "## Checkout"
+        assert archive.find_readme("octo", "shop", "abc1234", "packages/cart") == "packages/cart/README"
+        assert archive.read("octo", "shop", "abc1234", "src/app.py") is None
+        assert archive.read("octo", "shop", "abc1234", "docs/huge.md") is None
+        assert not os.path.exists(os.path.join(directory, "octo", "escape.md"))
+        assert not any(name.endswith('.partial') for name in os.listdir(os.path.join(directory, "octo", "shop")))
+
+def test_oversized_revision_is_marked_partial():
+    """Files past the size cap are skipped, smaller ones after them still kept, and the revision marked partial."""
+    with tempfile.TemporaryDirectory() as directory:
+        archive = DocumentationArchive(directory, max_bytes=100, max_file_bytes=1024)
+        tarball = make_tarball({"CHANGELOG.md": "x" * 90, "docs/big.md": "y" * 50, "README.md": "# Shop"})
+
+        assert archive.ingest("octo", "shop", "abc1234", tarball) == 2
+        assert archive.is_partial("octo", "shop", "abc1234")
+        assert archive.read("octo", "shop", "abc1234", "README.md") == "# Shop"
+        assert archive.read("octo", "shop", "abc1234", "docs/big.md") is None
+        assert archive.list_files("octo", "shop", "abc1234") == ["README.md", "CHANGELOG.md"]
+
+def test_least_recent_revision_is_evicted():
+    """Ingesting past max_bytes drops the oldest revision."""
+    with tempfile.TemporaryDirectory() as directory:
+        archive = DocumentationArchive(directory, max_bytes=150, max_file_bytes=1024)
+        archive.ingest("octo", "shop", "old", make_tarball({"README.md": "a" * 100}))
+        old_dir = archive.revision_dir("octo", "shop", "old")
+        os.utime(old_dir, (1, 1))
+
+        archive.ingest("octo", "shop", "new", make_tarball({"README.md": "b" * 100}))
+
+        assert not archive.has("octo", "shop", "old")
+        assert archive.read("octo", "shop", "new", "README.md") == "b" * 100
+
+class FakeRepoHandler(BaseHTTPRequestHandler):
+    """Tree, HEAD commit and tarball endpoints of one repository."""
+
+    paths_seen = []
+
+    def do_GET(self):
+        FakeRepoHandler.paths_seen.append(self.path)
+        if self.path == "/repos/octo/shop/git/trees/HEAD":
+            body = b'{"sha": "tree-1", "tree": [{"path": "README.md", "type": "blob"}]}'
+        elif self.path == "/repos/octo/shop/commits/HEAD":
+            body = b"abc1234"
+        elif self.path == "/repos/octo/shop/tarball/abc1234":
+            body = make_tarball({"README.md": "# Shop\n\n- Checkout\n", "TESTING.md": "Run the e2e suite"}).read()
+        else:
+            self.send_response(404)
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+def test_service_ingests_the_head_commit_tarball():
+    """Bulk ingest downloads the tarball of the commit it resolved, and stores it under that commit."""
+    server = HTTPServer(('127.0.0.1', 0), FakeRepoHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    FakeRepoHandler.paths_seen = []
+    bulk_ingest = config.docs_bulk_ingest
+    config.docs_bulk_ingest = True
+
+    try:
+        with tempfile.TemporaryDirectory() as directory:
+            service = object.__new__(GitHubService)
+            service.client = GitHubClient(base_url=f"http://127.0.0.1:{server.server_port}")
+            service.doc_cache = DocumentationCache(os.path.join(directory, "docs"), 4, 4)
+            service.doc_archive = DocumentationArchive(os.path.join(directory, "archives"), 1024 * 1024, 1024)
+
+            doc_data = service.get_documentation_data("octo", "shop")
+
+            assert doc_data.readme_content.startswith("# Shop")
+            assert doc_data.testing_guidelines == "Run the e2e suite"
+            assert "/repos/octo/shop/tarball/abc1234" in FakeRepoHandler.paths_seen
+            assert service.doc_archive.has("octo", "shop", "abc1234")
+    finally:
+        config.docs_bulk_ingest = bulk_ingest
+        server.shutdown()
+
+if __name__ == "__main__":
+    test_extracts_only_documentation()
+    test_oversized_revision_is_marked_partial()
+    test_least_recent_revision_is_evicted()
+    test_service_ingests_the_head_commit_tarball()
+    print("✅ Documentation archive tests passed")
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Tests for the tree-SHA keyed documentation cache.
+
+The service test runs the sync client against a local HTTP server standing
+in for the tree and README endpoints.
+"""
+
+import tempfile
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+from src.doc_cache import DocumentationCache
+from src.github_client import GitHubClient
+from src.github_service import GitHubService
+from src.models import DocumentationData
+
+class FakeDocsHandler(BaseHTTPRequestHandler):
+    """A repository whose README endpoint answers with the next queued status."""
+
+    readme_statuses = []
+    readme_requests = 0
+
+    def do_GET(self):
+        if self.path == "/repos/o/r/git/trees/HEAD":
+            self._send(200, b'{"sha": "tree-1", "tree": [{"path": "README.md", "type": "blob"}]}')
+        elif self.path == "/repos/o/r/readme":
+            FakeDocsHandler.readme_requests += 1
+            status = FakeDocsHandler.readme_statuses.pop(0)
+            self._send(status, b"# Storefront\n\n- Order history\n" if status == 200 else b'{"message": "error"}')
+        else:
+            self._send(404, b'{"message": "Not Found"}')
+
+    def _send(self, status: int, body: bytes):
+        self.send_response(status)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+def test_hit_and_miss_across_tiers():
+    """A stored revision is a memory hit, and a disk hit for a fresh instance."""
+    with tempfile.TemporaryDirectory() as directory:
+        cache = DocumentationCache(directory, max_memory_entries=4, max_disk_entries=4)
+        key = ("o", "r", "tree-1")
+
+        assert cache.get(key) is None
+        cache.put(key, DocumentationData(readme_content="# Storefront"))
+        assert cache.get(key).readme_content == "# Storefront"
+        assert cache.stats() == {"hits": 1, "misses": 1, "memory_entries": 1}
+
+        restarted = DocumentationCache(directory, max_memory_entries=4, max_disk_entries=4)
+        assert restarted.get(key).readme_content == "# Storefront"
+        assert restarted.stats()["hits"] == 1
+
+def test_new_tree_sha_misses_and_invalidate_drops_revisions():
+    """A docs change produces a new tree SHA, which is a different key."""
+    with tempfile.TemporaryDirectory() as directory:
+        cache = DocumentationCache(directory, max_memory_entries=4, max_disk_entries=4)
+        cache.put(("o", "r", "tree-1"), DocumentationData(readme_content="old"))
+
+        assert cache.get(("o", "r", "tree-2")) is None
+        cache.put(("o", "r", "tree-2"), DocumentationData(readme_content="new"))
+        assert cache.get(("o", "r", "tree-2")).readme_content == "new"
+
+        cache.invalidate("o", "r")
+        assert cache.get(("o", "r", "tree-1")) is None
+        assert cache.get(("o", "r", "tree-2")) is None
+
+def test_failed_readme_fetch_is_not_cached():
+    """A server error leaves the revision uncached; a missing README is cached like a found one."""
+    server = HTTPServer(('127.0.0.1', 0), FakeDocsHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    FakeDocsHandler.readme_statuses = [500, 200]
+    FakeDocsHandler.readme_requests = 0
+
+    try:
+        with tempfile.TemporaryDirectory() as directory:
+            service = object.__new__(GitHubService)
+            service.client = GitHubClient(base_url=f"http://127.0.0.1:{server.server_port}")
+            service.doc_cache = DocumentationCache(directory, max_memory_entries=4, max_disk_entries=4)
+
+            assert service.get_documentation_data("o", "r").readme_content is None
+            assert service.get_documentation_data("o", "r").readme_content.startswith("# Storefront")
+            assert service.get_documentation_data("o", "r").readme_content.startswith("# Storefront")
+            assert FakeDocsHandler.readme_requests == 2
+
+            service.doc_cache.invalidate("o", "r")
+            FakeDocsHandler.readme_statuses = [404]
+            assert service.get_documentation_data("o", "r").readme_content is None
+            assert service.get_documentation_data("o", "r").readme_content is None
+            assert FakeDocsHandler.readme_requests == 3
+    finally:
+        server.shutdown()
+
+if __name__ == "__main__":
+    test_hit_and_miss_across_tiers()
+    test_new_tree_sha_misses_and_invalidate_drops_revisions()
+    test_failed_readme_fetch_is_not_cached()
+    print("✅ Documentation cache tests passed")
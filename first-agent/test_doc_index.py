@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+"""
+Tests for the nearest-README directory index.
+"""
+
+from src.doc_index import ReadmeIndex
+
+def test_nearest_readme_walks_up_directories():
+    """Each changed file maps to the README of its closest documented directory."""
+    index = ReadmeIndex(complete=True)
+    index.add_paths([
+        "README.md",
+        "packages/api/README.md",
+        "packages/api/README.rst",
+        "packages/api/src/server.py",
+        "packages/web/src/app.tsx",
+        "tools/lint.py",
+    ])
+
+    assert index.nearest_readme("packages/api/src/server.py") == "packages/api/README.md"
+    assert index.nearest_readme("packages/web/src/app.tsx") == "README.md"
+    assert index.nearest_readme("tools/lint.py") == "README.md"
+    assert index.unlisted_ancestors("packages/api/src/server.py") == []
+
+def test_nearest_readmes_ranked_by_changed_files():
+    """READMEs covering more changed files come first and the limit is honoured."""
+    index = ReadmeIndex(complete=True)
+    index.add_paths(["a/README.md", "b/README.md", "c/README.md"])
+    changed = ["a/x.py", "b/x.py", "b/y.py", "b/z.py", "c/x.py", "c/y.py"]
+
+    assert index.nearest_readmes(changed, limit=2) == ["b/README.md", "c/README.md"]
+
+def test_truncated_listing_reports_unlisted_directories():
+    """Directories are listed on demand when the recursive tree was truncated."""
+    index = ReadmeIndex(complete=False)
+    assert index.unlisted_ancestors("pkg/core/mod.py") == ["", "pkg", "pkg/core"]
+
+    index.mark_listed("", ["README.md"])
+    index.mark_listed("pkg", ["pkg/README.md"])
+    assert index.unlisted_ancestors("pkg/core/mod.py") == ["pkg/core"]
+    assert index.nearest_readme("pkg/core/mod.py") == "pkg/README.md"
+
+if __name__ == "__main__":
+    test_nearest_readme_walks_up_directories()
+    test_nearest_readmes_ranked_by_changed_files()
+    test_truncated_listing_reports_unlisted_directories()
+    print("✅ Documentation index tests passed")
@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Tests for the server-sent-events report stream.
+"""
+
+import asyncio
+import json
+import threading
+from types import SimpleNamespace
+
+from crewai import Agent, Crew, Process, Task
+from crewai.events import crewai_event_bus
+from crewai.events.types.llm_events import LLMStreamChunkEvent
+from crewai.llms.base_llm import BaseLLM
+from fastapi.testclient import TestClient
+
+import server
+from src.agents import QAContextAgents
+
+PR_URL = "https://github.com/acme/storefront/pull/42"
+
+def parse_events(body: str):
+    events = []
+    for block in body.strip().split("\n\n"):
+        lines = dict(line.split(": ", 1) for line in block.split("\n"))
+        events.append((lines["event"], json.loads(lines["data"])))
+    return events
+
+def install_generator(generate_qa_context):
+    async def get_head_sha_async(pr_url):
+        return "1111111"
+
+    server.generator = SimpleNamespace(
+        generate_qa_context=generate_qa_context,
+        agents=SimpleNamespace(github_service=SimpleNamespace(get_head_sha_async=get_head_sha_async)),
+    )
+
+def test_stream_emits_stages_tokens_and_report():
+    seen = {}
+
+    async def generate_qa_context(pr_url, output_file=None, progress=None, head_sha=None, use_cache=True,
+                                  on_token=None):
+        seen.update(head_sha=head_sha, use_cache=use_cache)
+        progress("collecting_github_data", 0.1)
+        progress("github_fetched", 0.2)
+        progress("docs_fetched", 0.3)
+        progress("generating_qa_context", 0.4)
+
+        # Model output arrives on worker threads
+        def model():
+            for text in ["## Focus", " areas", "\n- Tables"]:
+                on_token("analysis", text)
+            on_token("comment", "🧪 QA will check tables.")
+        worker = threading.Thread(target=model)
+        worker.start()
+        await asyncio.get_running_loop().run_in_executor(None, worker.join)
+        return "## Focus areas\n- Tables\n\n---\n\n🧪 QA will check tables."
+
+    install_generator(generate_qa_context)
+    response = TestClient(server.app).get("/generate/stream", params={"url": PR_URL, "refresh": "true"})
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+    events = parse_events(response.text)
+
+    stages = [data["stage"] for event, data in events if event == "stage"]
+    assert stages == ["started", "collecting_github_data", "github_fetched", "docs_fetched", "generating_qa_context"]
+    elapsed = [data["elapsed"] for event, data in events if event == "stage"]
+    assert elapsed == sorted(elapsed)
+
+    tokens = [(data["task"], data["text"]) for event, data in events if event == "token"]
+    assert "".join(text for task, text in tokens if task == "analysis") == "## Focus areas\n- Tables"
+    assert ("comment", "🧪 QA will check tables.") in tokens
+
+    assert events[-1][0] == "report"
+    assert events[-1][1]["markdown_report"].startswith("## Focus areas")
+    names = [data.get("stage", event) for event, data in events]
+    assert names.index("token") > names.index("generating_qa_context")
+    assert seen == {"head_sha": "1111111", "use_cache": False}
+
+def test_stream_reports_errors_and_rejects_bad_urls():
+    async def generate_qa_context(pr_url, output_file=None, progress=None, head_sha=None, use_cache=True,
+                                  on_token=None):
+        raise Exception("GitHub data collection failed: 404")
+
+    install_generator(generate_qa_context)
+    client = TestClient(server.app)
+
+    events = parse_events(client.get("/generate/stream", params={"url": PR_URL}).text)
+    assert events[-1] == ("error", {"error": "GitHub data collection failed: 404", "elapsed": events[-1][1]["elapsed"]})
+
+    assert client.get("/generate/stream", params={"url": "https://example.com/pr/1"}).status_code == 400
+
+class ChunkedLLM(BaseLLM):
+    """Emits its answer as stream chunk events, as CrewAI's LLM does with stream=True."""
+    reply: str = "done"
+
+    def call(self, messages, tools=None, callbacks=None, available_functions=None,
+             from_task=None, from_agent=None, response_model=None):
+        for word in self.reply.split(" "):
+            crewai_event_bus.emit(self, LLMStreamChunkEvent(chunk=word + " ", from_task=from_task,
+                                                            from_agent=from_agent, call_id="c1"))
+        return self.reply
+
+def test_crew_chunks_are_forwarded_per_task():
+    agents = object.__new__(QAContextAgents)
+    analysis = Task(description="Analyze", expected_output="Report",
+                    agent=Agent(role="QA", goal="g", backstory="b", llm=ChunkedLLM(model="m", reply="Check tables")))
+    other = Task(description="Other", expected_output="Text",
+                 agent=Agent(role="Other", goal="g", backstory="b", llm=ChunkedLLM(model="m", reply="Unrelated")))
+
+    received = []
+    with agents._streaming_tokens({"analysis": analysis}, lambda task, text: received.append((task, text))):
+        Crew(agents=[analysis.agent], tasks=[analysis], process=Process.sequential).kickoff()
+        Crew(agents=[other.agent], tasks=[other], process=Process.sequential).kickoff()
+    # Unsubscribed afterwards
+    Crew(agents=[analysis.agent], tasks=[analysis], process=Process.sequential).kickoff()
+
+    assert received == [("analysis", "Check "), ("analysis", "tables ")]
+
+if __name__ == "__main__":
+    test_stream_emits_stages_tokens_and_report()
+    test_stream_reports_errors_and_rejects_bad_urls()
+    test_crew_chunks_are_forwarded_per_task()
+    print("✅ Report stream tests passed")
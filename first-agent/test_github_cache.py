@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Tests for the conditional-request GitHub response cache.
+
+Runs the sync client against a local HTTP server that honours If-None-Match.
+"""
+
+import json
+import tempfile
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+from src.github_cache import GitHubHttpCache
+from src.github_client import GitHubClient
+
+class FakeGitHubHandler(BaseHTTPRequestHandler):
+    """Serves one JSON document with a fixed ETag."""
+
+    requests_seen = []
+
+    def do_GET(self):
+        FakeGitHubHandler.requests_seen.append(self.headers.get('If-None-Match'))
+        if self.headers.get('If-None-Match') == '"v1"':
+            self.send_response(304)
+            self.end_headers()
+            return
+
+        body = json.dumps({"title": "Cached PR"}).encode('utf-8')
+        self.send_response(200)
+        self.send_header('ETag', '"v1"')
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+def test_revalidation_served_from_cache():
+    """A second request sends If-None-Match and returns the cached body on 304."""
+    server = HTTPServer(('127.0.0.1', 0), FakeGitHubHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    FakeGitHubHandler.requests_seen = []
+
+    try:
+        with tempfile.TemporaryDirectory() as directory:
+            cache = GitHubHttpCache(directory, max_bytes=1024 * 1024)
+            client = GitHubClient(base_url=f"http://127.0.0.1:{server.server_port}", cache=cache)
+
+            first = client.get_json("/repos/o/r/pulls/1")
+            second = client.get_json("/repos/o/r/pulls/1")
+
+            assert first == second == {"title": "Cached PR"}
+            assert FakeGitHubHandler.requests_seen == [None, '"v1"']
+            stats = cache.stats()
+            assert stats["hits"] == 1
+            assert stats["misses"] == 1
+            assert stats["entries"] == 1
+    finally:
+        server.shutdown()
+
+def test_lru_eviction_respects_size_limit():
+    """Old entries are evicted once the cache grows beyond max_bytes."""
+    with tempfile.TemporaryDirectory() as directory:
+        cache = GitHubHttpCache(directory, max_bytes=600)
+
+        for i in range(5):
+            key = cache.make_key(f"https://api.github.com/item/{i}")
+            cache.store(key, f"https://api.github.com/item/{i}", "x" * 100, f'"{i}"', None)
+
+        stats = cache.stats()
+        assert stats["size_bytes"] <= 600
+        assert stats["evictions"] > 0
+        assert cache.lookup(cache.make_key("https://api.github.com/item/4")) is not None
+        assert cache.lookup(cache.make_key("https://api.github.com/item/0")) is None
+
+if __name__ == "__main__":
+    test_revalidation_served_from_cache()
+    test_lru_eviction_respects_size_limit()
+    print("✅ GitHub cache tests passed")
@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+Tests for the async GitHub client's page fan-out.
+
+A local HTTP server stands in for the list endpoints and records which
+pages were asked for.
+"""
+
+import asyncio
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import aiohttp
+
+from src.github_client import AsyncGitHubClient, PR_FILES_LIMIT
+from src.github_service import GitHubService
+
+class FakeListHandler(BaseHTTPRequestHandler):
+    """Numbered items for `total` entries; pages listed in `failing_pages` answer 500."""
+
+    total = 0
+    failing_pages = set()
+    changed_files = 0
+    pages = []
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        query = parse_qs(url.query)
+        if url.path == "/repos/o/r/pulls/7":
+            self._send(200, {
+                "title": "Rename every fixture", "body": None, "labels": [], "additions": 1, "deletions": 1,
+                "commits": 1, "comments": 0, "changed_files": FakeListHandler.changed_files,
+                "created_at": "2024-01-01T00:00:00Z", "updated_at": "2024-01-01T00:00:00Z",
+                "head": {"sha": "head-1"},
+            })
+            return
+
+        page, per_page = int(query["page"][0]), int(query["per_page"][0])
+        if url.path == "/repos/o/r/pulls/7/files":
+            FakeListHandler.pages.append(page)
+            first = (page - 1) * per_page
+            # Like GitHub, pages past the 3000-file cap are empty
+            count = max(0, min(per_page, min(FakeListHandler.changed_files, PR_FILES_LIMIT) - first))
+            self._send(200, [
+                {"filename": f"fixtures/{first + i}.json", "additions": 1, "deletions": 1, "changes": 2,
+                 "status": "modified", "patch": "@@ -1 +1 @@\n-a\n+b"}
+                for i in range(count)
+            ])
+        elif url.path == "/items":
+            FakeListHandler.pages.append(page)
+            if page in FakeListHandler.failing_pages:
+                self._send(500, {"message": "Server Error"})
+                return
+            first = (page - 1) * per_page
+            self._send(200, list(range(first, min(first + per_page, FakeListHandler.total))))
+        else:
+            self._send(200, [])
+
+    def _send(self, status: int, payload):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+def run_against_server(make_call):
+    """Run make_call(client) on a fresh client pointed at a fresh fake server."""
+    server = ThreadingHTTPServer(('127.0.0.1', 0), FakeListHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    FakeListHandler.pages = []
+    client = AsyncGitHubClient(base_url=f"http://127.0.0.1:{server.server_port}")
+
+    async def run():
+        try:
+            return await make_call(client)
+        finally:
+            await client.close()
+
+    try:
+        return asyncio.run(run())
+    finally:
+        server.shutdown()
+
+def test_every_page_is_requested_and_joined_in_order():
+    """The page count follows from the total, and items keep page order whatever order pages finish in."""
+    FakeListHandler.total = 250
+    FakeListHandler.failing_pages = set()
+
+    items = run_against_server(lambda client: client.get_paginated("/items", 250))
+
+    assert items == list(range(250))
+    assert sorted(FakeListHandler.pages) == [1, 2, 3]
+
+def test_empty_list_still_asks_for_one_page():
+    FakeListHandler.total = 0
+    FakeListHandler.failing_pages = set()
+
+    assert run_against_server(lambda client: client.get_paginated("/items", 0)) == []
+    assert FakeListHandler.pages == [1]
+
+def test_failed_page_propagates():
+    """One failing page fails the whole listing instead of returning a short list."""
+    FakeListHandler.total = 300
+    FakeListHandler.failing_pages = {2}
+
+    try:
+        run_against_server(lambda client: client.get_paginated("/items", 300))
+    except aiohttp.ClientResponseError as e:
+        assert e.status == 500
+    else:
+        raise AssertionError("get_paginated() should raise when a page fails")
+
+def test_file_pages_stop_at_the_listing_limit():
+    """A PR reporting more files than the endpoint lists asks only for the pages that can hold files."""
+    FakeListHandler.changed_files = 4200
+
+    async def fetch(client):
+        service = object.__new__(GitHubService)
+        service.async_client = client
+        return await service.get_pr_data_async("https://github.com/o/r/pull/7")
+
+    pr_data = run_against_server(fetch)
+
+    assert sorted(FakeListHandler.pages) == list(range(1, PR_FILES_LIMIT // 100 + 1))
+    assert len(pr_data.file_changes) == PR_FILES_LIMIT
+
+if __name__ == "__main__":
+    test_every_page_is_requested_and_joined_in_order()
+    test_empty_list_still_asks_for_one_page()
+    test_failed_page_propagates()
+    test_file_pages_stop_at_the_listing_limit()
+    print("✅ GitHub client tests passed")
@@ -0,0 +1,213 @@
+#!/usr/bin/env python3
+"""
+Tests for fetching PR context through GraphQL.
+
+A local HTTP server stands in for the GraphQL endpoint and the REST files
+endpoint the patches are read from.
+"""
+
+import asyncio
+import json
+import tempfile
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from src.doc_cache import DocumentationCache
+from src.github_client import AsyncGitHubClient
+from src.github_service import GitHubService
+
+def file_node(path, change_type="MODIFIED"):
+    return {"path": path, "additions": 2, "deletions": 1, "changeType": change_type}
+
+def pull_request(**overrides):
+    pr = {
+        "title": "Add order history",
+        "body": "Lists past orders on the account page.",
+        "additions": 6,
+        "deletions": 3,
+        "changedFiles": 3,
+        "createdAt": "2024-01-01T00:00:00Z",
+        "updatedAt": "2024-01-02T00:00:00Z",
+        "headRefOid": "head-1",
+        "commits": {"totalCount": 2},
+        "labels": {"nodes": [{"name": "feature"}]},
+        "files": {
+            "pageInfo": {"hasNextPage": True, "endCursor": "files-1"},
+            "nodes": [file_node("src/orders.py"), file_node("src/account.py", "ADDED")],
+        },
+        "comments": {
+            "pageInfo": {"hasNextPage": True, "endCursor": "comments-1"},
+            "nodes": [{"body": "Preview: https://shop-pr-7.fly.dev", "createdAt": "2024-01-01T01:00:00Z"}],
+        },
+    }
+    pr.update(overrides)
+    return pr
+
+class FakeGitHubHandler(BaseHTTPRequestHandler):
+    """GraphQL answers are queued per query name; REST file pages come from `patches`."""
+
+    context_response = {}
+    more_pages_responses = []
+    patches = {}
+    graphql_requests = []
+    rest_requests = []
+
+    def do_POST(self):
+        request = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+        FakeGitHubHandler.graphql_requests.append(request)
+        if "query PRMorePages" in request["query"]:
+            data = FakeGitHubHandler.more_pages_responses.pop(0)
+        else:
+            data = FakeGitHubHandler.context_response
+        self._send(200, json.dumps({"data": data}).encode())
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        FakeGitHubHandler.rest_requests.append(self.path)
+        if url.path == "/repos/o/r/pulls/7/files":
+            page = int(parse_qs(url.query)["page"][0])
+            files = [
+                {"filename": path, "additions": 2, "deletions": 1, "changes": 3, "status": "modified", "patch": patch}
+                for path, patch in FakeGitHubHandler.patches.items()
+            ] if page == 1 else []
+            self._send(200, json.dumps(files).encode())
+        else:
+            self._send(404, b'{"message": "Not Found"}')
+
+    def _send(self, status: int, body: bytes):
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+def fetch_context(include_patches=True):
+    """Run get_pr_context_async against a fresh fake server and docs cache."""
+    server = ThreadingHTTPServer(('127.0.0.1', 0), FakeGitHubHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    FakeGitHubHandler.graphql_requests = []
+    FakeGitHubHandler.rest_requests = []
+    base_url = f"http://127.0.0.1:{server.server_port}"
+
+    async def run(service):
+        try:
+            return await service.get_pr_context_async("https://github.com/o/r/pull/7", include_patches)
+        finally:
+            await service.async_client.close()
+
+    try:
+        with tempfile.TemporaryDirectory() as directory:
+            service = object.__new__(GitHubService)
+            service.async_client = AsyncGitHubClient(base_url=base_url, graphql_url=f"{base_url}/graphql")
+            service.doc_cache = DocumentationCache(directory, max_memory_entries=4, max_disk_entries=4)
+            pr_data, doc_data = asyncio.run(run(service))
+            return pr_data, doc_data, service.doc_cache
+    finally:
+        server.shutdown()
+
+def test_context_query_maps_to_pr_and_docs():
+    """Files, comments and README blobs map onto PRData and DocumentationData, following every page."""
+    FakeGitHubHandler.context_response = {"repository": {
+        "pullRequest": pull_request(),
+        "readme": None,
+        "readmeLower": {"text": "# Storefront\n\n## Features\n- Order history\n"},
+        "testingMd": {"text": "Run pytest."},
+        "docs": {"oid": "docs-1"},
+        "defaultBranchRef": {"target": {"tree": {"oid": "tree-1"}}},
+    }}
+    FakeGitHubHandler.more_pages_responses = [
+        {"repository": {"pullRequest": {
+            "files": {"pageInfo": {"hasNextPage": False, "endCursor": "files-2"},
+                      "nodes": [file_node("docs/orders.md", "RENAMED")]},
+            "comments": {"pageInfo": {"hasNextPage": True, "endCursor": "comments-2"},
+                         "nodes": [{"body": "Second comment", "createdAt": "2024-01-01T02:00:00Z"}]},
+        }}},
+        {"repository": {"pullRequest": {
+            "comments": {"pageInfo": {"hasNextPage": False, "endCursor": "comments-3"},
+                         "nodes": [{"body": "Third comment", "createdAt": "2024-01-01T03:00:00Z"}]},
+        }}},
+    ]
+    FakeGitHubHandler.patches = {"src/orders.py": "@@ -1,2 +1,3 @@\n def orders():\n+    return []\n"}
+
+    pr_data, doc_data, doc_cache = fetch_context()
+
+    assert pr_data.title == "Add order history"
+    assert pr_data.labels == ["feature"]
+    assert pr_data.commits_count == 2
+    assert pr_data.head_sha == "head-1"
+    assert pr_data.files_changed == ["src/orders.py", "src/account.py", "docs/orders.md"]
+    assert [change.status for change in pr_data.file_changes] == ["modified", "added", "renamed"]
+    assert pr_data.file_changes[0].patch_text().endswith("+    return []\n")
+    assert not pr_data.file_changes[1].has_patch
+    assert pr_data.pr_comments == ["Preview: https://shop-pr-7.fly.dev", "Second comment", "Third comment"]
+
+    assert doc_data.readme_content.startswith("# Storefront")
+    assert doc_data.testing_guidelines == "Run pytest."
+    assert doc_data.api_documentation
+    assert doc_cache.get(("o", "r", "tree-1")).readme_content == doc_data.readme_content
+
+    # The first follow-up asks for both connections, the second only for comments
+    first, second, third = FakeGitHubHandler.graphql_requests
+    assert first["variables"] == {"owner": "o", "name": "r", "number": 7}
+    assert second["variables"]["filesCursor"] == "files-1"
+    assert second["variables"]["moreFiles"] and second["variables"]["moreComments"]
+    assert third["variables"]["commentsCursor"] == "comments-2"
+    assert not third["variables"]["moreFiles"] and third["variables"]["moreComments"]
+
+def test_null_fields_are_tolerated():
+    """Missing blobs, an empty description and a repository without a default branch still map."""
+    FakeGitHubHandler.context_response = {"repository": {
+        "pullRequest": pull_request(
+            body=None,
+            changedFiles=1,
+            labels={"nodes": []},
+            files={"pageInfo": {"hasNextPage": False, "endCursor": None},
+                   "nodes": [file_node("src/orders.py", "DELETED")]},
+            comments={"pageInfo": {"hasNextPage": False, "endCursor": None}, "nodes": []},
+        ),
+        "readme": None,
+        "readmeLower": None,
+        "readmeRst": None,
+        "readmePlain": None,
+        "testingMd": None,
+        "testMd": None,
+        "testReadme": None,
+        "docs": None,
+        "defaultBranchRef": None,
+    }}
+    FakeGitHubHandler.more_pages_responses = []
+
+    pr_data, doc_data, doc_cache = fetch_context(include_patches=False)
+
+    assert pr_data.description is None
+    assert pr_data.labels == []
+    assert pr_data.pr_comments == []
+    assert pr_data.file_changes[0].status == "removed"
+    assert not pr_data.file_changes[0].has_patch
+    assert doc_data.readme_content is None
+    assert doc_data.testing_guidelines is None
+    assert doc_data.api_documentation is None
+    assert doc_cache.stats()["memory_entries"] == 0
+    assert len(FakeGitHubHandler.graphql_requests) == 1
+    assert FakeGitHubHandler.rest_requests == []
+
+def test_missing_pull_request_raises():
+    """A null pullRequest is reported as not found rather than a KeyError."""
+    FakeGitHubHandler.context_response = {"repository": {"pullRequest": None}}
+
+    try:
+        fetch_context()
+    except ValueError as e:
+        assert "Pull request not found" in str(e)
+    else:
+        raise AssertionError("get_pr_context_async() should reject a missing pull request")
+
+if __name__ == "__main__":
+    test_context_query_maps_to_pr_and_docs()
+    test_null_fields_are_tolerated()
+    test_missing_pull_request_raises()
+    print("✅ GitHub GraphQL tests passed")
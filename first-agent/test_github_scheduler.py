@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Tests for the GitHub rate-limit scheduler.
+"""
+
+import time
+import asyncio
+
+from src.github_scheduler import GitHubRateLimitScheduler, RequestPriority, request_priority
+from src.github_tokens import GitHubTokenPool
+
+def make_scheduler(tokens=("token-a",), **kwargs):
+    return GitHubRateLimitScheduler(token_pool=GitHubTokenPool(list(tokens)), **kwargs)
+
+def test_interactive_requests_overtake_background():
+    """Queued interactive work is granted before background work queued earlier."""
+    scheduler = make_scheduler(rate_per_second=20, burst=1, max_wait_seconds=10)
+    order = []
+
+    async def request(name, priority):
+        with request_priority(priority):
+            await scheduler.acquire_async()
+        order.append(name)
+
+    async def run():
+        # Use up the only burst token so everything after it has to queue
+        await scheduler.acquire_async()
+        background = [asyncio.create_task(request(f"bg{i}", RequestPriority.BACKGROUND)) for i in range(3)]
+        await asyncio.sleep(0)
+        interactive = asyncio.create_task(request("interactive", RequestPriority.INTERACTIVE))
+        await asyncio.gather(interactive, *background)
+
+    asyncio.run(run())
+    assert order[0] == "interactive"
+    assert scheduler.stats()["queue_depth"] == 0
+
+def test_secondary_limit_blocks_until_retry_after():
+    """A Retry-After response holds back the next request instead of failing it."""
+    scheduler = make_scheduler(rate_per_second=100, burst=10, max_wait_seconds=10)
+
+    assert scheduler.update("token-a", 403, {"Retry-After": "0.3"}, "You have exceeded a secondary rate limit")
+
+    start = time.monotonic()
+    scheduler.acquire()
+    assert time.monotonic() - start >= 0.25
+    assert scheduler.stats()["throttled"] == 1
+
+def test_budget_is_tracked_from_headers():
+    """X-RateLimit headers are exposed per resource in stats()."""
+    scheduler = make_scheduler(rate_per_second=100, burst=10, max_wait_seconds=10)
+    reset = time.time() + 60
+
+    limited = scheduler.update("token-a", 200, {
+        "X-RateLimit-Limit": "5000",
+        "X-RateLimit-Remaining": "4200",
+        "X-RateLimit-Reset": str(reset),
+        "X-RateLimit-Resource": "core",
+    })
+
+    assert not limited
+    budget = scheduler.stats()["budgets"]["core"]
+    assert budget["limit"] == 5000
+    assert budget["remaining"] == 4200
+
+def test_exhausted_quota_beyond_max_wait_raises():
+    """Waiting longer than max_wait_seconds for a reset is reported as an error."""
+    scheduler = make_scheduler(rate_per_second=100, burst=10, max_wait_seconds=1)
+    scheduler.update("token-a", 403, {
+        "X-RateLimit-Limit": "5000",
+        "X-RateLimit-Remaining": "0",
+        "X-RateLimit-Reset": str(time.time() + 600),
+    })
+
+    try:
+        scheduler.acquire()
+    except RuntimeError as e:
+        assert "rate limit" in str(e)
+    else:
+        raise AssertionError("acquire() should refuse to wait past max_wait_seconds")
+    assert scheduler.stats()["queue_depth"] == 0
+
+def test_requests_go_to_token_with_most_quota():
+    """The pool hands out the richest token and skips exhausted ones."""
+    scheduler = make_scheduler(tokens=("token-a", "token-b"), rate_per_second=100, burst=10, max_wait_seconds=10)
+    reset = str(time.time() + 600)
+
+    scheduler.update("token-a", 200, {"X-RateLimit-Limit": "5000", "X-RateLimit-Remaining": "2000", "X-RateLimit-Reset": reset})
+    scheduler.update("token-b", 200, {"X-RateLimit-Limit": "5000", "X-RateLimit-Remaining": "3000", "X-RateLimit-Reset": reset})
+    assert scheduler.acquire() == "token-b"
+
+    # token-b runs dry and is parked until its reset; token-a takes over
+    assert scheduler.update("token-b", 403, {"X-RateLimit-Limit": "5000", "X-RateLimit-Remaining": "0", "X-RateLimit-Reset": reset})
+    assert scheduler.acquire() == "token-a"
+    assert scheduler.stats()["budgets"]["core"]["remaining"] == 1999
+
+if __name__ == "__main__":
+    test_interactive_requests_overtake_background()
+    test_secondary_limit_blocks_until_retry_after()
+    test_budget_is_tracked_from_headers()
+    test_exhausted_quota_beyond_max_wait_raises()
+    test_requests_go_to_token_with_most_quota()
+    print("✅ GitHub scheduler tests passed")
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Tests for the report job queue behind POST /jobs and GET /jobs/{id}.
+
+Jobs run a stand-in generation that reports stages and waits on an event,
+so tests can look at jobs while they are queued and running.
+"""
+
+import asyncio
+
+from fastapi.testclient import TestClient
+
+import server
+from src.github_scheduler import RequestPriority, current_priority
+from src.jobs import Job, JobManager, JobQueueFull, JobStatus
+
+PR_URL = "https://github.com/acme/storefront/pull/42"
+
+def test_jobs_run_on_a_bounded_worker_pool():
+    async def scenario():
+        release = asyncio.Event()
+        started = []
+
+        async def run(job):
+            started.append(job.pr_url)
+            job.advance("collecting_github_data", 0.1)
+            await release.wait()
+            job.advance("generating_qa_context", 0.4)
+            return f"# Report for {job.pr_url}"
+
+        manager = JobManager(run, workers=2, result_ttl_seconds=60, max_queued=10)
+        await manager.start()
+        jobs = [manager.submit(f"{PR_URL}?n={n}") for n in range(3)]
+        await asyncio.sleep(0.05)
+
+        # Two workers: the third job waits in the queue
+        assert [job.status for job in jobs] == [JobStatus.RUNNING, JobStatus.RUNNING, JobStatus.QUEUED]
+        assert manager.get(jobs[0].id).stage == "collecting_github_data"
+        assert manager.stats()["queued"] == 1
+
+        release.set()
+        await asyncio.sleep(0.05)
+        await manager.stop()
+
+        for job in jobs:
+            assert job.status == JobStatus.SUCCEEDED
+            assert job.progress == 1.0
+            assert job.result == f"# Report for {job.pr_url}"
+            assert job.finished_at >= job.started_at
+        assert len(started) == 3
+
+    asyncio.run(scenario())
+
+def test_failures_are_reported_and_results_expire():
+    async def scenario():
+        async def run(job):
+            raise RuntimeError("GitHub data collection failed: Not Found")
+
+        manager = JobManager(run, workers=1, result_ttl_seconds=0.1, max_queued=1)
+        await manager.start()
+        job = manager.submit(PR_URL)
+        await asyncio.sleep(0.05)
+
+        assert manager.get(job.id).status == JobStatus.FAILED
+        assert manager.get(job.id).error == "GitHub data collection failed: Not Found"
+
+        await asyncio.sleep(0.1)
+        assert manager.get(job.id) is None
+        await manager.stop()
+
+    asyncio.run(scenario())
+
+def test_queue_bound():
+    async def scenario():
+        async def run(job):
+            await asyncio.sleep(10)
+
+        manager = JobManager(run, workers=1, max_queued=1)
+        await manager.start()
+        manager.submit(PR_URL)
+        await asyncio.sleep(0.01)  # The worker takes the first job off the queue
+        manager.submit(PR_URL)
+        try:
+            manager.submit(PR_URL)
+            assert False, "expected JobQueueFull"
+        except JobQueueFull:
+            pass
+        await manager.stop()
+
+    asyncio.run(scenario())
+
+def test_job_endpoints_validate_input():
+    async def run(job):
+        return ""
+
+    server.job_manager = JobManager(run, workers=1)
+    client = TestClient(server.app)
+
+    assert client.post("/jobs", json={"url": "https://example.com/not-a-pr"}).status_code == 400
+    assert client.get("/jobs/does-not-exist").status_code == 404
+
+def test_queued_jobs_run_at_background_priority():
+    """Jobs yield the GitHub rate limit to requests someone is waiting on."""
+    seen = []
+
+    async def generate_markdown_report(pr_url, output_file=None, progress=None, refresh=False):
+        seen.append(current_priority())
+        return "# Report"
+
+    original = server.generate_markdown_report
+    server.generate_markdown_report = generate_markdown_report
+    try:
+        job = Job(id="job-1", pr_url="https://github.com/acme/storefront/pull/42")
+        assert asyncio.run(server.run_job(job)) == "# Report"
+    finally:
+        server.generate_markdown_report = original
+
+    assert seen == [RequestPriority.BACKGROUND]
+    assert current_priority() == RequestPriority.INTERACTIVE
+
+if __name__ == "__main__":
+    test_jobs_run_on_a_bounded_worker_pool()
+    test_failures_are_reported_and_results_expire()
+    test_queue_bound()
+    test_job_endpoints_validate_input()
+    test_queued_jobs_run_at_background_priority()
+    print("✅ Job queue tests passed")
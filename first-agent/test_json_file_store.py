@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+"""
+Tests for the size-capped JSON file store behind the GitHub and LLM caches.
+"""
+
+import os
+import tempfile
+import time
+
+from src.json_file_store import JsonFileStore
+
+def test_least_recently_used_entries_are_evicted():
+    """Touching an entry keeps it; the oldest untouched one goes first once max_bytes is passed."""
+    with tempfile.TemporaryDirectory() as directory:
+        store = JsonFileStore(directory, max_bytes=200)
+        for key in ("a", "b", "c"):
+            store.write(key, {"body": key * 50})
+            time.sleep(0.01)
+        store.touch("a")
+        store.write("d", {"body": "d" * 50})
+
+        assert store.read("b") is None
+        assert store.read("a") == {"body": "a" * 50}
+        assert store.stats()["evictions"] >= 1
+        assert store.stats()["size_bytes"] <= 200
+
+def test_index_is_rebuilt_from_disk():
+    """A new instance learns existing entries and their access order from the directory."""
+    with tempfile.TemporaryDirectory() as directory:
+        store = JsonFileStore(directory, max_bytes=1024)
+        store.write("a", {"body": "x"})
+        store.record(hit=True)
+        store.record(hit=False)
+        assert store.stats()["hit_rate"] == 0.5
+
+        reopened = JsonFileStore(directory, max_bytes=1024)
+        assert reopened.stats()["entries"] == 1
+        assert reopened.stats()["size_bytes"] == os.path.getsize(os.path.join(directory, "a.json"))
+        assert reopened.read("missing") is None
+
+if __name__ == "__main__":
+    test_least_recently_used_entries_are_evicted()
+    test_index_is_rebuilt_from_disk()
+    print("✅ JSON file store tests passed")
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Tests for the on-disk LLM completion cache used by the CrewAI agents.
+
+A stand-in BaseLLM counts calls, so no model endpoint is needed.
+"""
+
+import tempfile
+import time
+
+from crewai import Agent
+from crewai.llms.base_llm import BaseLLM
+
+from src.llm_cache import CachedLLM, CompletionCache
+
+MESSAGES = [
+    {"role": "system", "content": "You are a Senior QA Engineer."},
+    {"role": "user", "content": "Analyze PR: Improve table readability"},
+]
+
+class CountingLLM(BaseLLM):
+    """Answers with the call number; fails the calls listed in `failures`."""
+    calls: int = 0
+    failures: list = []
+    seen_stop: list = []
+
+    def call(self, messages, tools=None, callbacks=None, available_functions=None,
+             from_task=None, from_agent=None, response_model=None):
+        self.calls += 1
+        self.seen_stop = list(self.stop)
+        if self.calls in self.failures:
+            raise RuntimeError("503 Service Unavailable")
+        return f"completion {self.calls}"
+
+def make_cache(directory, max_bytes=1024 * 1024, ttl_seconds=3600):
+    return CompletionCache(directory, max_bytes=max_bytes, ttl_seconds=ttl_seconds)
+
+def test_identical_prompts_are_served_from_disk():
+    with tempfile.TemporaryDirectory() as directory:
+        inner = CountingLLM(model="meta-llama/Llama-3.1-8B-Instruct", temperature=0.2)
+        llm = CachedLLM.wrap(inner, make_cache(directory))
+
+        assert llm.call(MESSAGES) == "completion 1"
+        assert llm.call(MESSAGES) == "completion 1"
+        assert llm.call(MESSAGES + [{"role": "user", "content": "More detail"}]) == "completion 2"
+        assert inner.calls == 2
+        assert llm.cache.stats()["hit_rate"] == 1 / 3
+
+        # A later run (new process, new cache object) still hits
+        rerun = CachedLLM.wrap(CountingLLM(model="meta-llama/Llama-3.1-8B-Instruct", temperature=0.2),
+                               make_cache(directory))
+        assert rerun.call(MESSAGES) == "completion 1"
+        assert rerun.llm.calls == 0
+
+        # Different sampling parameters are a different completion
+        warmer = CachedLLM.wrap(CountingLLM(model="meta-llama/Llama-3.1-8B-Instruct", temperature=0.9),
+                                make_cache(directory))
+        assert warmer.call(MESSAGES) == "completion 1"
+        assert warmer.llm.calls == 1
+
+def test_failed_calls_are_not_cached():
+    """A retry after a transient failure only pays for the call that failed."""
+    with tempfile.TemporaryDirectory() as directory:
+        inner = CountingLLM(model="m", failures=[2])
+        llm = CachedLLM.wrap(inner, make_cache(directory))
+        analysis = [{"role": "user", "content": "analysis task"}]
+        comment = [{"role": "user", "content": "comment task"}]
+
+        llm.call(analysis)
+        try:
+            llm.call(comment)
+            assert False, "expected the downstream failure"
+        except RuntimeError:
+            pass
+
+        assert llm.call(analysis) == "completion 1"
+        assert llm.call(comment) == "completion 3"
+        assert inner.calls == 3
+
+def test_ttl_and_size_eviction():
+    with tempfile.TemporaryDirectory() as directory:
+        llm = CachedLLM.wrap(CountingLLM(model="m"), make_cache(directory, ttl_seconds=0.1))
+        llm.call(MESSAGES)
+        time.sleep(0.15)
+        assert llm.call(MESSAGES) == "completion 2"
+
+    with tempfile.TemporaryDirectory() as directory:
+        cache = make_cache(directory, max_bytes=300)
+        llm = CachedLLM.wrap(CountingLLM(model="m"), cache)
+        for n in range(5):
+            llm.call([{"role": "user", "content": f"prompt {n}"}])
+        stats = cache.stats()
+        assert stats["size_bytes"] <= 300
+        assert stats["evictions"] >= 2
+
+def test_tool_calls_bypass_the_cache_and_stop_words_reach_the_model():
+    with tempfile.TemporaryDirectory() as directory:
+        inner = CountingLLM(model="m")
+        llm = CachedLLM.wrap(inner, make_cache(directory))
+        tools = [{"name": "search", "description": "Search", "parameters": {}}]
+
+        llm.call(MESSAGES, tools=tools)
+        llm.call(MESSAGES, tools=tools)
+        assert inner.calls == 2
+        assert llm.cache.stats()["entries"] == 0
+
+        llm.stop = ["\nObservation:"]
+        llm.call(MESSAGES)
+        assert inner.seen_stop == ["\nObservation:"]
+
+def test_usable_as_agent_llm():
+    with tempfile.TemporaryDirectory() as directory:
+        llm = CachedLLM.wrap(CountingLLM(model="m"), make_cache(directory))
+        agent = Agent(role="QA", goal="Test", backstory="Tester", llm=llm)
+        assert agent.llm is llm
+
+if __name__ == "__main__":
+    test_identical_prompts_are_served_from_disk()
+    test_failed_calls_are_not_cached()
+    test_ttl_and_size_eviction()
+    test_tool_calls_bypass_the_cache_and_stop_words_reach_the_model()
+    test_usable_as_agent_llm()
+    print("✅ LLM completion cache tests passed")
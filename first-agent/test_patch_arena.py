@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+"""
+Tests for arena-backed patch storage.
+"""
+
+import copy
+import sys
+
+from src.models import FileChange
+from src.patch_arena import PatchArena
+
+PATCHES = ["@@ -1 +1 @@\n-Yes\n+✅", "", "no newline at all", "crlf line\r\n+added\n"]
+
+def test_patches_round_trip_through_arena():
+    """Text and byte ranges read back exactly what was added."""
+    arena = PatchArena()
+    handles = [arena.add(patch) for patch in PATCHES]
+
+    for handle, patch in zip(handles, PATCHES):
+        assert arena.text(handle) == patch
+        start, end = arena.span(handle)
+        assert end - start == len(patch.encode('utf-8'))
+        assert arena.count(b'\n', start, end) == patch.count('\n')
+    assert len(arena) == len(PATCHES)
+
+def test_non_ascii_patch_stays_narrow():
+    """One emoji makes CPython store a whole str at 4 bytes per character; the arena keeps UTF-8."""
+    patch = "+    STATUS_ICONS = {'ok': '🟢'}\n" + " unchanged context line\n" * 500
+    arena = PatchArena()
+    arena.add(patch)
+
+    assert arena.nbytes < sys.getsizeof(patch) / 3
+
+def test_file_change_reads_patch_from_arena():
+    """An attached FileChange drops its string but still serializes its patch."""
+    arena = PatchArena()
+    change = FileChange(filename="table.py", additions=1, deletions=1, changes=2,
+                        patch=PATCHES[0], status="modified")
+    change.attach_patch(arena)
+
+    assert change.patch is None
+    assert change.has_patch
+    assert change.patch_text() == PATCHES[0]
+    start, _ = arena.span(0)
+    assert arena.decode(start + 12, start + 16) == "-Yes"
+    assert change.model_dump()["patch"] == PATCHES[0]
+    assert copy.deepcopy(change).patch_text() == PATCHES[0]
+
+if __name__ == "__main__":
+    test_patches_round_trip_through_arena()
+    test_non_ascii_patch_stays_narrow()
+    test_file_change_reads_patch_from_arena()
+    print("✅ Patch arena tests passed")
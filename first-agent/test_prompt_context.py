@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""
+Tests for token-budgeted assembly of the analysis prompt context.
+"""
+
+from src.models import FileChange
+from src.patch_arena import PatchArena
+from src.prompt_context import (
+    assemble_prompt_context, context_budget, estimate_tokens, path_terms, split_markdown_sections
+)
+
+TABLE_PATCH = """@@ -10,4 +10,5 @@ def render_table(rows):
+     for row in rows:
+-        cells = [str(value) for value in row]
++        cells = [format_cell(value) for value in row]
++        cells = align_numbers(cells)
+         print(cells)
+@@ -40 +41 @@
+-    return "Yes" if value else "No"
++    return "✅" if value else "❌"
+"""
+
+LOCK_PATCH = "@@ -1,3 +1,3 @@\n" + "\n".join(f'-    "dep-{n}": "1.0.{n}",\n+    "dep-{n}": "1.1.{n}",' for n in range(200))
+
+README = """# Storefront
+
+Storefront is the customer-facing shop for Acme.
+
+## Installation
+
+```bash
+# not a heading
+npm install
+```
+
+## Data Table
+
+Order history is shown in a data table; numeric cells are right-aligned.
+
+## Deployment
+
+Previews deploy to Vercel on every pull request.
+""" + "\n".join(f"## Appendix {n}\n\n" + "Lorem ipsum dolor sit amet. " * 40 for n in range(20))
+
+def file_changes():
+    return [
+        FileChange(filename="src/DataTable/cells.py", additions=3, deletions=2, changes=5,
+                   patch=TABLE_PATCH, status="modified"),
+        FileChange(filename="package-lock.json", additions=200, deletions=200, changes=400,
+                   patch=LOCK_PATCH, status="modified"),
+    ]
+
+def test_budget_follows_the_model():
+    assert context_budget("meta-llama/Llama-3.1-8B-Instruct") == 6000
+    # A small window leaves room for the instructions and answer
+    assert context_budget("some-unknown-8k-model") == 8192 - 4096
+    assert estimate_tokens("x" * 400) == 101
+
+def test_sections_and_path_terms():
+    sections = split_markdown_sections(README)
+    assert [heading for heading, _ in sections[:4]] == ["Storefront", "Installation", "Data Table", "Deployment"]
+    assert "# not a heading" in sections[1][1]
+    assert path_terms(["src/DataTable/cells.py"]) == {"data", "table", "datatable", "cells"}
+
+def test_priority_order_and_source_tags():
+    context = assemble_prompt_context("Improve table readability", "Emoji for booleans", file_changes(),
+                                      {"README.md": README}, budget=600)
+    sources = [piece.source for piece in context.pieces]
+
+    assert sources[0] == "pull request"
+    assert "Title: Improve table readability" in context.pieces[0].text
+    # Source hunks first; the much larger lockfile hunk is left out
+    assert sources[1] == "diff src/DataTable/cells.py @@ -10,4 +10,5 @@ def render_table(rows):"
+    assert sources[2] == "diff src/DataTable/cells.py @@ -40,1 +41,1 @@"
+    assert "+ cells = align_numbers(cells)" in context.pieces[1].text.replace("  ", "")
+    assert not any("package-lock.json @@" in source for source in sources)
+    # The README section about the changed component is picked, the appendices are not
+    assert "README.md#Data Table" in sources
+    assert "README.md#Appendix 3" not in sources
+    assert context.tokens <= context.budget
+
+    rendered = context.render()
+    assert rendered.startswith("[source: pull request]\n")
+    assert "[source: README.md#Data Table]" in rendered
+    assert "[omitted to fit the 600-token budget:" in rendered
+    assert "README sections" in rendered
+
+def test_truncation_is_visible():
+    long_description = "\n".join(f"Stack frame {n}: at render (table.js:{n})" for n in range(2000))
+    context = assemble_prompt_context("Fix crash", long_description, file_changes(), {"README.md": README},
+                                      budget=800)
+
+    assert context.tokens <= 800
+    assert context.pieces[0].truncated
+    assert "[truncated:" in context.pieces[0].text
+    # The diff still gets in after the oversized description
+    assert any(piece.source.startswith("diff src/DataTable") for piece in context.pieces)
+
+def test_package_readmes_near_the_changes_rank_first():
+    readmes = {
+        "README.md": "# Monorepo\n\nMany packages.\n\n## Billing\n\nInvoices.",
+        "packages/table/README.md": "# Table\n\nRenders tables.\n\n## Formatting\n\nCells are formatted.",
+    }
+    context = assemble_prompt_context("Tweak", None, [], readmes, near_changes=["packages/table/README.md"],
+                                      budget=70)
+    sources = [piece.source for piece in context.pieces]
+    assert "packages/table/README.md#Table" in sources
+    assert "README.md#Billing" not in sources
+    assert "Description: No description provided" in context.pieces[0].text
+
+def test_long_file_list_leaves_room_for_hunks():
+    """A PR touching hundreds of files lists the most changed ones and still gets its hunks."""
+    changes = [
+        FileChange(filename=f"src/generated/client_{n}.py", additions=1, deletions=1, changes=2,
+                   patch=f"@@ -1 +1 @@\n-version = {n}\n+version = {n + 1}", status="modified")
+        for n in range(600)
+    ]
+    changes[450] = FileChange(filename="src/DataTable/cells.py", additions=3, deletions=2, changes=5,
+                              patch=TABLE_PATCH, status="modified")
+
+    context = assemble_prompt_context("Regenerate clients", "Bumps every client.", changes, {"README.md": README},
+                                      budget=6000)
+
+    pr_piece = context.pieces[0]
+    assert pr_piece.tokens <= 6000 * 0.1 + 50
+    assert "src/DataTable/cells.py (modified, +3 -2)" in pr_piece.text
+    assert "more files" in pr_piece.text
+    assert any(piece.source.startswith("diff src/DataTable/cells.py") for piece in context.pieces)
+    assert sum(piece.source.startswith("diff ") for piece in context.pieces) > 100
+    assert context.tokens <= 6000
+
+class CountingArena(PatchArena):
+    def __init__(self):
+        super().__init__()
+        self.decodes = 0
+
+    def decode(self, start: int, end: int) -> str:
+        self.decodes += 1
+        return super().decode(start, end)
+
+def test_only_chosen_hunks_are_decoded():
+    """Hunks past the diff budget are skipped from their size alone, without decoding them."""
+    arena = CountingArena()
+    changes = []
+    for n in range(300):
+        change = FileChange(filename=f"src/module_{n}.py", additions=4, deletions=4, changes=8, status="modified",
+                            patch="@@ -1,4 +1,4 @@\n" + "\n".join(f"-old line {i}\n+new line {i}" for i in range(4)))
+        change.attach_patch(arena)
+        changes.append(change)
+
+    context = assemble_prompt_context("Touch modules", None, changes, {}, budget=1500)
+
+    hunk_pieces = [piece for piece in context.pieces if piece.source.startswith("diff ")]
+    assert 0 < len(hunk_pieces) < 300
+    assert arena.decodes == len(hunk_pieces)
+
+if __name__ == "__main__":
+    test_budget_follows_the_model()
+    test_sections_and_path_terms()
+    test_priority_order_and_source_tags()
+    test_truncation_is_visible()
+    test_package_readmes_near_the_changes_rank_first()
+    test_long_file_list_leaves_room_for_hunks()
+    test_only_chosen_hunks_are_decoded()
+    print("✅ Prompt context tests passed")
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Tests for the two-tier QA report cache.
+"""
+
+import os
+import tempfile
+import time
+
+from src.report_cache import ReportCache, ReportKey
+
+PR_URL = "https://github.com/acme/storefront/pull/42"
+MODEL = "meta-llama/Llama-3.1-8B-Instruct"
+
+def key(head_sha="1111111", pr_url=PR_URL, prompt_version="1"):
+    return ReportKey(pr_url, head_sha, MODEL, prompt_version)
+
+def test_reports_survive_restarts():
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "reports.sqlite3")
+        cache = ReportCache(path)
+        assert cache.get(key()) is None
+        cache.put(key(), "# QA report")
+        assert cache.get(key()) == "# QA report"
+        cache.close()
+
+        # A new process starts with an empty memory tier and reads SQLite
+        restarted = ReportCache(path)
+        assert restarted.get(key()) == "# QA report"
+        assert restarted.stats()["memory_entries"] == 1
+        # Any part of the key changing is a different report
+        assert restarted.get(key(head_sha="2222222")) is None
+        assert restarted.get(key(prompt_version="2")) is None
+        assert restarted.stats()["hits"] == 1
+        restarted.close()
+
+def test_ttl_and_size_limits():
+    with tempfile.TemporaryDirectory() as directory:
+        cache = ReportCache(os.path.join(directory, "reports.sqlite3"), max_memory_entries=1,
+                            max_entries=2, ttl_seconds=0.2)
+        cache.put(key("a"), "report a")
+        cache.put(key("b"), "report b")
+        assert cache.get(key("a")) == "report a"  # From SQLite; "b" holds the single memory slot
+        cache.put(key("c"), "report c")           # "b" is now the least recently used row
+
+        assert cache.stats()["stored_entries"] == 2
+        assert cache.get(key("b")) is None
+        assert cache.get(key("a")) == "report a"
+
+        time.sleep(0.25)
+        assert cache.get(key("a")) is None
+        assert cache.get(key("c")) is None
+        cache.close()
+
+def test_invalidation():
+    with tempfile.TemporaryDirectory() as directory:
+        cache = ReportCache(os.path.join(directory, "reports.sqlite3"))
+        other_pr = "https://github.com/acme/storefront/pull/7"
+        cache.put(key("a"), "report a")
+        cache.put(key("b"), "report b")
+        cache.put(key("a", pr_url=other_pr), "other")
+
+        assert cache.invalidate(PR_URL) == 2
+        assert cache.get(key("a")) is None
+        assert cache.get(key("a", pr_url=other_pr)) == "other"
+        assert cache.invalidate() == 1
+        assert cache.get(key("a", pr_url=other_pr)) is None
+        cache.close()
+
+def test_invalidation_by_another_process():
+    """A clear-cache run against the same file is seen by a live instance's memory tier."""
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "reports.sqlite3")
+        server_cache = ReportCache(path)
+        server_cache.put(key("a"), "report a")
+        server_cache.put(key("b"), "report b")
+        assert server_cache.get(key("a")) == "report a"
+
+        cli_cache = ReportCache(path)
+        assert cli_cache.invalidate(PR_URL) == 2
+        cli_cache.close()
+
+        assert server_cache.get(key("a")) is None
+        assert server_cache.get(key("b")) is None
+
+        # Writes from elsewhere only empty the memory tier; SQLite still answers
+        server_cache.put(key("c"), "report c")
+        other_writer = ReportCache(path)
+        other_writer.put(key("d"), "report d")
+        other_writer.close()
+        assert server_cache.get(key("c")) == "report c"
+        assert server_cache.get(key("d")) == "report d"
+        server_cache.close()
+
+if __name__ == "__main__":
+    test_reports_survive_restarts()
+    test_ttl_and_size_limits()
+    test_invalidation()
+    test_invalidation_by_another_process()
+    print("✅ Report cache tests passed")
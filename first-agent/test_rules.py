@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Tests for the compiled focus-area and scenario rule engine.
+"""
+
+from datetime import datetime
+
+from src.models import FileChange, PRData
+from src.rules import DEFAULT_RULES, RuleEngine
+
+def make_pr(title, files):
+    return PRData(
+        title=title,
+        created_at=datetime.now(),
+        updated_at=datetime.now(),
+        pr_url="https://github.com/o/r/pull/1",
+        repo_name="r",
+        repo_owner="o",
+        file_changes=[
+            FileChange(filename=filename, additions=1, deletions=0, changes=1, patch=patch, status="modified")
+            for filename, patch in files
+        ],
+    )
+
+def matched(engine, pr_data, key):
+    return [rule[key] if key == "focus_area" else rule[key]["title"]
+            for rule in engine.match(pr_data) if rule.get(key)]
+
+def test_overlapping_keywords_all_match():
+    """Keywords inside other keywords, or overlapping them, still credit their rules."""
+    engine = RuleEngine([
+        {"focus_area": "Alignment", "keywords": ["align"]},
+        {"focus_area": "CSS Alignment", "keywords": ["text-align"]},
+        {"focus_area": "Text", "keywords": ["text"]},
+        {"focus_area": "Unrelated", "keywords": ["checkout"]},
+    ])
+    pr_data = make_pr("Tweak cells", [("cell.css", "@@ -1 +1 @@\n+.cell { TEXT-ALIGN: right; }")])
+
+    assert matched(engine, pr_data, "focus_area") == ["Alignment", "CSS Alignment", "Text"]
+
+def test_default_rules_cover_patches_filenames_and_title():
+    """The built-in table yields the same focus areas and scenarios as the old keyword checks."""
+    engine = RuleEngine(DEFAULT_RULES)
+    pr_data = make_pr("Improve table readability", [
+        ("src/components/ResultTable.tsx", "@@ -1 +1 @@\n-<td>Yes</td>\n+<td>✅</td>"),
+        ("src/numbers.css", "@@ -1 +1 @@\n+.num { font-family: monospace; }"),
+    ])
+
+    focus_areas = matched(engine, pr_data, "focus_area")
+    assert "Emoji/Icon Display" in focus_areas
+    assert "User Interface Changes" in focus_areas
+    assert "Responsive Design" not in focus_areas
+    assert matched(engine, pr_data, "scenario") == [
+        "Table Readability Verification", "Emoji Display Testing", "Number Formatting Verification"
+    ]
+
+def test_invalid_rule_target_rejected():
+    """A typo in a custom rule is reported when the table is compiled."""
+    try:
+        RuleEngine([{"focus_area": "X", "target": "body", "keywords": ["x"]}])
+    except ValueError as e:
+        assert "body" in str(e)
+    else:
+        raise AssertionError("RuleEngine should reject unknown targets")
+
+if __name__ == "__main__":
+    test_overlapping_keywords_all_match()
+    test_default_rules_cover_patches_filenames_and_title()
+    test_invalid_rule_target_rejected()
+    print("✅ Rule engine tests passed")
@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+"""
+Tests for request coalescing of report generation.
+"""
+
+import asyncio
+from types import SimpleNamespace
+
+import server
+from src.github_scheduler import RequestPriority, current_priority, request_priority
+from src.single_flight import SingleFlight
+
+PR_URL = "https://github.com/acme/storefront/pull/42"
+
+def test_concurrent_callers_share_one_run():
+    async def scenario():
+        flights = SingleFlight()
+        runs = []
+
+        async def work(progress):
+            runs.append(1)
+            progress("generating_qa_context", 0.4)
+            await asyncio.sleep(0.05)
+            return "report"
+
+        results = await asyncio.gather(*(flights.do("key", work) for _ in range(5)))
+        assert results == ["report"] * 5
+        assert len(runs) == 1
+        assert flights.stats() == {"in_flight": 0, "started": 1, "joined": 4}
+
+        # Finished flights are not cached: the next call runs again
+        assert await flights.do("key", work) == "report"
+        assert len(runs) == 2
+
+    asyncio.run(scenario())
+
+def test_errors_reach_every_caller_and_cancellation_does_not_spread():
+    async def scenario():
+        flights = SingleFlight()
+
+        async def failing(progress):
+            await asyncio.sleep(0.02)
+            raise RuntimeError("GitHub data collection failed")
+
+        results = await asyncio.gather(*(flights.do("bad", failing) for _ in range(3)), return_exceptions=True)
+        assert [str(result) for result in results] == ["GitHub data collection failed"] * 3
+
+        async def slow(progress):
+            await asyncio.sleep(0.05)
+            return "done"
+
+        first = asyncio.create_task(flights.do("slow", slow))
+        second = asyncio.create_task(flights.do("slow", slow))
+        await asyncio.sleep(0.01)
+        first.cancel()  # e.g. the first client disconnected
+        assert await second == "done"
+
+    asyncio.run(scenario())
+
+def test_progress_is_forwarded_to_late_joiners():
+    async def scenario():
+        flights = SingleFlight()
+        step = asyncio.Event()
+
+        async def work(progress):
+            progress("collecting_github_data", 0.1)
+            await step.wait()
+            progress("generating_qa_context", 0.4)
+            return "report"
+
+        leader_seen, follower_seen = [], []
+        leader = asyncio.create_task(flights.do("k", work, lambda *p: leader_seen.append(p)))
+        await asyncio.sleep(0.01)
+        follower = asyncio.create_task(flights.do("k", work, lambda *p: follower_seen.append(p)))
+        await asyncio.sleep(0.01)
+        step.set()
+        await asyncio.gather(leader, follower)
+
+        assert leader_seen == [("collecting_github_data", 0.1), ("generating_qa_context", 0.4)]
+        assert follower_seen == [("collecting_github_data", 0.1), ("generating_qa_context", 0.4)]
+
+    asyncio.run(scenario())
+
+def test_server_coalesces_by_head_commit():
+    """Bursts for one PR revision run once; a new head commit starts a new run."""
+    heads = {"sha": "1111111"}
+    generations = []
+
+    async def get_head_sha_async(pr_url):
+        return heads["sha"]
+
+    async def generate_qa_context(pr_url, output_file=None, progress=None, head_sha=None, use_cache=True,
+                                  on_token=None):
+        generations.append(heads["sha"])
+        await asyncio.sleep(0.05)
+        return f"# QA report for {heads['sha']}"
+
+    server.generator = SimpleNamespace(
+        generate_qa_context=generate_qa_context,
+        agents=SimpleNamespace(github_service=SimpleNamespace(get_head_sha_async=get_head_sha_async)),
+    )
+    server.report_flights = SingleFlight()
+
+    async def scenario():
+        burst = await asyncio.gather(*(server.generate_markdown_report(PR_URL) for _ in range(4)))
+        assert burst == ["# QA report for 1111111"] * 4
+
+        heads["sha"] = "2222222"
+        first = asyncio.create_task(server.generate_markdown_report(PR_URL))
+        await asyncio.sleep(0.01)
+        heads["sha"] = "3333333"
+        await asyncio.gather(first, server.generate_markdown_report(PR_URL))
+
+    asyncio.run(scenario())
+    assert generations == ["1111111", "2222222", "3333333"]
+
+def test_refresh_does_not_join_a_cached_run():
+    """A refresh arriving during a plain run starts its own; a plain request may join a refresh."""
+    runs = []
+
+    async def get_head_sha_async(pr_url):
+        return "1111111"
+
+    async def generate_qa_context(pr_url, output_file=None, progress=None, head_sha=None, use_cache=True,
+                                  on_token=None):
+        runs.append(use_cache)
+        await asyncio.sleep(0.05)
+        return "# cached report" if use_cache else "# fresh report"
+
+    server.generator = SimpleNamespace(
+        generate_qa_context=generate_qa_context,
+        agents=SimpleNamespace(github_service=SimpleNamespace(get_head_sha_async=get_head_sha_async)),
+    )
+    server.report_flights = SingleFlight()
+
+    async def scenario():
+        plain = asyncio.create_task(server.generate_markdown_report(PR_URL))
+        await asyncio.sleep(0.01)
+        refreshed = await server.generate_markdown_report(PR_URL, refresh=True)
+        assert await plain == "# cached report"
+        assert refreshed == "# fresh report"
+
+        refresh = asyncio.create_task(server.generate_markdown_report(PR_URL, refresh=True))
+        await asyncio.sleep(0.01)
+        assert await server.generate_markdown_report(PR_URL) == "# fresh report"
+        await refresh
+
+    asyncio.run(scenario())
+    assert runs == [True, False, False]
+
+def test_interactive_callers_do_not_wait_on_background_runs():
+    """/generate during a queued job for the same head runs at interactive priority; a job may join it."""
+    runs = []
+
+    async def get_head_sha_async(pr_url):
+        return "1111111"
+
+    async def generate_qa_context(pr_url, output_file=None, progress=None, head_sha=None, use_cache=True,
+                                  on_token=None):
+        runs.append(current_priority())
+        await asyncio.sleep(0.05)
+        return f"# report at {current_priority().name}"
+
+    server.generator = SimpleNamespace(
+        generate_qa_context=generate_qa_context,
+        agents=SimpleNamespace(github_service=SimpleNamespace(get_head_sha_async=get_head_sha_async)),
+    )
+    server.report_flights = SingleFlight()
+
+    async def background_report():
+        with request_priority(RequestPriority.BACKGROUND):
+            return await server.generate_markdown_report(PR_URL)
+
+    async def scenario():
+        job = asyncio.create_task(background_report())
+        await asyncio.sleep(0.01)
+        assert await server.generate_markdown_report(PR_URL) == "# report at INTERACTIVE"
+        assert await job == "# report at BACKGROUND"
+
+        interactive = asyncio.create_task(server.generate_markdown_report(PR_URL))
+        await asyncio.sleep(0.01)
+        assert await background_report() == "# report at INTERACTIVE"
+        await interactive
+
+    asyncio.run(scenario())
+    assert runs == [RequestPriority.BACKGROUND, RequestPriority.INTERACTIVE, RequestPriority.INTERACTIVE]
+
+if __name__ == "__main__":
+    test_concurrent_callers_share_one_run()
+    test_errors_reach_every_caller_and_cancellation_does_not_spread()
+    test_progress_is_forwarded_to_late_joiners()
+    test_server_coalesces_by_head_commit()
+    test_refresh_does_not_join_a_cached_run()
+    test_interactive_callers_do_not_wait_on_background_runs()
+    print("✅ Single-flight tests passed")
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Tests for the stage executor that keeps blocking work off the event loop.
+"""
+
+import asyncio
+import threading
+import time
+
+from src.github_scheduler import RequestPriority, _current_priority, request_priority
+from src.stage_executor import StageExecutor
+
+def test_event_loop_stays_responsive():
+    """A long blocking call doesn't delay other coroutines on the loop."""
+    executor = StageExecutor(max_workers=4, stage_limits={"llm": 2})
+
+    async def scenario():
+        generation = asyncio.create_task(executor.run("llm", time.sleep, 0.5))
+        worst_lag = 0.0
+        while not generation.done():
+            start = time.monotonic()
+            await asyncio.sleep(0.01)
+            worst_lag = max(worst_lag, time.monotonic() - start - 0.01)
+        await generation
+        return worst_lag
+
+    try:
+        assert asyncio.run(scenario()) < 0.1
+    finally:
+        executor.shutdown()
+
+def test_stage_limits_are_independent():
+    """LLM calls queue behind their own limit while GitHub calls keep flowing."""
+    executor = StageExecutor(max_workers=8, stage_limits={"llm": 2, "github": 4})
+    peak = {"llm": 0}
+    active = {"llm": 0}
+    lock = threading.Lock()
+
+    def llm_call():
+        with lock:
+            active["llm"] += 1
+            peak["llm"] = max(peak["llm"], active["llm"])
+        time.sleep(0.2)
+        with lock:
+            active["llm"] -= 1
+
+    async def scenario():
+        llm = [asyncio.create_task(executor.run("llm", llm_call)) for _ in range(4)]
+        await asyncio.sleep(0.05)
+        assert executor.stats()["waiting"]["llm"] == 2
+
+        start = time.monotonic()
+        await asyncio.gather(*(executor.run("github", time.sleep, 0.05) for _ in range(4)))
+        github_elapsed = time.monotonic() - start
+        await asyncio.gather(*llm)
+        return github_elapsed
+
+    try:
+        start = time.monotonic()
+        github_elapsed = asyncio.run(scenario())
+        assert github_elapsed < 0.15
+        assert peak["llm"] == 2
+        # Four 0.2s calls, two at a time
+        assert 0.38 < time.monotonic() - start < 0.7
+    finally:
+        executor.shutdown()
+
+def test_context_follows_work_to_the_thread():
+    executor = StageExecutor(max_workers=1, stage_limits={})
+
+    async def scenario():
+        with request_priority(RequestPriority.BACKGROUND):
+            return await executor.run("github", _current_priority.get)
+
+    try:
+        assert asyncio.run(scenario()) == RequestPriority.BACKGROUND
+    finally:
+        executor.shutdown()
+
+def test_reusable_across_event_loops():
+    """The CLI runs each report in a fresh loop; stage semaphores must not leak between them."""
+    executor = StageExecutor(max_workers=2, stage_limits={"llm": 1})
+    try:
+        for _ in range(2):
+            assert asyncio.run(executor.run("llm", sum, [1, 2, 3])) == 6
+    finally:
+        executor.shutdown()
+
+if __name__ == "__main__":
+    test_event_loop_stays_responsive()
+    test_stage_limits_are_independent()
+    test_context_follows_work_to_the_thread()
+    test_reusable_across_event_loops()
+    print("✅ Stage executor tests passed")
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Tests for running independent crew tasks concurrently.
+"""
+
+import contextvars
+import threading
+import time
+
+from crewai import Agent, Crew, Process, Task
+from crewai.llms.base_llm import BaseLLM
+
+from src.task_graph import TaskGraph
+
+request_id = contextvars.ContextVar("request_id", default=None)
+
+class SlowLLM(BaseLLM):
+    """Takes `delay` seconds per call, like a model round trip, and records when it was busy."""
+    delay: float = 0.3
+    reply: str = "done"
+    busy: list = []
+
+    def call(self, messages, tools=None, callbacks=None, available_functions=None,
+             from_task=None, from_agent=None, response_model=None):
+        start = time.monotonic()
+        time.sleep(self.delay)
+        self.busy.append((start, time.monotonic()))
+        return f"Final Answer: {self.reply}"
+
+def test_independent_tasks_overlap_and_keep_order():
+    graph = TaskGraph()
+    graph.add("analysis", lambda _: (time.sleep(0.3), "analysis")[1])
+    graph.add("comment", lambda _: (time.sleep(0.2), "comment")[1])
+
+    start = time.monotonic()
+    results = graph.run()
+    elapsed = time.monotonic() - start
+
+    assert list(results.items()) == [("analysis", "analysis"), ("comment", "comment")]
+    assert elapsed < 0.45, f"tasks ran one after another ({elapsed:.2f}s)"
+
+def test_dependencies_wait_and_receive_results():
+    started = {}
+    graph = TaskGraph()
+    graph.add("a", lambda _: (time.sleep(0.1), 1)[1])
+    graph.add("b", lambda _: 2)
+    graph.add("sum", lambda inputs: (started.setdefault("sum", dict(inputs)), inputs["a"] + inputs["b"])[1],
+              depends_on=["a", "b"])
+
+    assert graph.run() == {"a": 1, "b": 2, "sum": 3}
+    assert started["sum"] == {"a": 1, "b": 2}
+
+    try:
+        TaskGraph().add("x", lambda _: None, depends_on=["missing"])
+        assert False, "expected ValueError for an unknown dependency"
+    except ValueError:
+        pass
+
+def test_failure_propagates_and_context_is_copied():
+    token = request_id.set("req-42")
+    seen = []
+    try:
+        graph = TaskGraph()
+        graph.add("ok", lambda _: seen.append((request_id.get(), threading.current_thread().name)))
+        graph.add("bad", lambda _: 1 / 0)
+        try:
+            graph.run()
+            assert False, "expected the task's error"
+        except ZeroDivisionError:
+            pass
+    finally:
+        request_id.reset(token)
+
+    assert seen[0][0] == "req-42"
+    assert seen[0][1].startswith("crew-task")
+
+def test_single_task_crews_run_concurrently():
+    """The two LLM round trips of the analysis and comment crews overlap."""
+    def kickoff(task):
+        crew = Crew(agents=[task.agent], tasks=[task], process=Process.sequential)
+        return crew.kickoff().tasks_output[0].raw
+
+    analysis_llm = SlowLLM(model="m", delay=0.6, reply="analysis")
+    comment_llm = SlowLLM(model="m", delay=0.6, reply="comment")
+    analysis = Task(description="Analyze the PR", expected_output="QA report",
+                    agent=Agent(role="QA", goal="Analyze", backstory="Tester", llm=analysis_llm))
+    comment = Task(description="Write a comment", expected_output="Comment", context=[],
+                   agent=Agent(role="Commenter", goal="Comment", backstory="Writer", llm=comment_llm))
+
+    graph = TaskGraph()
+    graph.add("analysis", lambda _: kickoff(analysis))
+    graph.add("comment", lambda _: kickoff(comment))
+
+    assert graph.run() == {"analysis": "analysis", "comment": "comment"}
+    (analysis_start, analysis_end), (comment_start, comment_end) = analysis_llm.busy[0], comment_llm.busy[0]
+    assert analysis_start < comment_end and comment_start < analysis_end, "crews ran one after another"
+
+if __name__ == "__main__":
+    test_independent_tasks_overlap_and_keep_order()
+    test_dependencies_wait_and_receive_results()
+    test_failure_propagates_and_context_is_copied()
+    test_single_task_crews_run_concurrently()
+    print("✅ Task graph tests passed")
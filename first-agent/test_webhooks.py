@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+Tests for the GitHub webhook receiver.
+
+Replays the recorded deliveries in fixtures/webhooks through the FastAPI
+endpoint, with the GitHub service replaced by a stand-in that records the
+follow-up work it is asked to do.
+"""
+
+import threading
+from types import SimpleNamespace
+
+from fastapi.testclient import TestClient
+
+import server
+from replay_webhooks import load_fixtures, signed_delivery
+from src.config import config
+from src.github_scheduler import RequestPriority, current_priority
+from src.models import DeploymentInfo
+from src.webhooks import GitHubWebhookHandler, PRStateStore, sign, verify_signature
+
+SECRET = "webhook-test-secret"
+PR_URL = "https://github.com/acme/storefront/pull/42"
+
+class FakeGitHubService:
+    """Just the parts of GitHubService the webhook handler touches."""
+
+    def __init__(self):
+        self.pr_states = PRStateStore()
+        self.invalidated = []
+        self.forgotten = []
+        self.docs_fetched = []
+        self.doc_cache = SimpleNamespace(invalidate=lambda owner, repo: self.invalidated.append((owner, repo)))
+
+    def forget_deployment_watcher(self, pr_url):
+        self.forgotten.append(pr_url)
+
+    def get_documentation_data(self, owner, repo_name):
+        self.docs_fetched.append((owner, repo_name, current_priority()))
+
+def make_client():
+    service = FakeGitHubService()
+    prefetched = []
+
+    async def collect_github_data_async(pr_url):
+        prefetched.append(pr_url)
+        assert current_priority() == RequestPriority.BACKGROUND
+
+    server.generator = SimpleNamespace(agents=SimpleNamespace(
+        github_service=service, collect_github_data_async=collect_github_data_async
+    ))
+    server.webhook_handler = GitHubWebhookHandler(service)
+    config.github_webhook_secret = SECRET
+    # Without a `with` block TestClient skips the startup event, which would build the real generator
+    return TestClient(server.app), service, prefetched
+
+def deliver(client, fixture, secret=SECRET):
+    headers, body = signed_delivery(fixture, secret)
+    return client.post("/webhooks/github", content=body, headers=headers)
+
+def test_signature_verification():
+    body = b'{"zen": "Keep it logically awesome."}'
+    assert verify_signature(SECRET, body, sign(SECRET, body))
+    assert not verify_signature(SECRET, body, sign("other-secret", body))
+    assert not verify_signature(SECRET, body + b" ", sign(SECRET, body))
+    assert not verify_signature(SECRET, body, None)
+
+def test_rejects_unsigned_deliveries():
+    client, service, _ = make_client()
+    fixture = load_fixtures()[0]
+
+    assert deliver(client, fixture, secret="wrong").status_code == 401
+    headers, body = signed_delivery(fixture, SECRET)
+    del headers["X-Hub-Signature-256"]
+    assert client.post("/webhooks/github", content=body, headers=headers).status_code == 401
+    assert service.pr_states.get(PR_URL) is None
+
+def test_replay_updates_pr_state_and_deployments():
+    """The recorded PR lifecycle: open, preview comment, new commits, deployment, merge to main."""
+    client, service, prefetched = make_client()
+    opened, commented, synchronized, deployed, pushed = load_fixtures()
+
+    response = deliver(client, opened)
+    assert response.status_code == 200
+    assert response.json()["prefetch_prs"] == [PR_URL]
+    assert prefetched == [PR_URL]
+    assert service.pr_states.get(PR_URL).head_sha.startswith("1111")
+
+    deliver(client, commented)
+    preview = service.pr_states.deployment(PR_URL)
+    assert str(preview.url) == "https://storefront-git-feature-table-emoji-acme.vercel.app/"
+    assert preview.provider == "vercel"
+
+    # New commits make the old preview stale until the next deployment lands
+    deliver(client, synchronized)
+    assert service.pr_states.get(PR_URL).head_sha.startswith("2222")
+    assert service.pr_states.deployment(PR_URL) is None
+    assert service.forgotten == [PR_URL, PR_URL]
+    assert prefetched == [PR_URL, PR_URL]
+
+    response = deliver(client, deployed)
+    assert response.json()["pr_urls"] == [PR_URL]
+    deployment = service.pr_states.deployment(PR_URL)
+    assert str(deployment.url) == "https://storefront-2222222-acme.vercel.app/"
+    assert deployment.environment == "Preview"
+    assert deployment.version == "2222222222222222222222222222222222222222"
+
+    response = deliver(client, pushed)
+    assert response.json()["refresh_docs"] == "acme/storefront"
+    assert service.invalidated == [("acme", "storefront")]
+    # Warming and refreshing run behind interactive requests for the rate limit
+    assert service.docs_fetched == [("acme", "storefront", RequestPriority.BACKGROUND)]
+
+def test_deployment_for_commit_reaches_pr_that_arrives_later():
+    """A deployment_status delivered before the PR event is matched by head SHA."""
+    client, service, _ = make_client()
+    opened, _, synchronized, deployed, _ = load_fixtures()
+
+    deliver(client, deployed)
+    deliver(client, opened)
+    assert service.pr_states.deployment(PR_URL) is None
+    deliver(client, synchronized)
+    assert str(service.pr_states.deployment(PR_URL).url) == "https://storefront-2222222-acme.vercel.app/"
+
+def test_waiters_wake_on_delivery():
+    store = PRStateStore()
+    found = []
+    waiter = threading.Thread(target=lambda: found.append(store.wait_for_deployment(PR_URL, timeout=10)))
+    waiter.start()
+
+    store.record_deployment(PR_URL, "acme/storefront", 42,
+                            DeploymentInfo(url="https://pr-42.fly.dev", status="deployed", provider="fly.io"))
+    waiter.join(timeout=5)
+
+    assert not waiter.is_alive()
+    assert str(found[0].url) == "https://pr-42.fly.dev/"
+    assert store.wait_for_deployment("https://github.com/acme/storefront/pull/7", timeout=0.05) is None
+
+if __name__ == "__main__":
+    test_signature_verification()
+    test_rejects_unsigned_deliveries()
+    test_replay_updates_pr_state_and_deployments()
+    test_deployment_for_commit_reaches_pr_that_arrives_later()
+    test_waiters_wake_on_delivery()
+    print("✅ All webhook tests passed")